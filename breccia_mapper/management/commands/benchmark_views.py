@@ -0,0 +1,325 @@
+"""
+Measure the number of queries, wall time and peak memory use of every view in the
+`people`, `activities` and `export` apps.
+
+Views are requested against a synthetic dataset in a test database created for the benchmark,
+so existing data is never touched - when using SQLite the test database is held in memory.
+Caches, uploaded files and exports are also kept separate from those of the running site.
+Changes made by each request are rolled back, so views which change data - such as ending a
+relationship - do not change the data seen by later requests. Work deferred until a transaction is
+committed - such as marking cached networks and answer indexes as stale - is therefore never run,
+so is not included in the measurements.
+
+Results are written one view per line as JSON, so runs can be compared line by line.
+"""
+
+import json
+import random
+import tempfile
+import time
+import tracemalloc
+import typing
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.http import HttpResponseBase
+from django.test import Client
+from django.test.client import MULTIPART_CONTENT
+from django.test.utils import (CaptureQueriesContext, override_settings, setup_databases,
+                               setup_test_environment, teardown_databases,
+                               teardown_test_environment)
+from django.urls import reverse
+
+from activities import models as activities_models
+from activities import urls as activities_urls
+from export import jobs
+from export import models as export_models
+from export import urls as export_urls
+from people import benchmark
+from people import models as people_models
+from people import urls as people_urls
+
+#: URL configurations containing the views to measure - in the order they are measured
+BENCHMARKED_URLS = [
+    people_urls,
+    activities_urls,
+    export_urls,
+]
+
+#: Fixtures required to render pages
+FIXTURES = [
+    'bootstrap_customizer_theme',
+    'bootstrap_customizer_sitetheme',
+]
+
+#: Views which redirect to the form they create an object for - the form is measured with them
+FOLLOWED_VIEWS = {
+    'people:person.relationship.create',
+    'people:organisation.relationship.create',
+}
+
+
+class BenchmarkRequest(typing.NamedTuple):
+    """A request to one of the views being measured."""
+    name: str
+    url: str
+    method: str
+    data: typing.Dict[str, typing.Any]
+    content_type: str = MULTIPART_CONTENT
+    follow: bool = False
+
+
+def create_synthetic_activities(n_activities: int, rng: random.Random) -> None:
+    """Create activities in series of ten, each attended by a random selection of people."""
+    activity_type = activities_models.ActivityType.objects.create(name='Synthetic type')
+    medium = activities_models.ActivityMedium.objects.create(name='Synthetic medium')
+
+    series = activities_models.ActivitySeries.objects.bulk_create(
+        (activities_models.ActivitySeries(name=f'Series {i}', type=activity_type, medium=medium)
+         for i in range(max(1, n_activities // 10))),
+        batch_size=benchmark.BATCH_SIZE
+    )
+
+    activities = activities_models.Activity.objects.bulk_create(
+        (activities_models.Activity(name=f'Activity {i}',
+                                    series=series[i // 10],
+                                    type=activity_type,
+                                    medium=medium) for i in range(n_activities)),
+        batch_size=benchmark.BATCH_SIZE
+    )
+
+    people = list(people_models.Person.objects.values_list('pk', flat=True))
+    through_model = activities_models.Activity.attendance_list.through
+
+    through_model.objects.bulk_create(
+        (through_model(activity_id=activity.pk, person_id=person)
+         for activity in activities
+         for person in rng.sample(people, min(10, len(people)))),
+        batch_size=benchmark.BATCH_SIZE
+    )
+
+
+def get_requests(user: people_models.User) -> typing.List[BenchmarkRequest]:
+    """Get a request to each view being measured, as made by a user with a linked person.
+
+    Views of a single object are requested for an object which the user is permitted to edit.
+    """
+    person = user.person
+    relationship = person.relationships_as_source.first()
+
+    objects = {
+        people_models.Person: person,
+        people_models.Organisation: people_models.Organisation.objects.first(),
+        people_models.Relationship: relationship,
+        people_models.OrganisationRelationship: person.organisation_relationships_as_source.first(),
+        activities_models.ActivitySeries: activities_models.ActivitySeries.objects.first(),
+        activities_models.Activity: activities_models.Activity.objects.first(),
+        export_models.ExportJob: export_models.ExportJob.objects.first(),
+    }
+
+    # Relationships are created with a person and an organisation the user has no relationship
+    # with - so they are created, rather than the existing relationship being found
+    url_kwargs = {
+        'person_pk': people_models.Person.objects.exclude(pk=person.pk).exclude(
+            relationships_as_target__source=person
+        ).order_by('pk').first().pk,
+        'organisation_pk': people_models.Organisation.objects.exclude(
+            organisation_relationships_as_target__source=person
+        ).order_by('pk').first().pk,
+    }
+
+    # Query parameters of views which require them - other views are requested without any
+    get_data = {
+        'people:person.autocomplete': {
+            'term': 'Person 1'
+        },
+        'people:map.markers': {
+            'bbox': '-90,-180,90,180',
+            'zoom': 2
+        },
+    }
+
+    # Data submitted to views which do not accept GET requests, with its content type
+    post_data = {
+        'activities:activity.attendance': ({
+            'pk': person.pk
+        }, 'application/json'),
+        'export:job.create': ({
+            'kind': 'person'
+        }, MULTIPART_CONTENT),
+    }
+
+    requests = []
+    for urls in BENCHMARKED_URLS:
+        for pattern in urls.urlpatterns:
+            name = f'{urls.app_name}:{pattern.name}'
+            view_class = pattern.callback.view_class
+
+            kwargs = {
+                key: url_kwargs[key] if key in url_kwargs else objects[view_class.model].pk
+                for key in pattern.pattern.converters
+            }
+
+            url = reverse(name, kwargs=kwargs)
+
+            if hasattr(view_class, 'get') and 'get' in view_class.http_method_names:
+                requests.append(BenchmarkRequest(name, url, 'get', get_data.get(name, {}),
+                                                 follow=name in FOLLOWED_VIEWS))
+
+            else:
+                requests.append(BenchmarkRequest(name, url, 'post', *post_data[name]))
+
+    return requests
+
+
+def make_request(client: Client, request: BenchmarkRequest) -> HttpResponseBase:
+    """Make a request to a view and read the whole response.
+
+    Changes made by the request are rolled back, so that every request sees the same data -
+    e.g. a relationship ended by one request is not already ended for the next.
+    """
+    with transaction.atomic():
+        if request.method == 'post':
+            # Some views only accept POST requests made by scripts
+            response = client.post(request.url, request.data, content_type=request.content_type,
+                                   HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+
+        else:
+            response = client.get(request.url, request.data, follow=request.follow)
+
+        # Streamed responses do their work as they are read
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+
+        response.close()
+
+        transaction.set_rollback(True)
+
+    return response
+
+
+def measure(client: Client, request: BenchmarkRequest, repeat: int) -> typing.Dict[str, typing.Any]:
+    """Measure the number of queries, wall time and peak memory use of a request.
+
+    Queries are counted on a first request made with an empty cache - which is timed separately.
+    """
+    cache.clear()
+
+    with CaptureQueriesContext(connection) as queries:
+        start = time.perf_counter()
+        response = make_request(client, request)
+        cold_seconds = time.perf_counter() - start
+
+    # Captured queries are read from the connection's log - which is cleared by later requests
+    n_queries = len(queries)
+
+    if request.follow and response.status_code != 200:
+        raise CommandError(f'{request.name} did not lead to a form - status {response.status_code}')
+
+    seconds = benchmark.best_time(lambda: make_request(client, request), repeat=repeat)
+
+    # Tracing memory allocations slows requests down so is measured separately
+    tracemalloc.start()
+    try:
+        make_request(client, request)
+        _, peak_memory = tracemalloc.get_traced_memory()
+
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'view': request.name,
+        'method': request.method.upper(),
+        'url': request.url,
+        'status': response.status_code,
+        'queries': n_queries,
+        'cold_seconds': round(cold_seconds, 6),
+        'seconds': round(seconds, 6),
+        'peak_memory_kib': round(peak_memory / 1024),
+    }
+
+
+class Command(BaseCommand):
+    help = ('Measure the queries, wall time and peak memory use of every view against a '
+            'synthetic dataset - changes are rolled back, so work done once they are committed '
+            'is not measured')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--people', type=int, default=1000,
+                            help='Number of people in the synthetic dataset')
+        parser.add_argument('--organisations', type=int, default=100,
+                            help='Number of organisations in the synthetic dataset')
+        parser.add_argument('--relationships', type=int, default=5000,
+                            help='Number of relationships between people in the synthetic dataset')
+        parser.add_argument(
+            '--revisions', type=int, default=3,
+            help='Number of answer sets for each person, organisation and relationship'
+        )
+        parser.add_argument('--activities', type=int, default=100,
+                            help='Number of activities in the synthetic dataset')
+        parser.add_argument('--repeat', type=int, default=3,
+                            help='Number of times to repeat each timing - the fastest is reported')
+        parser.add_argument(
+            '--views', nargs='+', default=None,
+            help='URL names of views to measure - by default all views are measured'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+
+    @staticmethod
+    def create_dataset(options: typing.Mapping[str, typing.Any]) -> people_models.User:
+        """Populate the test database and create a staff user linked to one of its people.
+
+        :return: User as whom views are requested
+        """
+        call_command('loaddata', *FIXTURES, verbosity=0)
+
+        benchmark.create_synthetic_dataset(n_people=max(2, options['people']),
+                                           n_organisations=max(1, options['organisations']),
+                                           n_relationships=max(1, options['relationships']),
+                                           n_revisions=options['revisions'],
+                                           seed=options['seed'])
+        create_synthetic_activities(max(1, options['activities']),
+                                    random.Random(options['seed']))
+
+        # Bulk create does not send signals - so no welcome email is sent
+        user = people_models.User(username='benchmark', is_staff=True, is_superuser=True,
+                                  consent_given=True)
+        user.set_unusable_password()
+        user, = people_models.User.objects.bulk_create([user])
+
+        # Link the user to a person who has relationships, so views of them may be edited
+        person = people_models.Person.objects.filter(
+            relationships_as_source__isnull=False).order_by('pk').first()
+        person.user = user
+        person.save()
+
+        # A complete export job is needed to measure its download
+        job = export_models.ExportJob.objects.create(kind='person', created_by=user)
+        jobs.run_job(job)
+
+        return user
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+
+        try:
+            with tempfile.TemporaryDirectory() as media_root, override_settings(
+                    CACHES=benchmark.BENCHMARK_CACHES, MEDIA_ROOT=media_root,
+                    EXPORT_STORAGE_LOCATION=media_root):
+                user = self.create_dataset(options)
+
+                client = Client()
+                client.force_login(user)
+
+                for request in get_requests(user):
+                    if options['views'] is None or request.name in options['views']:
+                        result = measure(client, request, repeat=options['repeat'])
+                        self.stdout.write(json.dumps(result))
+
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
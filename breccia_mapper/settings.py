@@ -59,6 +59,22 @@ The most likely required settings are: SECRET_KEY, DEBUG, ALLOWED_HOSTS, PROJECT
   default: .dbbackup
   Directory where database backups should be stored
 
+- EXPORT_STORAGE_LOCATION
+  default: exports
+  Directory where exports built in the background are stored - must not be served publicly
+
+- CACHE_BACKEND
+  default: django.core.cache.backends.filebased.FileBasedCache
+  Django cache backend - must be shared between worker processes for cached pages to be invalidated
+
+- CACHE_LOCATION
+  default: .cache
+  Location of cache - directory for file-based cache
+
+- NETWORK_CACHE_TIMEOUT
+  default: 3600
+  Number of seconds for which a filtered network is cached
+
 - LANGUAGE_CODE
   default: en-gb
   Default language - used for translation - has not been enabled
@@ -186,6 +202,7 @@ DJANGO_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'django.contrib.sites',
+    'django.contrib.postgres',
 ]
 
 THIRD_PARTY_APPS = [
@@ -298,6 +315,19 @@ DATABASES = {
     }
 }
 
+# Caching
+# https://docs.djangoproject.com/en/4.1/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND',
+                          default='django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': config('CACHE_LOCATION', default=BASE_DIR.joinpath('.cache')),
+    }
+}
+
+NETWORK_CACHE_TIMEOUT = config('NETWORK_CACHE_TIMEOUT', default=3600, cast=int)
+
 # Django DBBackup
 # https://django-dbbackup.readthedocs.io/en/stable/index.html
 
@@ -381,6 +411,9 @@ STATICFILES_DIRS = [BASE_DIR.joinpath('breccia_mapper', 'static')]
 MEDIA_ROOT = BASE_DIR.joinpath('media')
 MEDIA_URL = "/media/"
 
+# Exports contain non-public answers so are kept apart from media - they are only served to staff
+EXPORT_STORAGE_LOCATION = config('EXPORT_STORAGE_LOCATION', default=BASE_DIR.joinpath('exports'))
+
 # Logging - NB the logger name is empty to capture all output
 
 LOGGING = {
@@ -3,6 +3,8 @@
 set -eo pipefail
 
 python manage.py migrate
+python manage.py backfill_current_answers
+python manage.py backfill_answer_snapshots
 echo "[{\"model\": \"sites.site\",\"pk\": 1,\"fields\": { \"domain\": \"${SITE_URL}\", \"name\": \"${PROJECT_SHORT_NAME}\" }}]" | python manage.py loaddata --format=json -
 python manage.py selectiveloaddata breccia_mapper/fixtures/bootstrap_customizer_theme.json
 python manage.py loaddata --format=json bootstrap_customizer_sitetheme
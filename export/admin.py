@@ -0,0 +1,13 @@
+"""
+Admin site panels for models in the Export app.
+"""
+
+from django.contrib import admin
+
+from . import models
+
+
+@admin.register(models.ExportJob)
+class ExportJobAdmin(admin.ModelAdmin):
+    list_display = ['kind', 'status', 'progress', 'created_by', 'created', 'finished']
+    list_filter = ['kind', 'status']
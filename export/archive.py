@@ -0,0 +1,199 @@
+"""
+Export the whole survey dataset as a single SQLite database.
+
+Each model is written to a table with the same name and columns as in the application
+database, with foreign keys between exported tables kept - so the dataset can be
+queried and joined directly rather than reassembled from separate CSV exports.
+
+Databases are downloaded compressed with gzip - mostly repeated text, they shrink several
+times over.
+"""
+
+import datetime
+import json
+import sqlite3
+import tempfile
+import typing
+import zlib
+
+from django.apps import apps
+from django.db import models
+
+#: Apps from which all models are exported
+EXPORTED_APPS = [
+    'people',
+    'activities',
+]
+
+#: Models which are not part of the survey dataset and must not be exported
+EXCLUDED_MODELS = {
+    'people.User',
+}
+
+#: Number of rows to fetch from the database and insert at a time
+CHUNK_SIZE = 2000
+
+#: Number of bytes of a database to read and compress at a time
+COMPRESS_CHUNK_SIZE = 1024 * 1024
+
+#: SQLite column type for each Django internal field type - unlisted types are stored as text
+COLUMN_TYPES = {
+    'AutoField': 'INTEGER',
+    'BigAutoField': 'INTEGER',
+    'BigIntegerField': 'INTEGER',
+    'BooleanField': 'INTEGER',
+    'DecimalField': 'REAL',
+    'FloatField': 'REAL',
+    'IntegerField': 'INTEGER',
+    'PositiveBigIntegerField': 'INTEGER',
+    'PositiveIntegerField': 'INTEGER',
+    'PositiveSmallIntegerField': 'INTEGER',
+    'SmallAutoField': 'INTEGER',
+    'SmallIntegerField': 'INTEGER',
+}
+
+
+def get_exported_models() -> typing.List[typing.Type[models.Model]]:
+    """Get all models to export, including the through models of many-to-many fields."""
+    exported = []
+
+    for app_label in EXPORTED_APPS:
+        for model in apps.get_app_config(app_label).get_models(include_auto_created=True):
+            # Auto-created through models are excluded along with the model which owns them
+            owner = model._meta.auto_created or model
+            if owner._meta.label not in EXCLUDED_MODELS:
+                exported.append(model)
+
+    return exported
+
+
+def get_exported_fields(model: typing.Type[models.Model],
+                        exported_models: typing.Collection[typing.Type[models.Model]]
+                        ) -> typing.List[models.Field]:
+    """Get the fields of a model to export.
+
+    Relations to models which are not exported are omitted.
+    """
+    return [
+        field for field in model._meta.concrete_fields
+        if not field.is_relation or field.related_model in exported_models
+    ]
+
+
+def get_column_definition(field: models.Field) -> str:
+    """Get the SQLite column definition for a field."""
+    if field.is_relation:
+        column_type = COLUMN_TYPES.get(field.target_field.get_internal_type(), 'TEXT')
+        return (f'"{field.column}" {column_type} REFERENCES '
+                f'"{field.related_model._meta.db_table}" ("{field.target_field.column}")')
+
+    column_type = COLUMN_TYPES.get(field.get_internal_type(), 'TEXT')
+    if field.primary_key:
+        return f'"{field.column}" {column_type} PRIMARY KEY'
+
+    return f'"{field.column}" {column_type}'
+
+
+def to_sqlite(value: typing.Any) -> typing.Any:
+    """Convert a field value to a type which can be stored by SQLite."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+
+    if isinstance(value, (list, tuple)):
+        return ','.join(map(str, value))
+
+    if isinstance(value, dict):
+        return json.dumps(value)
+
+    return str(value)
+
+
+def write_dataset(path: str,
+                  progress: typing.Optional[typing.Callable[[float], None]] = None) -> None:
+    """Write all exported models to a new SQLite database at `path`.
+
+    Rows are read and written in chunks so memory use does not grow with the size of the dataset.
+
+    :param progress: Function called with the fraction of models written after each is complete
+    """
+    exported_models = get_exported_models()
+
+    connection = sqlite3.connect(path)
+    try:
+        # Database is written once from scratch - there is nothing to recover if this fails
+        connection.execute('PRAGMA journal_mode = OFF')
+        connection.execute('PRAGMA synchronous = OFF')
+
+        for i, model in enumerate(exported_models, start=1):
+            fields = get_exported_fields(model, exported_models)
+            table = model._meta.db_table
+
+            connection.execute(
+                f'CREATE TABLE "{table}" ({", ".join(map(get_column_definition, fields))})'
+            )
+
+            columns = ', '.join(f'"{field.column}"' for field in fields)
+            placeholders = ', '.join('?' * len(fields))
+            insert = f'INSERT INTO "{table}" ({columns}) VALUES ({placeholders})'
+
+            rows = model._default_manager.order_by('pk').values_list(
+                *(field.attname for field in fields)
+            ).iterator(chunk_size=CHUNK_SIZE)
+
+            chunk = []
+            for row in rows:
+                chunk.append(tuple(map(to_sqlite, row)))
+
+                if len(chunk) >= CHUNK_SIZE:
+                    connection.executemany(insert, chunk)
+                    chunk = []
+
+            connection.executemany(insert, chunk)
+
+            if progress is not None:
+                progress(i / len(exported_models))
+
+        connection.commit()
+
+    finally:
+        connection.close()
+
+
+def open_dataset() -> typing.IO[bytes]:
+    """Write the dataset to a temporary SQLite database and open it for reading.
+
+    The file is deleted once it is closed.
+    """
+    file = tempfile.NamedTemporaryFile(suffix='.sqlite3')
+
+    try:
+        write_dataset(file.name)
+
+    except Exception:
+        file.close()
+        raise
+
+    return file
+
+
+def iter_compressed(file: typing.IO[bytes]) -> typing.Iterator[bytes]:
+    """Compress a file in gzip format, yielding the compressed data as it is produced.
+
+    Only one chunk of the file is held in memory at a time. The file is closed once it has
+    been read, or if the iterator is closed first.
+    """
+    # Adding 16 to the window size selects a gzip header and trailer
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+
+    with file:
+        file.seek(0)
+
+        for chunk in iter(lambda: file.read(COMPRESS_CHUNK_SIZE), b''):
+            compressed = compressor.compress(chunk)
+            if compressed:
+                yield compressed
+
+    yield compressor.flush()
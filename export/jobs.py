@@ -0,0 +1,118 @@
+"""
+Build exports requested as :class:`ExportJob`s outside of the request-response cycle.
+"""
+
+import logging
+import tempfile
+import typing
+
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+
+from . import archive, models
+from .views import activities, base, people
+
+logger = logging.getLogger(__name__)  # pylint: disable=invalid-name
+
+#: CSV export view used to build each kind of export job
+CSV_EXPORT_VIEWS: typing.Dict[str, typing.Type[base.CsvExportView]] = {
+    'person': people.PersonExportView,
+    'person-answer-set': people.PersonAnswerSetExportView,
+    'relationship': people.RelationshipExportView,
+    'relationship-answer-set': people.RelationshipAnswerSetExportView,
+    'organisation': people.OrganisationExportView,
+    'organisation-answer-set': people.OrganisationAnswerSetExportView,
+    'organisation-relationship': people.OrganisationRelationshipExportView,
+    'organisation-relationship-answer-set': people.OrganisationRelationshipAnswerSetExportView,
+    'activity': activities.ActivityExportView,
+    'activity-attendance': activities.ActivityAttendanceExportView,
+}
+
+#: Filename of full dataset exports - compressed with gzip
+DATASET_FILENAME = 'breccia-mapper.sqlite3.gz'
+
+
+def claim_next_job() -> typing.Optional[models.ExportJob]:
+    """Mark the oldest pending job as running and return it.
+
+    Jobs being claimed by other workers are skipped, so several workers may run at once.
+    """
+    with transaction.atomic():
+        job = models.ExportJob.objects.select_for_update(skip_locked=True).filter(
+            status=models.ExportJob.Status.PENDING
+        ).order_by('created').first()
+
+        if job is not None:
+            job.status = models.ExportJob.Status.RUNNING
+            job.started = timezone.now()
+            job.save(update_fields=['status', 'started'])
+
+    return job
+
+
+def set_progress(job: models.ExportJob, progress: float) -> None:
+    """Record the progress of a job without overwriting any other changes to it."""
+    job.progress = progress
+    models.ExportJob.objects.filter(pk=job.pk).update(progress=progress)
+
+
+def write_csv(job: models.ExportJob, file: typing.BinaryIO) -> str:
+    """Write a CSV export to a file.
+
+    :return: Filename for the export
+    """
+    view = CSV_EXPORT_VIEWS[job.kind]()
+    queryset = view.get_queryset()
+    n_rows = max(1, queryset.count())
+
+    # First line is the header
+    for i, line in enumerate(view.iter_rows()):
+        file.write(line.encode())
+
+        if i % view.chunk_size == 0:
+            set_progress(job, min(i / n_rows, 1))
+
+    return f'{view.get_context_object_name(queryset)}.csv'
+
+
+def write_dataset(job: models.ExportJob, file: typing.BinaryIO) -> str:
+    """Write a full dataset export to a file, compressed with gzip.
+
+    :return: Filename for the export
+    """
+    with tempfile.NamedTemporaryFile(suffix='.sqlite3') as database:
+        archive.write_dataset(database.name,
+                              progress=lambda progress: set_progress(job, progress))
+
+        for chunk in archive.iter_compressed(database):
+            file.write(chunk)
+
+    return DATASET_FILENAME
+
+
+def run_job(job: models.ExportJob) -> None:
+    """Build the export requested by a job and store it as the job's file."""
+    logger.info('Running export job %d: %s', job.pk, job.kind)
+
+    try:
+        with tempfile.NamedTemporaryFile() as file:
+            if job.kind == 'dataset':
+                filename = write_dataset(job, file)
+
+            else:
+                filename = write_csv(job, file)
+
+            file.flush()
+            job.file.save(filename, File(file), save=False)
+
+        job.status = models.ExportJob.Status.COMPLETE
+        job.progress = 1
+
+    except Exception as exc:  # pylint: disable=broad-except
+        logger.exception('Export job %d failed', job.pk)
+        job.status = models.ExportJob.Status.FAILED
+        job.error = str(exc)
+
+    job.finished = timezone.now()
+    job.save()
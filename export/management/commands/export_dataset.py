@@ -0,0 +1,32 @@
+"""
+Export the whole survey dataset as a single SQLite database.
+"""
+
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from export import archive
+
+
+class Command(BaseCommand):
+    help = ('Export people, organisations, relationships, answer sets and activities to an '
+            'SQLite database')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Path of the SQLite database to create')
+        parser.add_argument('--overwrite', action='store_true',
+                            help='Replace the database if it already exists')
+
+    def handle(self, *args, **options):
+        path = options['path']
+
+        if os.path.exists(path):
+            if not options['overwrite']:
+                raise CommandError(f'{path} already exists - use --overwrite to replace it')
+
+            os.remove(path)
+
+        archive.write_dataset(path)
+
+        self.stdout.write(f'Exported dataset to {path}')
@@ -0,0 +1,35 @@
+"""
+Build exports requested through the export pages in the background.
+
+Run alongside the web server so that long exports don't tie up a web worker.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from export import jobs
+
+
+class Command(BaseCommand):
+    help = 'Build pending export jobs, waiting for new jobs unless --once is given'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+                            help='Exit once there are no pending jobs')
+        parser.add_argument('--interval', type=float, default=5,
+                            help='Seconds to wait between checks for new jobs')
+
+    def handle(self, *args, **options):
+        while True:
+            job = jobs.claim_next_job()
+
+            if job is None:
+                if options['once']:
+                    return
+
+                time.sleep(options['interval'])
+                continue
+
+            jobs.run_job(job)
+            self.stdout.write(f'Export job {job.pk}: {job.get_status_display()}')
@@ -0,0 +1,36 @@
+# Generated by Django 4.1.4 on 2026-10-18 09:08
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import export.models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('person', 'People'), ('person-answer-set', 'Person Answer Sets'), ('relationship', 'Relationships'), ('relationship-answer-set', 'Relationship Answer Sets'), ('organisation', 'Organisations'), ('organisation-answer-set', 'Organisation Answer Sets'), ('organisation-relationship', 'Organisation Relationships'), ('organisation-relationship-answer-set', 'Organisation Relationship Answer Sets'), ('activity', 'Activities'), ('activity-attendance', 'Activity Attendance'), ('dataset', 'Full Dataset')], max_length=64)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('complete', 'Complete'), ('failed', 'Failed')], default='pending', max_length=16)),
+                ('progress', models.FloatField(default=0)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('started', models.DateTimeField(blank=True, null=True)),
+                ('finished', models.DateTimeField(blank=True, null=True)),
+                ('file', models.FileField(blank=True, upload_to=export.models.export_job_path)),
+                ('error', models.TextField(blank=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='export_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created'],
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.1.4 on 2026-10-18 10:15
+
+from django.db import migrations, models
+import export.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('export', '0001_export_job'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='exportjob',
+            name='file',
+            field=models.FileField(blank=True, storage=export.models.ExportStorage(), upload_to=export.models.export_job_path),
+        ),
+    ]
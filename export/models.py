@@ -0,0 +1,114 @@
+"""
+Models describing exports which are built in the background.
+"""
+
+import uuid
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.db import models
+from django.utils.deconstruct import deconstructible
+from django.utils.functional import cached_property
+from django.urls import reverse
+
+__all__ = [
+    'ExportJob',
+]
+
+
+@deconstructible
+class ExportStorage(FileSystemStorage):
+    """Storage for exports in `EXPORT_STORAGE_LOCATION` - not served publicly, unlike media.
+
+    Exports are served only to staff by :class:`export.views.jobs.ExportJobDownloadView`.
+    """
+    @cached_property
+    def base_location(self):
+        return self._value_or_setting(self._location, settings.EXPORT_STORAGE_LOCATION)
+
+    def _clear_cached_properties(self, setting, **kwargs):
+        """Follow changes to the location setting - as for `MEDIA_ROOT` in the default storage."""
+        super()._clear_cached_properties(setting, **kwargs)
+
+        if setting == 'EXPORT_STORAGE_LOCATION':
+            self.__dict__.pop('base_location', None)
+            self.__dict__.pop('location', None)
+
+
+def export_job_path(instance: 'ExportJob', filename: str) -> str:
+    """Store each export in its own directory so exports with the same name don't conflict."""
+    return f'exports/{uuid.uuid4().hex}/{filename}'
+
+
+class ExportJob(models.Model):
+    """
+    A request for an export to be built by the `run_export_jobs` worker.
+    """
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        RUNNING = 'running', 'Running'
+        COMPLETE = 'complete', 'Complete'
+        FAILED = 'failed', 'Failed'
+
+    #: Exports which may be built - names match the URL names of the equivalent export views
+    KIND_CHOICES = [
+        ('person', 'People'),
+        ('person-answer-set', 'Person Answer Sets'),
+        ('relationship', 'Relationships'),
+        ('relationship-answer-set', 'Relationship Answer Sets'),
+        ('organisation', 'Organisations'),
+        ('organisation-answer-set', 'Organisation Answer Sets'),
+        ('organisation-relationship', 'Organisation Relationships'),
+        ('organisation-relationship-answer-set', 'Organisation Relationship Answer Sets'),
+        ('activity', 'Activities'),
+        ('activity-attendance', 'Activity Attendance'),
+        ('dataset', 'Full Dataset'),
+    ]
+
+    class Meta:
+        ordering = ['-created']
+
+    #: Which export to build
+    kind = models.CharField(max_length=64, choices=KIND_CHOICES,
+                            blank=False, null=False)
+
+    #: Current state of this job
+    status = models.CharField(max_length=16, choices=Status.choices, default=Status.PENDING,
+                              blank=False, null=False)
+
+    #: Fraction of the export which has been built
+    progress = models.FloatField(default=0,
+                                 blank=False, null=False)
+
+    #: User who requested this export
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL,
+                                   related_name='export_jobs',
+                                   on_delete=models.SET_NULL,
+                                   blank=True, null=True)
+
+    #: When was this export requested?
+    created = models.DateTimeField(auto_now_add=True)
+
+    #: When did the worker start building this export?
+    started = models.DateTimeField(blank=True, null=True)
+
+    #: When did the worker finish building this export?
+    finished = models.DateTimeField(blank=True, null=True)
+
+    #: Exported file - only set once the job is complete
+    file = models.FileField(upload_to=export_job_path,
+                            storage=ExportStorage(),
+                            blank=True, null=False)
+
+    #: Error message if the job failed
+    error = models.TextField(blank=True, null=False)
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in {self.Status.COMPLETE, self.Status.FAILED}
+
+    def get_absolute_url(self):
+        return reverse('export:job.detail', kwargs={'pk': self.pk})
+
+    def __str__(self) -> str:
+        return f'{self.get_kind_display()} export ({self.get_status_display()})'
@@ -1,3 +1,4 @@
+from functools import cached_property
 import typing
 
 from people import models
@@ -15,14 +16,23 @@ def underscore_dict_keys(dict_: typing.Mapping[str, typing.Any]):
 
 
 class AnswerSetSerializer(base.FlattenedModelSerializer):
+    """Serialize answer sets with a column for each question.
+
+    Questions are loaded once per serializer, so answer sets should have their
+    `question_answers` prefetched to serialize many without a query per answer set.
+    """
     question_model = None
 
+    @cached_property
+    def questions(self) -> typing.List[models.Question]:
+        return list(self.question_model.objects.all())
+
     @property
     def column_headers(self) -> typing.List[str]:
         headers = super().column_headers
 
         # Add relationship questions to columns
-        for question in self.question_model.objects.all():
+        for question in self.questions:
             headers.append(underscore(question.slug))
 
         return headers
@@ -31,7 +41,9 @@ class AnswerSetSerializer(base.FlattenedModelSerializer):
         rep = super().to_representation(instance)
 
         rep.update(
-            underscore_dict_keys(instance.build_question_answers(use_slugs=True, show_all=True))
+            underscore_dict_keys(
+                instance.build_question_answers(use_slugs=True, questions=self.questions)
+            )
         )
 
         return rep
@@ -0,0 +1,98 @@
+"""
+Tests for the `export` app.
+"""
+
+import gzip
+import sqlite3
+import tempfile
+
+from django.urls import reverse
+
+from activities import models as activity_models
+from people import models
+from people.tests import QueryCountTestCase
+
+
+def add_activities(size: int) -> None:
+    """Add activities, each attended by some of the existing people."""
+    activity_type, _ = activity_models.ActivityType.objects.get_or_create(name='Workshop')
+    medium, _ = activity_models.ActivityMedium.objects.get_or_create(name='Face to face')
+    series = activity_models.ActivitySeries.objects.create(name='Workshop series',
+                                                           type=activity_type, medium=medium)
+    people = list(models.Person.objects.order_by('-pk')[:size])
+
+    for i in range(size):
+        activity = activity_models.Activity.objects.create(name=f'Workshop {i}',
+                                                           series=series,
+                                                           type=activity_type,
+                                                           medium=medium)
+        activity.attendance_list.set(people[i::size // 4])
+
+
+class ExportQueryCountTest(QueryCountTestCase):
+    """Each export is made with a fixed number of queries however many records there are."""
+    def test_person(self):
+        self.assertQueriesConstant(reverse('export:person'))
+
+    def test_person_answer_set(self):
+        self.assertQueriesConstant(reverse('export:person-answer-set'))
+
+    def test_relationship(self):
+        self.assertQueriesConstant(reverse('export:relationship'))
+
+    def test_relationship_answer_set(self):
+        self.assertQueriesConstant(reverse('export:relationship-answer-set'))
+
+    def test_organisation(self):
+        self.assertQueriesConstant(reverse('export:organisation'))
+
+    def test_organisation_answer_set(self):
+        self.assertQueriesConstant(reverse('export:organisation-answer-set'))
+
+    def test_organisation_relationship(self):
+        self.assertQueriesConstant(reverse('export:organisation-relationship'))
+
+    def test_organisation_relationship_answer_set(self):
+        self.assertQueriesConstant(reverse('export:organisation-relationship-answer-set'))
+
+    def test_dataset(self):
+        self.assertQueriesConstant(reverse('export:dataset'))
+
+    def test_network_analytics(self):
+        self.assertQueriesConstant(reverse('export:network-analytics'))
+
+
+class ActivityExportQueryCountTest(QueryCountTestCase):
+    """Activity exports are made with a fixed number of queries however many activities exist."""
+    def populate(self, seed: int) -> None:
+        super().populate(seed)
+        add_activities(self.population_size)
+
+    def test_activity(self):
+        self.assertQueriesConstant(reverse('export:activity'))
+
+    def test_activity_attendance(self):
+        self.assertQueriesConstant(reverse('export:activity-attendance'))
+
+
+class DatasetExportTest(QueryCountTestCase):
+    """The full dataset is downloaded as an SQLite database compressed with gzip."""
+    def test_dataset(self):
+        self.populate(seed=1)
+
+        response = self.client.get(reverse('export:dataset'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+
+        with tempfile.NamedTemporaryFile(suffix='.sqlite3') as file:
+            file.write(gzip.decompress(b''.join(response.streaming_content)))
+            file.flush()
+
+            connection = sqlite3.connect(file.name)
+            try:
+                n_people, = connection.execute('SELECT COUNT(*) FROM people_person').fetchone()
+
+            finally:
+                connection.close()
+
+        self.assertEqual(n_people, models.Person.objects.count())
@@ -10,6 +10,22 @@ urlpatterns = [
          views.ExportListView.as_view(),
          name='index'),
 
+    path('export/dataset',
+         views.DatasetExportView.as_view(),
+         name='dataset'),
+
+    path('export/jobs/create',
+         views.jobs.ExportJobCreateView.as_view(),
+         name='job.create'),
+
+    path('export/jobs/<int:pk>',
+         views.jobs.ExportJobDetailView.as_view(),
+         name='job.detail'),
+
+    path('export/jobs/<int:pk>/download',
+         views.jobs.ExportJobDownloadView.as_view(),
+         name='job.download'),
+
     path('export/people',
          views.people.PersonExportView.as_view(),
          name='person'),
@@ -42,6 +58,10 @@ urlpatterns = [
          views.people.OrganisationRelationshipAnswerSetExportView.as_view(),
          name='organisation-relationship-answer-set'),
 
+    path('export/network-analytics',
+         views.network.NetworkAnalyticsExportView.as_view(),
+         name='network-analytics'),
+
     path('export/activities',
          views.activities.ActivityExportView.as_view(),
          name='activity'),
@@ -1,13 +1,18 @@
-from .base import ExportListView
+from .base import DatasetExportView, ExportListView
 
 from . import (
     activities,
+    jobs,
+    network,
     people
 )
 
 
 __all__ = [
     'activities',
+    'jobs',
+    'network',
     'people',
+    'DatasetExportView',
     'ExportListView',
 ]
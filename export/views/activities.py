@@ -6,9 +6,14 @@ from activities import models
 
 class ActivityExportView(base.CsvExportView):
     model = models.Activity
+    queryset = model.objects.select_related('series__type', 'series__medium', 'type', 'medium')
     serializer_class = serializers.activities.ActivitySerializer
 
 
 class ActivityAttendanceExportView(base.CsvExportView):
     model = models.Activity.attendance_list.through
+    queryset = model.objects.select_related(
+        'activity',
+        'person__current_answers__organisation__current_answers'
+    )
     serializer_class = serializers.activities.ActivityAttendanceSerializer
@@ -1,33 +1,74 @@
 import csv
 import typing
 
-from django.http import HttpResponse
-from django.views.generic import TemplateView
+from django.http import StreamingHttpResponse
+from django.views.generic import TemplateView, View
 from django.views.generic.list import BaseListView
 from breccia_mapper.views import UserIsStaffMixin
 
+from .. import archive, models
+
 
 class QuotedCsv(csv.excel):
     quoting = csv.QUOTE_NONNUMERIC
 
 
+class Echo:
+    """File-like object which returns written values rather than storing them.
+
+    Allows a CSV writer to produce lines for a streaming response.
+    """
+    def write(self, value: str) -> str:
+        return value
+
+
 class CsvExportView(UserIsStaffMixin, BaseListView):
     model = None
     serializer_class = None
 
-    def render_to_response(self, context: typing.Dict) -> HttpResponse:
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="{self.get_context_object_name(self.object_list)}.csv"'
+    #: Number of rows to fetch from the database at a time
+    chunk_size = 2000
+
+    def iter_rows(self) -> typing.Iterator[str]:
+        """Serialize objects one at a time and yield CSV lines, starting with the header."""
+        serializer = self.serializer_class()
+
+        writer = csv.DictWriter(Echo(), dialect=QuotedCsv, fieldnames=serializer.column_headers)
+        yield writer.writeheader()
 
         # Force ordering by PK - though this should be default anyway
-        serializer = self.serializer_class(self.get_queryset().order_by('pk'), many=True)
+        for instance in self.get_queryset().order_by('pk').iterator(chunk_size=self.chunk_size):
+            yield writer.writerow(serializer.to_representation(instance))
 
-        writer = csv.DictWriter(response, dialect=QuotedCsv, fieldnames=serializer.child.column_headers)
-        writer.writeheader()
-        writer.writerows(serializer.data)
+    def render_to_response(self, context: typing.Dict) -> StreamingHttpResponse:
+        # Rows are produced as the response is sent so memory use doesn't grow with table size
+        response = StreamingHttpResponse(self.iter_rows(), content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="{self.get_context_object_name(self.object_list)}.csv"'
+
+        return response
+
+
+class DatasetExportView(UserIsStaffMixin, View):
+    """Export the whole dataset as a single SQLite database, compressed with gzip."""
+    def get(self, request, *args, **kwargs) -> StreamingHttpResponse:
+        # Database is compressed as it is sent, then deleted
+        response = StreamingHttpResponse(archive.iter_compressed(archive.open_dataset()),
+                                         content_type='application/gzip')
+        response['Content-Disposition'] = 'attachment; filename="breccia-mapper.sqlite3.gz"'
 
         return response
 
 
 class ExportListView(UserIsStaffMixin, TemplateView):
     template_name = 'export/export.html'
+
+    #: Number of recent export jobs to list
+    n_recent_jobs = 10
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['export_jobs'] = models.ExportJob.objects.select_related(
+            'created_by'
+        )[:self.n_recent_jobs]
+
+        return context
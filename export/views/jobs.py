@@ -0,0 +1,48 @@
+"""
+Views for requesting exports to be built in the background and downloading them.
+"""
+
+import os
+
+from django.http import FileResponse, Http404, HttpResponseBadRequest
+from django.views.generic import CreateView, DetailView, View
+from django.views.generic.detail import SingleObjectMixin
+
+from breccia_mapper.views import UserIsStaffMixin
+
+from .. import models
+
+
+class ExportJobCreateView(UserIsStaffMixin, CreateView):
+    """Request an export to be built by the background worker."""
+    model = models.ExportJob
+    fields = ['kind']
+    http_method_names = ['post']
+
+    def form_valid(self, form):
+        form.instance.created_by = self.request.user
+        return super().form_valid(form)
+
+    def form_invalid(self, form):
+        # Form is only submitted from buttons on the export page so there's no form to redisplay
+        return HttpResponseBadRequest('Unknown export type')
+
+
+class ExportJobDetailView(UserIsStaffMixin, DetailView):
+    """View the progress of an export job."""
+    model = models.ExportJob
+    template_name = 'export/job/detail.html'
+    context_object_name = 'job'
+
+
+class ExportJobDownloadView(UserIsStaffMixin, SingleObjectMixin, View):
+    """Download the file built by a complete export job."""
+    model = models.ExportJob
+
+    def get(self, request, *args, **kwargs) -> FileResponse:
+        job = self.get_object()
+        if not job.file:
+            raise Http404('Export is not complete')
+
+        return FileResponse(job.file.open('rb'), as_attachment=True,
+                            filename=os.path.basename(job.file.name))
@@ -0,0 +1,59 @@
+import csv
+import typing
+
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.generic import View
+from breccia_mapper.views import UserIsStaffMixin
+
+from . import base
+
+from people import graph
+from people.views.network import NetworkFilterMixin
+
+
+class NetworkAnalyticsExportView(UserIsStaffMixin, NetworkFilterMixin, View):
+    """Export network metrics for each node in the network.
+
+    Accepts the same filters as the network view, so the metrics shown there can be exported.
+    """
+    #: Network metrics exported for each node - see :func:`people.analytics.analyse_elements`
+    metric_names = [
+        'degree',
+        'in_degree',
+        'out_degree',
+        'betweenness',
+        'eigenvector',
+        'component',
+        'community',
+    ]
+
+    def iter_rows(self, all_forms) -> typing.Iterator[str]:
+        """Yield CSV lines of network metrics, starting with the header."""
+        elements = graph.get_elements(self.get_network(all_forms))
+        metrics = self.get_analytics(all_forms)['nodes']
+
+        writer = csv.DictWriter(base.Echo(), dialect=base.QuotedCsv,
+                                fieldnames=['id', 'kind', 'name'] + self.metric_names)
+        yield writer.writeheader()
+
+        for node_id, node_metrics in sorted(metrics.items()):
+            data = elements[node_id]['data']
+            row = {'id': node_id, 'kind': data['kind'], 'name': data['name']}
+            row.update((name, node_metrics[name]) for name in self.metric_names)
+
+            yield writer.writerow(row)
+
+    def get(self, request, *args, **kwargs):
+        all_forms = self.get_forms()
+        if not all(map(lambda f: f.is_valid(), all_forms.values())):
+            return JsonResponse({
+                'errors': {
+                    key: form.errors.get_json_data() for key, form in all_forms.items()
+                    if form.errors
+                },
+            }, status=400)
+
+        response = StreamingHttpResponse(self.iter_rows(all_forms), content_type='text/csv')
+        response['Content-Disposition'] = 'attachment; filename="network-analytics.csv"'
+
+        return response
@@ -6,21 +6,34 @@ from people import models
 
 class PersonExportView(base.CsvExportView):
     model = models.person.Person
+    queryset = model.objects.select_related('current_answers__organisation__current_answers')
     serializer_class = serializers.people.PersonSerializer
 
 
 class PersonAnswerSetExportView(base.CsvExportView):
     model = models.person.PersonAnswerSet
+    queryset = model.objects.select_related(
+        'person__current_answers__organisation__current_answers',
+        'organisation__current_answers'
+    ).prefetch_related('question_answers')
     serializer_class = serializers.people.PersonAnswerSetSerializer
 
 
 class RelationshipExportView(base.CsvExportView):
     model = models.relationship.Relationship
+    queryset = model.objects.select_related(
+        'source__current_answers__organisation__current_answers',
+        'target__current_answers__organisation__current_answers'
+    )
     serializer_class = serializers.people.RelationshipSerializer
 
 
 class RelationshipAnswerSetExportView(base.CsvExportView):
     model = models.relationship.RelationshipAnswerSet
+    queryset = model.objects.select_related(
+        'relationship__source__current_answers__organisation__current_answers',
+        'relationship__target__current_answers__organisation__current_answers'
+    ).prefetch_related('question_answers')
     serializer_class = serializers.people.RelationshipAnswerSetSerializer
 
 
@@ -31,14 +44,21 @@ class OrganisationExportView(base.CsvExportView):
 
 class OrganisationAnswerSetExportView(base.CsvExportView):
     model = models.organisation.OrganisationAnswerSet
+    queryset = model.objects.select_related(
+        'organisation__current_answers'
+    ).prefetch_related('question_answers')
     serializer_class = serializers.people.OrganisationAnswerSetSerializer
 
 
 class OrganisationRelationshipExportView(base.CsvExportView):
     model = models.relationship.OrganisationRelationship
+    queryset = model.objects.select_related('source', 'target')
     serializer_class = serializers.people.OrganisationRelationshipSerializer
 
 
 class OrganisationRelationshipAnswerSetExportView(base.CsvExportView):
     model = models.relationship.OrganisationRelationshipAnswerSet
+    queryset = model.objects.select_related(
+        'relationship__source', 'relationship__target'
+    ).prefetch_related('question_answers')
     serializer_class = serializers.people.OrganisationRelationshipAnswerSetSerializer
@@ -16,6 +16,15 @@ class CustomUserAdmin(UserAdmin):
     )  # yapf: disable
 
 
+class OrganisationChoicesMixin:
+    """List organisations in choice fields by their current name, without a query for each."""
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.related_model is models.Organisation:
+            kwargs['queryset'] = models.Organisation.objects.select_related('current_answers')
+
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+
 class OrganisationQuestionChoiceInline(admin.TabularInline):
     model = models.OrganisationQuestionChoice
 
@@ -52,7 +61,7 @@ class PersonQuestionAdmin(admin.ModelAdmin):
     ]
 
 
-class PersonAnswerSetInline(admin.TabularInline):
+class PersonAnswerSetInline(OrganisationChoicesMixin, admin.TabularInline):
     model = models.PersonAnswerSet
     readonly_fields = [
         'question_answers',
@@ -94,5 +103,6 @@ class OrganisationRelationshipQuestionAdmin(admin.ModelAdmin):
 
 
 @admin.register(models.OrganisationRelationship)
-class OrganisationRelationshipAdmin(admin.ModelAdmin):
+class OrganisationRelationshipAdmin(OrganisationChoicesMixin, admin.ModelAdmin):
     ordering = ['source__name', 'target__name']
+    list_select_related = ['source', 'target__current_answers']
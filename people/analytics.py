@@ -0,0 +1,272 @@
+"""
+Compute network analysis metrics for the network of :class:`Person`s and :class:`Organisation`s.
+
+The network is held as a sparse adjacency matrix so each metric is computed with a small number
+of vectorised matrix operations rather than by walking the graph one node at a time.
+
+Relationships are directed, but all metrics other than in and out degree treat each
+relationship as a tie between two nodes in both directions.
+"""
+
+import typing
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse import csgraph
+
+from .graph import Element
+
+__all__ = [
+    'build_adjacency',
+    'get_betweenness',
+    'get_eigenvector_centrality',
+    'get_components',
+    'get_communities',
+    'get_modularity',
+    'analyse_elements',
+]
+
+#: Maximum number of source nodes used to estimate betweenness - larger networks are sampled
+MAX_BETWEENNESS_SOURCES = 256
+
+#: Number of source nodes for which shortest paths are found at once
+BETWEENNESS_BATCH_SIZE = 64
+
+#: Maximum number of iterations used to find eigenvector centrality
+EIGENVECTOR_ITERATIONS = 200
+
+#: Change in eigenvector centrality below which it is considered to have converged
+EIGENVECTOR_TOLERANCE = 1e-8
+
+#: Maximum number of rounds of label propagation used to find communities
+COMMUNITY_ITERATIONS = 50
+
+#: Number of decimal places to which metrics are reported
+PRECISION = 6
+
+
+def build_adjacency(
+    elements: typing.Mapping[str, Element]
+) -> typing.Tuple[typing.List[str], sparse.csr_matrix]:
+    """Build the directed adjacency matrix of a set of Cytoscape elements.
+
+    :return: Node ids in the order of rows of the matrix, and the matrix itself -
+        with a one in row `i` column `j` if there is any edge from node `i` to node `j`
+    """
+    node_ids = sorted(
+        element_id for element_id, element in elements.items() if element['group'] == 'nodes'
+    )
+    node_index = {node_id: i for i, node_id in enumerate(node_ids)}
+
+    edges = np.array([
+        (node_index[element['data']['source']], node_index[element['data']['target']])
+        for element in elements.values() if element['group'] == 'edges'
+    ], dtype=np.int64).reshape(-1, 2)
+    edges = edges[edges[:, 0] != edges[:, 1]]
+
+    adjacency = sparse.csr_matrix(
+        (np.ones(len(edges)), (edges[:, 0], edges[:, 1])), shape=(len(node_ids), len(node_ids))
+    )
+    # Repeated edges between the same nodes are summed - count each pair of nodes once
+    adjacency.data[:] = 1
+
+    return node_ids, adjacency
+
+
+def get_undirected(adjacency: sparse.csr_matrix) -> sparse.csr_matrix:
+    """Get the symmetric adjacency matrix, with an edge wherever there is one in either direction."""
+    undirected = (adjacency + adjacency.T).tocsr()
+    undirected.data[:] = 1
+
+    return undirected
+
+
+def get_betweenness(undirected: sparse.csr_matrix,
+                    max_sources: int = MAX_BETWEENNESS_SOURCES,
+                    seed: int = 0) -> np.ndarray:
+    """Compute the normalised betweenness centrality of each node.
+
+    Uses Brandes' algorithm, finding shortest paths from a batch of source nodes at once
+    by breadth-first search using sparse matrix products. If there are more than
+    `max_sources` nodes, betweenness is estimated from a random sample of source nodes.
+    """
+    n_nodes = undirected.shape[0]
+    if n_nodes < 3:
+        return np.zeros(n_nodes)
+
+    sources = np.arange(n_nodes)
+    if n_nodes > max_sources:
+        sources = np.sort(np.random.default_rng(seed).choice(n_nodes, max_sources, replace=False))
+
+    betweenness = np.zeros(n_nodes)
+
+    for start in range(0, len(sources), BETWEENNESS_BATCH_SIZE):
+        batch = sources[start:start + BETWEENNESS_BATCH_SIZE]
+        columns = np.arange(len(batch))
+
+        # Number of shortest paths from each source to each node, and their length
+        n_paths = np.zeros((n_nodes, len(batch)))
+        n_paths[batch, columns] = 1
+        distance = np.full((n_nodes, len(batch)), -1, dtype=np.int64)
+        distance[batch, columns] = 0
+
+        frontier = n_paths.copy()
+        depth = 0
+        while True:
+            frontier = undirected @ frontier
+            frontier[distance >= 0] = 0
+
+            reached = frontier > 0
+            if not reached.any():
+                break
+
+            depth += 1
+            distance[reached] = depth
+            n_paths += frontier
+
+        # Accumulate dependencies from the furthest nodes back towards each source
+        dependency = np.zeros((n_nodes, len(batch)))
+        for level in range(depth, 1, -1):
+            coefficient = np.where(distance == level, (1 + dependency) / np.maximum(n_paths, 1), 0)
+            dependency += np.where(distance == level - 1, n_paths * (undirected @ coefficient), 0)
+
+        betweenness += dependency.sum(axis=1)
+
+    # Each path is found from both ends
+    return betweenness * (n_nodes / len(sources)) / ((n_nodes - 1) * (n_nodes - 2))
+
+
+def get_eigenvector_centrality(undirected: sparse.csr_matrix) -> np.ndarray:
+    """Compute the eigenvector centrality of each node, normalised so the most central node has 1.
+
+    Found by power iteration - nodes are counted as their own neighbour so that the iteration
+    converges on bipartite networks, without changing the eigenvectors.
+    """
+    n_nodes = undirected.shape[0]
+    if n_nodes == 0:
+        return np.zeros(0)
+
+    shifted = undirected + sparse.identity(n_nodes, format='csr')
+    centrality = np.full(n_nodes, 1 / n_nodes)
+
+    for _ in range(EIGENVECTOR_ITERATIONS):
+        previous = centrality
+        centrality = shifted @ centrality
+        centrality /= np.linalg.norm(centrality)
+
+        if np.abs(centrality - previous).sum() < n_nodes * EIGENVECTOR_TOLERANCE:
+            break
+
+    return centrality / centrality.max()
+
+
+def relabel_by_size(labels: np.ndarray) -> np.ndarray:
+    """Renumber groups of nodes from zero in order of decreasing size."""
+    _, index, counts = np.unique(labels, return_inverse=True, return_counts=True)
+    # Stable sort keeps groups of equal size in order of their original label
+    order = np.argsort(-counts, kind='stable')
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+
+    return rank[index]
+
+
+def get_components(undirected: sparse.csr_matrix) -> np.ndarray:
+    """Find the connected component containing each node, numbered from the largest."""
+    _, labels = csgraph.connected_components(undirected, directed=False)
+
+    return relabel_by_size(labels)
+
+
+def get_communities(undirected: sparse.csr_matrix, seed: int = 0) -> np.ndarray:
+    """Find communities of closely connected nodes by label propagation, numbered from the largest.
+
+    Each node starts in its own community then repeatedly joins the community most common among
+    its neighbours. Only a random half of nodes move each round, which prevents pairs of nodes
+    from swapping communities forever.
+    """
+    n_nodes = undirected.shape[0]
+    labels = np.arange(n_nodes)
+    if n_nodes == 0:
+        return labels
+
+    rng = np.random.default_rng(seed)
+    rows = np.arange(n_nodes)
+
+    for _ in range(COMMUNITY_ITERATIONS):
+        membership = sparse.csr_matrix((np.ones(n_nodes), (rows, labels)), shape=(n_nodes, n_nodes))
+
+        # Nodes stay in their current community unless another is strictly more common
+        votes = (undirected @ membership + 0.5 * membership).tocsr()
+        best = np.asarray(votes.argmax(axis=1)).ravel()
+
+        moving = (best != labels) & (rng.random(n_nodes) < 0.5)
+        if not (best != labels).any():
+            break
+
+        labels = np.where(moving, best, labels)
+
+    return relabel_by_size(labels)
+
+
+def get_modularity(undirected: sparse.csr_matrix, communities: np.ndarray) -> float:
+    """Compute the modularity of a division of the network into communities."""
+    degree = np.asarray(undirected.sum(axis=1)).ravel()
+    total = degree.sum()
+    if total == 0:
+        return 0.
+
+    coo = undirected.tocoo()
+    internal = (communities[coo.row] == communities[coo.col]).sum()
+    community_degree = np.bincount(communities, weights=degree)
+
+    return float(internal / total - ((community_degree / total) ** 2).sum())
+
+
+def analyse_elements(elements: typing.Mapping[str, Element]) -> typing.Dict[str, typing.Any]:
+    """Compute network metrics for a set of Cytoscape elements.
+
+    :return: Metrics for each node keyed by element id, and a summary of the whole network
+    """
+    node_ids, adjacency = build_adjacency(elements)
+    undirected = get_undirected(adjacency)
+    n_nodes = len(node_ids)
+
+    out_degree = np.asarray(adjacency.sum(axis=1)).ravel().astype(int)
+    in_degree = np.asarray(adjacency.sum(axis=0)).ravel().astype(int)
+    degree = np.asarray(undirected.sum(axis=1)).ravel().astype(int)
+
+    betweenness = get_betweenness(undirected)
+    eigenvector = get_eigenvector_centrality(undirected)
+    components = get_components(undirected)
+    communities = get_communities(undirected)
+
+    nodes = {
+        node_id: {
+            'degree': int(degree[i]),
+            'in_degree': int(in_degree[i]),
+            'out_degree': int(out_degree[i]),
+            'betweenness': round(float(betweenness[i]), PRECISION),
+            'eigenvector': round(float(eigenvector[i]), PRECISION),
+            'component': int(components[i]),
+            'community': int(communities[i]),
+        } for i, node_id in enumerate(node_ids)
+    }
+
+    n_edges = int(undirected.nnz // 2)
+    summary = {
+        'nodes': n_nodes,
+        'edges': n_edges,
+        'density': round(2 * n_edges / (n_nodes * (n_nodes - 1)), PRECISION) if n_nodes > 1 else 0.,
+        'mean_degree': round(float(degree.mean()), PRECISION) if n_nodes else 0.,
+        'max_degree': int(degree.max()) if n_nodes else 0,
+        'components': int(components.max()) + 1 if n_nodes else 0,
+        'largest_component': int(np.bincount(components).max()) if n_nodes else 0,
+        'communities': int(communities.max()) + 1 if n_nodes else 0,
+        'modularity': round(get_modularity(undirected, communities), PRECISION),
+    }
+
+    return {
+        'nodes': nodes,
+        'summary': summary,
+    }
@@ -0,0 +1,195 @@
+"""
+Index the choices selected in the current answers of people, organisations and relationships.
+
+For each question choice the index holds the set of entities whose current answer set selected it,
+as a bitset with one bit per entity primary key. Filters on answers to several questions are then
+evaluated as bitwise operations on these sets, rather than by joining answer sets to their
+answers once for every question.
+
+Each process builds the index for an entity model when it is first used. When answers change
+the version stored in the cache is replaced, and every process - including the one making the
+change - rebuilds its index when it is next used. Updating an index in place could miss changes
+made at the same time by other processes, since the cache offers no atomic compare and set.
+"""
+
+import typing
+import uuid
+
+from django.core.cache import cache
+from django.db import models as db_models
+from django.db import transaction
+import numpy as np
+
+from . import models
+
+#: Index for each entity model built by this process, keyed by model label
+_indexes: typing.Dict[str, 'AnswerIndex'] = {}
+
+
+def to_bitset(pks: typing.Iterable[int]) -> int:
+    """Build a bitset with the bit for each primary key set."""
+    pks = np.fromiter(pks, dtype=np.int64)
+    if not len(pks):
+        return 0
+
+    bits = np.zeros(pks.max() + 1, dtype=bool)
+    bits[pks] = True
+
+    return int.from_bytes(np.packbits(bits, bitorder='little').tobytes(), 'little')
+
+
+def from_bitset(bitset: int) -> typing.List[int]:
+    """Get the primary keys for which bits are set in a bitset."""
+    packed = np.frombuffer(bitset.to_bytes((bitset.bit_length() + 7) // 8, 'little'),
+                           dtype=np.uint8)
+
+    return np.flatnonzero(np.unpackbits(packed, bitorder='little')).tolist()
+
+
+class AnswerIndex:
+    """Inverted index from question choices to the entities whose current answers selected them."""
+    def __init__(self, version: str) -> None:
+        #: Version of the answers from which this index was built
+        self.version = version
+
+        #: Bitset of all entities with current answers
+        self.entities = 0
+
+        #: Bitset of entities selecting each choice, keyed by choice primary key
+        self.choices: typing.Dict[int, int] = {}
+
+    def select(self, choice_groups: typing.Iterable[typing.Iterable[int]]) -> typing.List[int]:
+        """Select entities which have selected at least one choice from each group of choices.
+
+        :return: Primary keys of selected entities
+        """
+        selected = self.entities
+
+        for choice_pks in choice_groups:
+            matching = 0
+            for choice_pk in choice_pks:
+                matching |= self.choices.get(choice_pk, 0)
+
+            selected &= matching
+
+        return from_bitset(selected)
+
+
+def get_version_key(entity_model: typing.Type[db_models.Model]) -> str:
+    """Get the cache key under which the version of an entity model's answers is stored."""
+    return f'people:answer-index:{entity_model._meta.label_lower}:version'
+
+
+def get_version(entity_model: typing.Type[db_models.Model]) -> str:
+    """Get the current version of an entity model's answers, creating one if there isn't one yet."""
+    key = get_version_key(entity_model)
+    version = cache.get(key)
+
+    if version is None:
+        # Another process may have created a version in the meantime - `add` keeps theirs
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        version = cache.get(key)
+
+    return version
+
+
+def get_current_choices(entity_queryset: db_models.QuerySet) -> typing.Dict[int, typing.Set[int]]:
+    """Get the choices selected by the current answers of each entity which has current answers."""
+    entity_choices = {}
+
+    for entity_pk, choice_pk in entity_queryset.filter(
+        current_answers__isnull=False
+    ).order_by().values_list('pk', 'current_answers__question_answers'):
+        choices = entity_choices.setdefault(entity_pk, set())
+        if choice_pk is not None:
+            choices.add(choice_pk)
+
+    return entity_choices
+
+
+def build_index(entity_model: typing.Type[db_models.Model], version: str) -> AnswerIndex:
+    """Build the index of the current answers of all entities of a model."""
+    index = AnswerIndex(version)
+    entity_choices = get_current_choices(entity_model.objects.all())
+
+    # Bitsets are built all at once - setting bits one at a time copies the bitset each time
+    choice_entities = {}
+    for entity_pk, choice_pks in entity_choices.items():
+        for choice_pk in choice_pks:
+            choice_entities.setdefault(choice_pk, []).append(entity_pk)
+
+    index.entities = to_bitset(entity_choices)
+    index.choices = {
+        choice_pk: to_bitset(entity_pks) for choice_pk, entity_pks in choice_entities.items()
+    }
+
+    return index
+
+
+def get_index(entity_model: typing.Type[db_models.Model]) -> AnswerIndex:
+    """Get the index of an entity model's current answers, building it if it is out of date."""
+    version = get_version(entity_model)
+
+    index = _indexes.get(entity_model._meta.label)
+    if index is None or index.version != version:
+        index = build_index(entity_model, version)
+        _indexes[entity_model._meta.label] = index
+
+    return index
+
+
+def select(entity_model: typing.Type[db_models.Model],
+           choice_groups: typing.Iterable[typing.Iterable[int]]) -> typing.List[int]:
+    """Select entities whose current answers include at least one choice from each group of choices.
+
+    :return: Primary keys of selected entities
+    """
+    return get_index(entity_model).select(choice_groups)
+
+
+def invalidate(entity_model: typing.Type[db_models.Model]) -> None:
+    """Mark the index of an entity model as out of date in all processes."""
+    _indexes.pop(entity_model._meta.label, None)
+    cache.set(get_version_key(entity_model), uuid.uuid4().hex, timeout=None)
+
+
+def entity_changed(sender: typing.Type[db_models.Model], instance: db_models.Model,
+                   **kwargs) -> None:
+    """Mark the index out of date when an entity is saved or deleted - its answers may have changed.
+
+    May be connected directly as a signal receiver for entity models.
+    """
+    # Answers saved in a transaction are not visible to other processes until it is committed
+    transaction.on_commit(lambda: invalidate(sender))
+
+
+def answer_set_deleted(sender: typing.Type[models.question.AnswerSet],
+                       instance: models.question.AnswerSet, **kwargs) -> None:
+    """Mark the index out of date when an answer set is deleted - it may have been current.
+
+    May be connected directly as a signal receiver for answer set models.
+    """
+    entity_model = sender._meta.get_field(sender.entity_field).related_model
+
+    transaction.on_commit(lambda: invalidate(entity_model))
+
+
+def answers_changed(instance: typing.Union[models.question.AnswerSet, models.QuestionChoice],
+                    action: str, reverse: bool, model: typing.Type[db_models.Model],
+                    **kwargs) -> None:
+    """Mark the index out of date when the choices selected in an answer set change.
+
+    May be connected directly as an `m2m_changed` signal receiver for answer set `question_answers`.
+    """
+    if not action.startswith('post_'):
+        return
+
+    if reverse:
+        # Answer sets of a choice have changed
+        answer_set_model = model
+
+    else:
+        answer_set_model = type(instance)
+
+    entity_model = answer_set_model._meta.get_field(answer_set_model.entity_field).related_model
+    transaction.on_commit(lambda: invalidate(entity_model))
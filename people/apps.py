@@ -3,7 +3,7 @@ import logging
 from django.apps import AppConfig
 from django.conf import settings
 from django.core import serializers
-from django.db.models.signals import post_save
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
 
 logger = logging.getLogger(__name__)  # pylint: disable=invalid-name
 
@@ -67,3 +67,107 @@ class PeopleConfig(AppConfig):
     def ready(self) -> None:
         # Activate signal handlers
         post_save.connect(send_welcome_email, sender='people.user')
+        self.connect_network_cache_invalidation()
+        self.connect_question_cache_invalidation()
+        self.connect_network_metrics_updates()
+        self.connect_answer_index_updates()
+        self.connect_answer_snapshot_updates()
+
+    def connect_network_cache_invalidation(self) -> None:
+        """Mark cached networks as stale when any of the data they contain changes."""
+        from . import network_cache
+
+        for model_name in (
+            'Person',
+            'PersonAnswerSet',
+            'Organisation',
+            'OrganisationAnswerSet',
+            'Relationship',
+            'RelationshipAnswerSet',
+            'OrganisationRelationship',
+            'OrganisationRelationshipAnswerSet',
+        ):
+            model = self.get_model(model_name)
+
+            post_save.connect(network_cache.invalidate, sender=model,
+                              dispatch_uid=f'network_cache_save_{model_name}')
+            post_delete.connect(network_cache.invalidate, sender=model,
+                                dispatch_uid=f'network_cache_delete_{model_name}')
+
+            if model_name.endswith('AnswerSet'):
+                m2m_changed.connect(network_cache.invalidate,
+                                    sender=model.question_answers.through,
+                                    dispatch_uid=f'network_cache_answers_{model_name}')
+
+    def connect_question_cache_invalidation(self) -> None:
+        """Remove cached questions when any question or choice changes."""
+        from . import question_cache
+
+        for model_name in (
+            'PersonQuestion',
+            'PersonQuestionChoice',
+            'OrganisationQuestion',
+            'OrganisationQuestionChoice',
+            'RelationshipQuestion',
+            'RelationshipQuestionChoice',
+            'OrganisationRelationshipQuestion',
+            'OrganisationRelationshipQuestionChoice',
+        ):
+            model = self.get_model(model_name)
+
+            post_save.connect(question_cache.invalidate, sender=model,
+                              dispatch_uid=f'question_cache_save_{model_name}')
+            post_delete.connect(question_cache.invalidate, sender=model,
+                                dispatch_uid=f'question_cache_delete_{model_name}')
+
+    def connect_network_metrics_updates(self) -> None:
+        """Update precomputed network metrics when relationships start or end."""
+        from . import network_metrics
+
+        model = self.get_model('Relationship')
+
+        post_save.connect(network_metrics.relationship_saved, sender=model,
+                          dispatch_uid='network_metrics_save_Relationship')
+        post_delete.connect(network_metrics.relationship_deleted, sender=model,
+                            dispatch_uid='network_metrics_delete_Relationship')
+
+    def connect_answer_index_updates(self) -> None:
+        """Update the index of current answers used to filter the network when answers change."""
+        from . import answer_index
+
+        for model_name in (
+            'Person',
+            'Organisation',
+            'Relationship',
+        ):
+            model = self.get_model(model_name)
+            answer_set_model = self.get_model(f'{model_name}AnswerSet')
+
+            post_save.connect(answer_index.entity_changed, sender=model,
+                              dispatch_uid=f'answer_index_save_{model_name}')
+            post_delete.connect(answer_index.entity_changed, sender=model,
+                                dispatch_uid=f'answer_index_delete_{model_name}')
+            post_delete.connect(answer_index.answer_set_deleted, sender=answer_set_model,
+                                dispatch_uid=f'answer_index_delete_{model_name}AnswerSet')
+            m2m_changed.connect(answer_index.answers_changed,
+                                sender=answer_set_model.question_answers.through,
+                                dispatch_uid=f'answer_index_answers_{model_name}AnswerSet')
+
+    def connect_answer_snapshot_updates(self) -> None:
+        """Rebuild answer snapshots which include a choice when it is changed or deleted."""
+        from .models import question
+
+        for model_name in (
+            'PersonQuestionChoice',
+            'OrganisationQuestionChoice',
+            'RelationshipQuestionChoice',
+            'OrganisationRelationshipQuestionChoice',
+        ):
+            model = self.get_model(model_name)
+
+            post_save.connect(question.choice_changed, sender=model,
+                              dispatch_uid=f'answer_snapshot_save_{model_name}')
+            pre_delete.connect(question.choice_deleting, sender=model,
+                               dispatch_uid=f'answer_snapshot_deleting_{model_name}')
+            post_delete.connect(question.choice_changed, sender=model,
+                                dispatch_uid=f'answer_snapshot_delete_{model_name}')
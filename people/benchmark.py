@@ -0,0 +1,181 @@
+"""
+Synthetic data and timing helpers for measuring the performance of the `people` app.
+
+These create large numbers of records so should only be used against a development database.
+"""
+
+import io
+import random
+import time
+import typing
+
+from django.core.management import call_command
+from django.db import models as db_models
+from django.utils import timezone
+
+from . import models
+
+#: Interval between successive revisions of each answer set
+REVISION_INTERVAL = timezone.timedelta(days=30)
+
+#: Number of records to insert per query
+BATCH_SIZE = 1000
+
+#: Cache used during benchmarks - so the site's cache is neither used nor cleared
+BENCHMARK_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'benchmark',
+    }
+}
+
+
+def revision_dates(n_revisions: int) -> typing.List[timezone.datetime]:
+    """Get the timestamps at which each revision of the synthetic answer sets were collected.
+
+    The most recent revision is current.
+    """
+    now = timezone.now()
+    return [now - (n_revisions - i) * REVISION_INTERVAL for i in range(n_revisions)]
+
+
+def create_synthetic_question(question_model: typing.Type[models.Question],
+                              n_choices: int = 5) -> None:
+    """Create a multiple choice question to be answered in synthetic answer sets."""
+    question = question_model.objects.create(text='Synthetic question',
+                                             filter_text='Synthetic question',
+                                             is_multiple_choice=True)
+
+    for i in range(n_choices):
+        question.answers.create(text=f'Synthetic answer {i}', order=i)
+
+
+def create_answer_sets(answer_set_model: typing.Type[models.question.AnswerSet],
+                       entities: typing.Sequence[db_models.Model],
+                       n_revisions: int,
+                       rng: random.Random,
+                       **field_factories: typing.Callable[[], typing.Any]) -> None:
+    """Create a history of answer sets for each of a sequence of entities.
+
+    Each answer set contains a randomly selected answer to every dynamic question.
+
+    :param field_factories: Functions to produce values for static question fields
+    """
+    dates = revision_dates(n_revisions)
+
+    answer_sets = answer_set_model.objects.bulk_create((
+        answer_set_model(
+            **{answer_set_model.entity_field: entity},
+            **{field: factory() for field, factory in field_factories.items()}
+        ) for entity in entities for _ in dates
+    ), batch_size=BATCH_SIZE)
+
+    # Timestamp is set to now by `auto_now_add` during bulk_create - so must be set afterwards
+    for i, answer_set in enumerate(answer_sets):
+        revision = i % len(dates)
+        answer_set.timestamp = dates[revision]
+        answer_set.replaced_timestamp = dates[revision + 1] if revision + 1 < len(dates) else None
+
+    answer_set_model.objects.bulk_update(answer_sets, ['timestamp', 'replaced_timestamp'],
+                                         batch_size=BATCH_SIZE)
+
+    field = answer_set_model.question_answers.field
+
+    choices_by_question = {}
+    for choice in field.related_model.objects.order_by().values('pk', 'question_id'):
+        choices_by_question.setdefault(choice['question_id'], []).append(choice['pk'])
+
+    through_model = field.remote_field.through
+    answer_set_attname = through_model._meta.get_field(field.m2m_field_name()).attname
+    choice_attname = through_model._meta.get_field(field.m2m_reverse_field_name()).attname
+
+    through_model.objects.bulk_create((
+        through_model(**{
+            answer_set_attname: answer_set.pk,
+            choice_attname: rng.choice(choices),
+        })
+        for answer_set in answer_sets
+        for choices in choices_by_question.values()
+    ), batch_size=BATCH_SIZE)
+
+
+def create_synthetic_dataset(n_people: int,
+                             n_organisations: int,
+                             n_relationships: int,
+                             n_revisions: int = 1,
+                             seed: int = 0) -> None:
+    """Populate the database with a synthetic network.
+
+    Every person, organisation and relationship is given `n_revisions` answer sets,
+    of which the most recent is current.
+    """
+    rng = random.Random(seed)
+
+    for question_model in (models.PersonQuestion, models.OrganisationQuestion,
+                           models.RelationshipQuestion, models.OrganisationRelationshipQuestion):
+        create_synthetic_question(question_model)
+
+    organisations = models.Organisation.objects.bulk_create(
+        (models.Organisation(name=f'Organisation {i}') for i in range(n_organisations)),
+        batch_size=BATCH_SIZE
+    )
+
+    people = models.Person.objects.bulk_create(
+        (models.Person(name=f'Person {i}') for i in range(n_people)),
+        batch_size=BATCH_SIZE
+    )
+
+    # Relationships are unique and between two different people
+    n_relationships = min(n_relationships, n_people * (n_people - 1))
+    pairs = set()
+    while len(pairs) < n_relationships:
+        source, target = rng.sample(range(n_people), 2)
+        pairs.add((source, target))
+
+    relationships = models.Relationship.objects.bulk_create(
+        (models.Relationship(source=people[source], target=people[target])
+         for source, target in sorted(pairs)),
+        batch_size=BATCH_SIZE
+    )
+
+    organisation_relationships = []
+    if organisations:
+        organisation_relationships = models.OrganisationRelationship.objects.bulk_create(
+            (models.OrganisationRelationship(source=person, target=rng.choice(organisations))
+             for person in people),
+            batch_size=BATCH_SIZE
+        )
+
+    def random_latitude() -> float:
+        return rng.uniform(-60, 60)
+
+    def random_longitude() -> float:
+        return rng.uniform(-180, 180)
+
+    def random_organisation() -> typing.Optional[models.Organisation]:
+        return rng.choice(organisations) if organisations else None
+
+    create_answer_sets(models.PersonAnswerSet, people, n_revisions, rng,
+                       organisation=random_organisation,
+                       latitude=random_latitude,
+                       longitude=random_longitude)
+    create_answer_sets(models.OrganisationAnswerSet, organisations, n_revisions, rng,
+                       latitude=random_latitude,
+                       longitude=random_longitude)
+    create_answer_sets(models.RelationshipAnswerSet, relationships, n_revisions, rng)
+    create_answer_sets(models.OrganisationRelationshipAnswerSet, organisation_relationships,
+                       n_revisions, rng)
+
+    call_command('backfill_current_answers', stdout=io.StringIO())
+    call_command('backfill_answer_snapshots', stdout=io.StringIO())
+
+
+def best_time(func: typing.Callable[[], typing.Any], repeat: int = 3) -> float:
+    """Get the shortest wall time in seconds of several calls to a function."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    return min(times)
@@ -0,0 +1,244 @@
+"""
+Filter people, organisations and relationships by boolean expressions of their answers.
+
+Expressions are sent as JSON, with an expression for each kind of object in the network::
+
+    {
+        "relationship": {"and": [{"relationship": [1, 2]}, {"not": {"target": [7]}}]},
+        "person": {"or": [{"person": [3]}, {"organisation": [5, 6]}]}
+    }
+
+An expression is either an `and` or `or` of a list of expressions, a `not` of an expression,
+or a term selecting objects with answers which include any of a list of choice ids. The key of
+a term names whose answers are used - relationships may be filtered by the answers of their
+`source` or `target` person, and people by the answers of their `organisation`. As in the
+network filter forms, only choices of questions whose answers are public may be used.
+
+Each term is compiled to a correlated `Exists` subquery on the answer sets which were valid
+at the date of the network, so the database may plan the expression as a whole.
+"""
+
+import datetime
+import functools
+import json
+import typing
+
+from django.db import models as db_models
+from django.db.models import Exists, OuterRef, Q, QuerySet
+from django.forms import ValidationError
+from django.utils import timezone
+
+from . import models
+
+#: Type of a parsed filter expression
+Expression = typing.Dict[str, typing.Any]
+
+#: Kinds of object which may be filtered, with the model of each
+FILTERED_MODELS = {
+    'relationship': models.Relationship,
+    'person': models.Person,
+    'organisation': models.Organisation,
+}
+
+#: Maximum number of operators and terms in all expressions together
+MAX_SIZE = 100
+
+#: Maximum depth to which expressions may be nested
+MAX_DEPTH = 10
+
+
+def get_valid_answer_sets(entity_model: typing.Type[db_models.Model],
+                          at_date: typing.Optional[datetime.date] = None) -> QuerySet:
+    """Get the answer sets of an entity model which were valid at the end of a date."""
+    # Filter on timestamp__date doesn't seem to work on MySQL
+    # To compare datetimes we need at_date to be midnight at
+    # the *end* of the day in question - so add one day
+    if not at_date:
+        at_date = timezone.now().date()
+    at_date += timezone.timedelta(days=1)
+
+    return entity_model.answer_sets.rel.related_model.objects.filter(
+        Q(replaced_timestamp__gte=at_date) | Q(replaced_timestamp__isnull=True),
+        timestamp__lte=at_date
+    )
+
+
+def has_answers(entity_model: typing.Type[db_models.Model],
+                at_date: typing.Optional[datetime.date] = None,
+                entity: str = 'pk') -> Exists:
+    """Select entities which had answers at a date.
+
+    :param entity: Field referring to the entity in the outer query
+    """
+    answer_sets = get_valid_answer_sets(entity_model, at_date)
+    entity_field = answer_sets.model.entity_field
+
+    return Exists(answer_sets.filter(**{entity_field: OuterRef(entity)}))
+
+
+def has_any_answer(entity_model: typing.Type[db_models.Model],
+                   choices: typing.Iterable[int],
+                   at_date: typing.Optional[datetime.date] = None,
+                   entity: str = 'pk') -> Exists:
+    """Select entities whose answers at a date included any of a list of choices.
+
+    :param entity: Field referring to the entity in the outer query
+    """
+    answer_sets = get_valid_answer_sets(entity_model, at_date)
+    entity_field = answer_sets.model.entity_field
+
+    return Exists(answer_sets.filter(**{
+        entity_field: OuterRef(entity),
+        'question_answers__in': list(choices),
+    }))
+
+
+def person_organisation_has_any_answer(choices: typing.Iterable[int],
+                                       at_date: typing.Optional[datetime.date] = None) -> Exists:
+    """Select people whose organisation had answers including any of a list of choices at a date.
+
+    A person's organisation is the one given in their answers at the same date.
+    """
+    return Exists(
+        get_valid_answer_sets(models.Person, at_date).filter(
+            has_any_answer(models.Organisation, choices, at_date, entity='organisation'),
+            person=OuterRef('pk')
+        )
+    )
+
+
+#: Function to build the condition for each kind of term, for each kind of object filtered
+TERMS: typing.Dict[typing.Type[db_models.Model], typing.Dict[str, typing.Callable[..., Exists]]] = {
+    models.Relationship: {
+        'relationship': functools.partial(has_any_answer, models.Relationship),
+        'source': functools.partial(has_any_answer, models.Person, entity='source'),
+        'target': functools.partial(has_any_answer, models.Person, entity='target'),
+    },
+    models.Person: {
+        'person': functools.partial(has_any_answer, models.Person),
+        'organisation': person_organisation_has_any_answer,
+    },
+    models.Organisation: {
+        'organisation': functools.partial(has_any_answer, models.Organisation),
+    },
+}
+
+#: Model of the choices used in each kind of term
+TERM_CHOICE_MODELS = {
+    'relationship': models.RelationshipQuestionChoice,
+    'source': models.PersonQuestionChoice,
+    'target': models.PersonQuestionChoice,
+    'person': models.PersonQuestionChoice,
+    'organisation': models.OrganisationQuestionChoice,
+}
+
+
+def validate_expression(expression: typing.Any,
+                        model: typing.Type[db_models.Model],
+                        choices: typing.Dict[str, typing.Set[int]],
+                        depth: int = 1) -> int:
+    """Check that an expression is well formed for filtering a model.
+
+    :param choices: Choice ids used in terms are added to this, keyed by kind of term
+    :param depth: Depth to which this expression is nested
+    :return: Number of operators and terms in the expression
+    :raise ValidationError: If the expression is not well formed
+    """
+    if depth > MAX_DEPTH:
+        raise ValidationError(f'Filter expression is nested too deeply - the limit is {MAX_DEPTH}')
+
+    if not isinstance(expression, dict) or len(expression) != 1:
+        raise ValidationError('Each expression must be an object with a single key')
+
+    (key, value), = expression.items()
+
+    if key in ('and', 'or'):
+        if not isinstance(value, list) or not value:
+            raise ValidationError(f'"{key}" must be a non-empty list of expressions')
+
+        return 1 + sum(validate_expression(item, model, choices, depth + 1) for item in value)
+
+    if key == 'not':
+        return 1 + validate_expression(value, model, choices, depth + 1)
+
+    if key not in TERMS[model]:
+        raise ValidationError(
+            f'Unknown term "{key}" when filtering {model._meta.verbose_name_plural} - '
+            f'expected one of: {", ".join(["and", "or", "not", *TERMS[model]])}'
+        )
+
+    if (not isinstance(value, list) or not value
+            or not all(isinstance(item, int) and not isinstance(item, bool) for item in value)):
+        raise ValidationError(f'"{key}" must be a non-empty list of choice ids')
+
+    choices.setdefault(key, set()).update(value)
+
+    return 1
+
+
+def parse(value: str) -> typing.Dict[str, Expression]:
+    """Parse and validate JSON filter expressions.
+
+    :return: Expression for each kind of object filtered
+    :raise ValidationError: If the expressions are not valid
+    """
+    try:
+        expressions = json.loads(value)
+
+    except (ValueError, RecursionError) as exc:
+        raise ValidationError(f'Filter expression is not valid JSON: {exc}') from exc
+
+    if not isinstance(expressions, dict):
+        raise ValidationError('Filter expression must be an object')
+
+    unknown = set(expressions) - set(FILTERED_MODELS)
+    if unknown:
+        raise ValidationError(
+            f'Cannot filter {", ".join(sorted(unknown))} - '
+            f'expected one of: {", ".join(FILTERED_MODELS)}'
+        )
+
+    size = 0
+    choices = {}
+    for key, expression in expressions.items():
+        size += validate_expression(expression, FILTERED_MODELS[key], choices)
+
+    if size > MAX_SIZE:
+        raise ValidationError(f'Filter expression is too large - the limit is {MAX_SIZE} terms')
+
+    for key, choice_ids in choices.items():
+        # Answers to questions which are not public can't be filtered on - as in the filter forms
+        found = set(TERM_CHOICE_MODELS[key].objects.filter(
+            pk__in=choice_ids, question__answer_is_public=True
+        ).values_list('pk', flat=True))
+
+        if found != choice_ids:
+            missing = ', '.join(map(str, sorted(choice_ids - found)))
+            raise ValidationError(f'Unknown choices for "{key}": {missing}')
+
+    return expressions
+
+
+def compile_expression(expression: Expression, model: typing.Type[db_models.Model],
+                       at_date: typing.Optional[datetime.date] = None) -> Q:
+    """Compile a valid expression to a condition selecting objects of a model."""
+    (key, value), = expression.items()
+
+    if key == 'and':
+        condition = Q()
+        for item in value:
+            condition &= compile_expression(item, model, at_date)
+
+        return condition
+
+    if key == 'or':
+        condition = Q()
+        for item in value:
+            condition |= compile_expression(item, model, at_date)
+
+        return condition
+
+    if key == 'not':
+        return ~compile_expression(value, model, at_date)
+
+    return Q(TERMS[model][key](value, at_date))
@@ -3,13 +3,15 @@
 import typing
 
 from django import forms
+from django.db import transaction
+from django.urls import reverse_lazy
 
 from constance import config
 
 from bootstrap_datepicker_plus.widgets import DatePickerInput
 from django_select2.forms import ModelSelect2Widget, Select2Widget, Select2MultipleWidget
 
-from . import models
+from . import filter_expressions, models, question_cache
 
 
 class OrganisationForm(forms.ModelForm):
@@ -33,7 +35,8 @@ class PersonForm(forms.ModelForm):
 class RelationshipForm(forms.Form):
     target = forms.ModelChoiceField(
         models.Person.objects.all(),
-        widget=ModelSelect2Widget(search_fields=['name__icontains']))
+        widget=ModelSelect2Widget(search_fields=['name__icontains'],
+                                  data_url=reverse_lazy('people:person.autocomplete')))
 
 
 class DynamicAnswerSetBase(forms.Form):
@@ -51,7 +54,7 @@ class DynamicAnswerSetBase(forms.Form):
         self.negative_responses = {}
         field_order = []
 
-        for question in self.question_model.objects.all():
+        for question in question_cache.get_questions(self.question_model):
             if self.as_filters and not question.answer_is_public:
                 continue
 
@@ -88,12 +91,8 @@ class DynamicAnswerSetBase(forms.Form):
             self.fields[field_name] = field
             field_order.append(field_name)
 
-            try:
-                negative_response = question.answers.get(is_negative_response=True)
-                self.negative_responses[field_name] = negative_response.id
-            
-            except (self.answer_model.DoesNotExist, self.answer_model.MultipleObjectsReturned):
-                pass
+            if question.negative_response_id is not None:
+                self.negative_responses[field_name] = question.negative_response_id
 
             if question.allow_free_text and not self.as_filters:
                 free_field = forms.CharField(label=f'{question} free text',
@@ -103,6 +102,53 @@ class DynamicAnswerSetBase(forms.Form):
 
         self.order_fields(field_order)
 
+    def save_answers(self) -> None:
+        """Save answers to dynamic questions and make the saved answer set current.
+
+        Answers are saved with a fixed number of queries however many questions there are,
+        creating any new answers given as free text, and a snapshot of them is recorded.
+        """
+        answer_ids = set()
+        free_answers = set()
+
+        for key, value in self.cleaned_data.items():
+            if not key.startswith('question_') or not value:
+                continue
+
+            if key.endswith('_free'):
+                free_answers.add((int(key.split('_')[1]), value))
+
+            elif isinstance(value, self.answer_model):
+                answer_ids.add(value.pk)
+
+            else:
+                # Value is a QuerySet - multiple choice question
+                answer_ids.update(answer.pk for answer in value)
+
+        if free_answers:
+            # Create new answers from free text - some may already exist
+            self.answer_model.objects.bulk_create(
+                (self.answer_model(question_id=question_id, text=text)
+                 for question_id, text in free_answers),
+                ignore_conflicts=True
+            )
+
+            answer_ids.update(
+                answer['pk'] for answer in self.answer_model.objects.filter(
+                    question_id__in={question_id for question_id, _ in free_answers},
+                    text__in={text for _, text in free_answers}
+                ).order_by().values('pk', 'question_id', 'text')
+                if (answer['question_id'], answer['text']) in free_answers
+            )
+
+        self.instance.question_answers.add(*answer_ids)
+        self.instance.save_answer_snapshot()
+
+        # Update previous answer sets before making this current - saving the entity signals that
+        # the network has changed, but bulk updates don't
+        self.instance.replace_previous()
+        self.instance.mark_current()
+
 
 class OrganisationAnswerSetForm(forms.ModelForm, DynamicAnswerSetBase):
     """Form for variable organisation attributes.
@@ -139,27 +185,11 @@ class OrganisationAnswerSetForm(forms.ModelForm, DynamicAnswerSetBase):
         self.instance = super().save(commit=False)
         self.instance.organisation_id = self.initial['organisation_id']
         if commit:
-            self.instance.save()
-            # Need to call same_m2m manually since we use commit=False above
-            self.save_m2m()
-
-        if commit:
-            # Save answers to questions
-            for key, value in self.cleaned_data.items():
-                if key.startswith('question_') and value:
-                    if key.endswith('_free'):
-                        # Create new answer from free text
-                        value, _ = self.answer_model.objects.get_or_create(
-                            text=value,
-                            question=self.question_model.objects.get(
-                                pk=key.split('_')[1]))
-
-                    try:
-                        self.instance.question_answers.add(value)
-
-                    except TypeError:
-                        # Value is a QuerySet - multiple choice question
-                        self.instance.question_answers.add(*value.all())
+            with transaction.atomic():
+                self.instance.save()
+                # Need to call same_m2m manually since we use commit=False above
+                self.save_m2m()
+                self.save_answers()
 
         return self.instance
 
@@ -207,32 +237,24 @@ class PersonAnswerSetForm(forms.ModelForm, DynamicAnswerSetBase):
     question_model = models.PersonQuestion
     answer_model = models.PersonQuestionChoice
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        # Organisations are listed by the name in their current answers
+        self.fields['organisation'].queryset = models.Organisation.objects.select_related(
+            'current_answers'
+        )
+
     def save(self, commit=True) -> models.PersonAnswerSet:
         # Save model
         self.instance = super().save(commit=False)
         self.instance.person_id = self.initial['person_id']
         if commit:
-            self.instance.save()
-            # Need to call same_m2m manually since we use commit=False above
-            self.save_m2m()
-
-        if commit:
-            # Save answers to questions
-            for key, value in self.cleaned_data.items():
-                if key.startswith('question_') and value:
-                    if key.endswith('_free'):
-                        # Create new answer from free text
-                        value, _ = self.answer_model.objects.get_or_create(
-                            text=value,
-                            question=self.question_model.objects.get(
-                                pk=key.split('_')[1]))
-
-                    try:
-                        self.instance.question_answers.add(value)
-
-                    except TypeError:
-                        # Value is a QuerySet - multiple choice question
-                        self.instance.question_answers.add(*value.all())
+            with transaction.atomic():
+                self.instance.save()
+                # Need to call same_m2m manually since we use commit=False above
+                self.save_m2m()
+                self.save_answers()
 
         return self.instance
 
@@ -257,25 +279,11 @@ class RelationshipAnswerSetForm(forms.ModelForm, DynamicAnswerSetBase):
 
     def save(self, commit=True) -> models.RelationshipAnswerSet:
         # Save model
-        self.instance = super().save(commit=commit)
+        with transaction.atomic():
+            self.instance = super().save(commit=commit)
 
-        if commit:
-            # Save answers to questions
-            for key, value in self.cleaned_data.items():
-                if key.startswith('question_') and value:
-                    if key.endswith('_free'):
-                        # Create new answer from free text
-                        value, _ = self.answer_model.objects.get_or_create(
-                            text=value,
-                            question=self.question_model.objects.get(
-                                pk=key.split('_')[1]))
-
-                    try:
-                        self.instance.question_answers.add(value)
-
-                    except TypeError:
-                        # Value is a QuerySet - multiple choice question
-                        self.instance.question_answers.add(*value.all())
+            if commit:
+                self.save_answers()
 
         return self.instance
 
@@ -300,25 +308,11 @@ class OrganisationRelationshipAnswerSetForm(forms.ModelForm,
 
     def save(self, commit=True) -> models.OrganisationRelationshipAnswerSet:
         # Save model
-        self.instance = super().save(commit=commit)
+        with transaction.atomic():
+            self.instance = super().save(commit=commit)
 
-        if commit:
-            # Save answers to questions
-            for key, value in self.cleaned_data.items():
-                if key.startswith('question_') and value:
-                    if key.endswith('_free'):
-                        # Create new answer from free text
-                        value, _ = self.answer_model.objects.get_or_create(
-                            text=value,
-                            question=self.question_model.objects.get(
-                                pk=key.split('_')[1]))
-
-                    try:
-                        self.instance.question_answers.add(value)
-
-                    except TypeError:
-                        # Value is a QuerySet - multiple choice question
-                        self.instance.question_answers.add(*value.all())
+            if commit:
+                self.save_answers()
 
         return self.instance
 
@@ -345,6 +339,11 @@ class NetworkRelationshipFilterForm(FilterForm):
     answer_model = models.RelationshipQuestionChoice
     question_prefix = 'relationship_'
 
+    mutual_only = forms.BooleanField(
+        required=False,
+        help_text='Only show relationships which both people have reported'
+    )
+
 
 class NetworkPersonFilterForm(FilterForm):
     """Filer people by answerset responses."""
@@ -358,3 +357,22 @@ class NetworkOrganisationFilterForm(FilterForm):
     question_model = models.OrganisationQuestion
     answer_model = models.OrganisationQuestionChoice
     question_prefix = 'organisation_'
+
+
+class NetworkFilterExpressionForm(forms.Form):
+    """Filter the network by boolean expressions of answers.
+
+    See :mod:`people.filter_expressions` for the syntax.
+    """
+    expression = forms.CharField(
+        required=False,
+        widget=forms.Textarea(attrs={'rows': 3}),
+        help_text='Combine filters on answers with "and", "or" and "not" as JSON'
+    )
+
+    def clean_expression(self) -> typing.Dict[str, filter_expressions.Expression]:
+        value = self.cleaned_data['expression'].strip()
+        if not value:
+            return {}
+
+        return filter_expressions.parse(value)
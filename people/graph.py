@@ -0,0 +1,168 @@
+"""
+Assemble the network of :class:`Person`s and :class:`Organisation`s displayed by the network view.
+
+Each part of the network is built using a fixed number of set-based queries,
+so the cost of building the network does not grow with the number of people.
+"""
+
+import typing
+
+from django.db.models import F, QuerySet
+
+from . import models, serializers
+
+__all__ = [
+    'get_membership_set',
+    'build_network',
+    'get_elements',
+    'diff_elements',
+]
+
+#: Type of a Cytoscape element - see https://js.cytoscape.org/#notation/elements-json
+Element = typing.Dict[str, typing.Any]
+
+
+def get_membership_set(people: QuerySet) -> typing.List[typing.Dict[str, typing.Any]]:
+    """Build edges linking each :class:`Person` to the :class:`Organisation` in their answers."""
+    members = list(
+        people.filter(
+            current_answers__organisation__isnull=False
+        ).order_by().values('pk', 'name', current_organisation=F('current_answers__organisation'))
+    )
+
+    organisations = {
+        organisation['pk']: organisation
+        for organisation in models.Organisation.objects.filter(
+            pk__in={member['current_organisation'] for member in members}
+        ).order_by().values('pk', 'name')
+    }
+
+    return [
+        {
+            'pk': f'membership-{member["pk"]}',
+            'source': {
+                'pk': member['pk'],
+                'name': member['name'],
+            },
+            'target': organisations[member['current_organisation']],
+            'kind': 'organisation-membership',
+        } for member in members
+    ]
+
+
+def build_network(
+    people: QuerySet,
+    organisations: QuerySet,
+    relationships: QuerySet,
+    organisation_relationships: QuerySet,
+) -> typing.Dict[str, typing.List[typing.Dict[str, typing.Any]]]:
+    """Serialize the nodes and edges of the network.
+
+    Membership edges are included for all people - edges between nodes which have been
+    filtered out are discarded when the network is drawn.
+    """
+    organisation_relationship_set = serializers.OrganisationRelationshipSerializer(
+        organisation_relationships.select_related('source', 'target'), many=True
+    ).data
+    organisation_relationship_set.extend(get_membership_set(models.Person.objects.all()))
+
+    return {
+        'person_set': serializers.PersonSerializer(people, many=True).data,
+        'organisation_set': serializers.OrganisationSerializer(organisations, many=True).data,
+        'relationship_set': serializers.RelationshipSerializer(
+            relationships.select_related('source', 'target'), many=True
+        ).data,
+        'organisation_relationship_set': organisation_relationship_set,
+    }
+
+
+def get_elements(network: typing.Mapping[str, typing.List[typing.Dict[str, typing.Any]]]
+                 ) -> typing.Dict[str, Element]:
+    """Convert a serialized network into Cytoscape elements keyed by element id.
+
+    Edges to nodes which are not part of the network are discarded.
+    """
+    nodes = {}
+
+    for person in network['person_set']:
+        node_id = f'person-{person["pk"]}'
+        nodes[node_id] = {
+            'group': 'nodes',
+            'data': {
+                'id': node_id,
+                'name': person['name'],
+                'kind': 'person',
+            },
+        }
+
+    for organisation in network['organisation_set']:
+        node_id = f'organisation-{organisation["pk"]}'
+        nodes[node_id] = {
+            'group': 'nodes',
+            'data': {
+                'id': node_id,
+                'name': organisation['name'],
+                'kind': 'organisation',
+            },
+        }
+
+    edges = {}
+
+    for relationship in network['relationship_set']:
+        edge_id = f'relationship-{relationship["pk"]}'
+        edges[edge_id] = {
+            'group': 'edges',
+            'data': {
+                'id': edge_id,
+                'source': f'person-{relationship["source"]["pk"]}',
+                'target': f'person-{relationship["target"]["pk"]}',
+                'kind': 'person',
+            },
+        }
+
+    for relationship in network['organisation_relationship_set']:
+        edge_id = f'organisation-relationship-{relationship["pk"]}'
+        edges[edge_id] = {
+            'group': 'edges',
+            'data': {
+                'id': edge_id,
+                'source': f'person-{relationship["source"]["pk"]}',
+                'target': f'organisation-{relationship["target"]["pk"]}',
+                'kind': 'organisation',
+                'relationshipKind': relationship['kind'],
+            },
+        }
+
+    nodes.update(
+        (edge_id, edge) for edge_id, edge in edges.items()
+        if edge['data']['source'] in nodes and edge['data']['target'] in nodes
+    )
+
+    return nodes
+
+
+def diff_elements(old: typing.Mapping[str, Element],
+                  new: typing.Mapping[str, Element]) -> typing.Dict[str, typing.List]:
+    """Find the changes required to turn one set of Cytoscape elements into another.
+
+    Added and changed elements are ordered with nodes first so that edges can be added after
+    the nodes they connect.
+
+    Cytoscape can't move an existing edge to other nodes, so edges whose source or target has
+    changed - e.g. membership of a person who has moved organisation - are removed and added again.
+    """
+    def ordered(element_ids: typing.Iterable[str]) -> typing.List[Element]:
+        return sorted((new[element_id] for element_id in element_ids),
+                      key=lambda element: (element['group'] != 'nodes', element['data']['id']))
+
+    def endpoints(element: Element) -> typing.Tuple[typing.Any, typing.Any]:
+        return element['data'].get('source'), element['data'].get('target')
+
+    kept = new.keys() & old.keys()
+    moved = {key for key in kept if endpoints(new[key]) != endpoints(old[key])}
+
+    return {
+        'added': ordered((new.keys() - old.keys()) | moved),
+        'changed': ordered(key for key in kept - moved if new[key] != old[key]),
+        'removed': sorted((old.keys() - new.keys()) | moved),
+    }
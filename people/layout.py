@@ -0,0 +1,185 @@
+"""
+Compute positions of nodes in the network so that browsers don't need to lay out large networks.
+
+Uses the Fruchterman-Reingold force-directed algorithm with a grid approximation of the repulsion
+between nodes: nodes are grouped into grid cells and repel nodes in neighbouring cells exactly,
+but distant nodes are repelled by the centre of mass of each cell instead.
+"""
+
+import typing
+
+import numpy as np
+
+from .graph import Element
+
+#: Preferred distance between connected nodes - nodes are drawn with a diameter of at least 100
+IDEAL_DISTANCE = 250.
+
+#: Number of iterations to run
+ITERATIONS = 50
+
+#: Strength of the pull of each node towards the centre - keeps disconnected components together
+GRAVITY = 1.
+
+#: Maximum number of node-cell interactions to compute at once - limits memory use
+CHUNK_SIZE = 1000000
+
+#: Type of node positions as used by Cytoscape
+Position = typing.Dict[str, float]
+
+#: Offsets of grid cells neighbouring each cell, including itself
+NEIGHBOUR_OFFSETS = [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1)]
+
+
+def get_neighbour_pairs(cells: np.ndarray) -> typing.Tuple[np.ndarray, np.ndarray]:
+    """Find all pairs of different nodes which are in the same or neighbouring grid cells.
+
+    :param cells: Array of shape (n_nodes, 2) containing the grid cell of each node
+    :return: Arrays of the indices of the first and second node in each pair
+    """
+    n_rows = cells[:, 1].max() + 3
+
+    # Sort nodes by cell so that nodes in each cell are contiguous
+    cell_ids = (cells[:, 0] + 1) * n_rows + cells[:, 1] + 1
+    order = np.argsort(cell_ids, kind='stable')
+    occupied, starts, counts = np.unique(cell_ids[order], return_index=True, return_counts=True)
+
+    firsts = []
+    seconds = []
+
+    for dx, dy in NEIGHBOUR_OFFSETS:
+        # Look up the range of sorted nodes in the neighbouring cell for each node
+        neighbour_ids = cell_ids + dx * n_rows + dy
+        index = np.minimum(np.searchsorted(occupied, neighbour_ids), len(occupied) - 1)
+        found = occupied[index] == neighbour_ids
+
+        node_counts = np.where(found, counts[index], 0)
+        node_starts = starts[index]
+
+        first = np.repeat(np.arange(len(cells)), node_counts)
+        position_in_cell = np.arange(len(first)) - np.repeat(np.cumsum(node_counts) - node_counts,
+                                                             node_counts)
+        second = order[np.repeat(node_starts, node_counts) + position_in_cell]
+
+        different = first != second
+        firsts.append(first[different])
+        seconds.append(second[different])
+
+    return np.concatenate(firsts), np.concatenate(seconds)
+
+
+def get_repulsion(positions: np.ndarray, k: float) -> np.ndarray:
+    """Approximate the displacement of each node due to repulsion from all other nodes."""
+    n_nodes = len(positions)
+
+    # Balances the cost of exact repulsion within neighbouring cells against the cost of
+    # repulsion from the centre of every cell - both grow as n_nodes ** 1.5
+    n_cells = int(np.ceil((9 * n_nodes) ** 0.25))
+
+    # Outlying nodes are placed in edge cells so they don't stretch the grid
+    lower, upper = np.percentile(positions, [1, 99], axis=0)
+    extent = np.maximum(upper - lower, 1e-6)
+    cells = np.clip(((positions - lower) / extent * n_cells).astype(np.int64), 0, n_cells - 1)
+
+    # Nodes in neighbouring cells repel each other exactly
+    first, second = get_neighbour_pairs(cells)
+    delta = positions[first] - positions[second]
+    force = k * k / np.maximum((delta ** 2).sum(axis=1), 1e-4)
+    displacement = np.stack([
+        np.bincount(first, weights=delta[:, axis] * force, minlength=n_nodes) for axis in (0, 1)
+    ], axis=1)
+
+    # Nodes in distant cells repel as a single node at their centre of mass
+    cell_ids = cells[:, 0] * n_cells + cells[:, 1]
+    occupied, cell_index = np.unique(cell_ids, return_inverse=True)
+    mass = np.bincount(cell_index).astype(float)
+    centre_x = np.bincount(cell_index, weights=positions[:, 0]) / mass
+    centre_y = np.bincount(cell_index, weights=positions[:, 1]) / mass
+    cell_x = occupied // n_cells
+    cell_y = occupied % n_cells
+
+    chunk = max(1, CHUNK_SIZE // len(occupied))
+    for start in range(0, n_nodes, chunk):
+        nodes = slice(start, start + chunk)
+
+        is_distant = ((np.abs(cells[nodes, 0, np.newaxis] - cell_x) > 1)
+                      | (np.abs(cells[nodes, 1, np.newaxis] - cell_y) > 1))
+        delta_x = positions[nodes, 0, np.newaxis] - centre_x
+        delta_y = positions[nodes, 1, np.newaxis] - centre_y
+        distance_sq = np.maximum(delta_x ** 2 + delta_y ** 2, 1e-4)
+        force = np.where(is_distant, k * k * mass / distance_sq, 0)
+
+        displacement[nodes, 0] += (delta_x * force).sum(axis=1)
+        displacement[nodes, 1] += (delta_y * force).sum(axis=1)
+
+    return displacement
+
+
+def compute_positions(n_nodes: int,
+                      edges: np.ndarray,
+                      iterations: int = ITERATIONS,
+                      seed: int = 0) -> np.ndarray:
+    """Compute the position of each node in a graph.
+
+    :param n_nodes: Number of nodes in the graph
+    :param edges: Array of shape (n_edges, 2) containing the indices of nodes joined by each edge
+    :param iterations: Number of iterations to run
+    :param seed: Seed for random initial positions - so the same graph is laid out the same way
+    :return: Array of shape (n_nodes, 2) containing the position of each node
+    """
+    if n_nodes < 2:
+        return np.zeros((n_nodes, 2))
+
+    k = IDEAL_DISTANCE
+    size = k * np.sqrt(n_nodes)
+
+    rng = np.random.default_rng(seed)
+    positions = rng.uniform(-size / 2, size / 2, (n_nodes, 2))
+
+    temperature = size / 10
+
+    for i in range(iterations):
+        displacement = get_repulsion(positions, k)
+
+        # Attraction along edges
+        if len(edges):
+            delta = positions[edges[:, 0]] - positions[edges[:, 1]]
+            distance = np.linalg.norm(delta, axis=1)
+            pull = delta * (distance / k)[:, np.newaxis]
+            for axis in (0, 1):
+                displacement[:, axis] += (
+                    np.bincount(edges[:, 1], weights=pull[:, axis], minlength=n_nodes)
+                    - np.bincount(edges[:, 0], weights=pull[:, axis], minlength=n_nodes)
+                )
+
+        displacement -= GRAVITY * positions
+
+        # Limit movement by the current temperature, which cools as the layout settles
+        length = np.maximum(np.linalg.norm(displacement, axis=1), 1e-6)
+        positions += displacement * (np.minimum(length, temperature) / length)[:, np.newaxis]
+        temperature = size / 10 * (1 - (i + 1) / iterations) + 1
+
+    return positions - positions.mean(axis=0)
+
+
+def layout_elements(elements: typing.Mapping[str, Element]) -> typing.Dict[str, Position]:
+    """Compute the position of each node in a set of Cytoscape elements.
+
+    :return: Position of each node keyed by element id - suitable for a Cytoscape `preset` layout
+    """
+    node_ids = sorted(
+        element_id for element_id, element in elements.items() if element['group'] == 'nodes'
+    )
+    node_index = {node_id: i for i, node_id in enumerate(node_ids)}
+
+    edges = np.array([
+        (node_index[element['data']['source']], node_index[element['data']['target']])
+        for element in elements.values() if element['group'] == 'edges'
+    ], dtype=np.int64).reshape(-1, 2)
+
+    positions = compute_positions(len(node_ids), edges)
+
+    return {
+        node_id: {'x': round(float(x), 1), 'y': round(float(y), 1)}
+        for node_id, (x, y) in zip(node_ids, positions)
+    }
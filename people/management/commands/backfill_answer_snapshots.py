@@ -0,0 +1,34 @@
+"""
+Record a snapshot of the answers of every answer set which doesn't have one.
+
+Run after loading data which did not go through the answer set forms - e.g. after a
+database restore or after migrating from a version without the `answer_snapshot` field.
+"""
+
+from django.core.management.base import BaseCommand
+
+from people import models
+
+
+class Command(BaseCommand):
+    help = 'Record a snapshot of the answers of every answer set which does not have one'
+
+    #: Answer set models to backfill
+    answer_set_models = [
+        models.PersonAnswerSet,
+        models.OrganisationAnswerSet,
+        models.RelationshipAnswerSet,
+        models.OrganisationRelationshipAnswerSet,
+    ]
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Number of answer sets to update with each query')
+
+    def handle(self, *args, **options):
+        for model in self.answer_set_models:
+            count = model.backfill_answer_snapshots(batch_size=options['batch_size'])
+
+            self.stdout.write(
+                f'Recorded answer snapshots for {count} {model._meta.verbose_name_plural}'
+            )
@@ -0,0 +1,68 @@
+"""
+Set the current answer set of every entity from its history of answer sets.
+
+Run after loading data which did not go through the answer set forms - e.g. after a
+database restore or after migrating from a version without the `current_answers` field.
+
+Only entities without current answers are updated unless `--all` is given, so this is cheap to
+run when there is nothing to do - it is run each time the server starts.
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Subquery
+
+from people import answer_index, models, network_cache, network_metrics
+
+
+class Command(BaseCommand):
+    help = 'Set the current answer set of every person, organisation and relationship'
+
+    #: Entity models, with whether their current answers must not have been replaced
+    entity_models = [
+        (models.Person, False),
+        (models.Organisation, False),
+        (models.Relationship, True),
+        (models.OrganisationRelationship, True),
+    ]
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true',
+                            help='Update entities which already have current answers')
+
+    def handle(self, *args, **options):
+        total = 0
+
+        with transaction.atomic():
+            for model, require_current in self.entity_models:
+                answer_set_model = model.answer_sets.rel.related_model
+
+                answer_sets = answer_set_model.objects.filter(
+                    **{answer_set_model.entity_field: OuterRef('pk')}
+                )
+                if require_current:
+                    # Relationships which have been ended have no current answers
+                    answer_sets = answer_sets.filter(replaced_timestamp__isnull=True)
+
+                latest = answer_sets.order_by('-timestamp', '-pk').values('pk')[:1]
+
+                entities = model.objects.all()
+                if not options['all']:
+                    entities = entities.filter(Exists(answer_sets), current_answers__isnull=True)
+
+                count = entities.update(current_answers=Subquery(latest))
+                total += count
+
+                self.stdout.write(
+                    f'Updated current answers for {count} {model._meta.verbose_name_plural}'
+                )
+
+        if not total:
+            return
+
+        # Bulk updates don't send signals to invalidate caches or update metrics
+        network_cache.invalidate()
+        network_metrics.rebuild()
+
+        for model, _ in self.entity_models:
+            answer_index.invalidate(model)
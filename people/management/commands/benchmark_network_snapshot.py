@@ -0,0 +1,115 @@
+"""
+Measure the time taken to build the network as it was at a past date.
+
+Synthetic networks of increasing size are created in a test database created for the benchmark,
+so existing data is never touched - each network is rolled back before the next is created.
+The site's cache is not used either, so cached questions and networks are left as they are.
+"""
+
+import json
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import (override_settings, setup_databases, setup_test_environment,
+                               teardown_databases, teardown_test_environment)
+
+from people import benchmark, forms, graph, models
+from people.views import network
+
+
+class Command(BaseCommand):
+    help = ('Measure the time taken to build the network as at a past date '
+            'against number of answer sets')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int, default=[100, 1000],
+                            help='Number of people in each synthetic network')
+        parser.add_argument(
+            '--revisions', type=int, default=5,
+            help='Number of answer sets for each person, organisation and relationship'
+        )
+        parser.add_argument('--relationships-per-person', type=int, default=5)
+        parser.add_argument(
+            '--repeat', type=int, default=3,
+            help='Number of times to repeat each measurement - the fastest is reported'
+        )
+
+    @staticmethod
+    def build_snapshot(filter_forms, at_date) -> int:
+        """Build the unfiltered network as it was at a date and return the number of edges."""
+        network_data = graph.build_network(
+            network.filter_people(filter_forms['person'], at_date=at_date),
+            network.filter_organisations(filter_forms['organisation'], at_date=at_date),
+            network.filter_relationships(filter_forms['relationship'], at_date=at_date),
+            models.OrganisationRelationship.objects.all(),
+        )
+
+        return len(network_data['relationship_set'])
+
+    def measure(self, size: int, options) -> None:
+        """Create a synthetic network of a size and measure building it at each revision date."""
+        with transaction.atomic():
+            benchmark.create_synthetic_dataset(
+                n_people=size,
+                n_organisations=max(1, size // 10),
+                n_relationships=size * options['relationships_per_person'],
+                n_revisions=options['revisions']
+            )
+
+            n_answer_sets = sum(
+                model.objects.count() for model in (
+                    models.PersonAnswerSet,
+                    models.OrganisationAnswerSet,
+                    models.RelationshipAnswerSet,
+                    models.OrganisationRelationshipAnswerSet,
+                )
+            )
+
+            filter_forms = {
+                'relationship': forms.NetworkRelationshipFilterForm(data={}),
+                'person': forms.NetworkPersonFilterForm(data={}),
+                'organisation': forms.NetworkOrganisationFilterForm(data={}),
+            }
+            for form in filter_forms.values():
+                form.full_clean()
+
+            # Midway through each revision, then today
+            dates = [
+                (timestamp + benchmark.REVISION_INTERVAL / 2).date()
+                for timestamp in benchmark.revision_dates(options['revisions'])
+            ] + [None]
+
+            for at_date in dates:
+                n_edges = self.build_snapshot(filter_forms, at_date)
+                seconds = benchmark.best_time(
+                    # pylint: disable=cell-var-from-loop
+                    lambda: self.build_snapshot(filter_forms, at_date),
+                    repeat=options['repeat']
+                )
+
+                self.stdout.write(json.dumps({
+                    'people': size,
+                    'answer_sets': n_answer_sets,
+                    'date': at_date.isoformat() if at_date else None,
+                    'relationships': n_edges,
+                    'seconds': seconds,
+                }))
+
+            transaction.set_rollback(True)
+
+        # Questions and networks cached while measuring must not outlive the rolled back data
+        cache.clear()
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+
+        try:
+            with override_settings(CACHES=benchmark.BENCHMARK_CACHES):
+                for size in options['sizes']:
+                    self.measure(size, options)
+
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
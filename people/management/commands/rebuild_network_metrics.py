@@ -0,0 +1,19 @@
+"""
+Recompute the stored network metrics of every person.
+
+Run after loading data which did not go through the application - e.g. after a database
+restore or after migrating from a version without stored network metrics.
+"""
+
+from django.core.management.base import BaseCommand
+
+from people import network_metrics
+
+
+class Command(BaseCommand):
+    help = 'Recompute the stored network metrics of every person'
+
+    def handle(self, *args, **options):
+        count = network_metrics.rebuild()
+
+        self.stdout.write(f'Stored network metrics for {count} people')
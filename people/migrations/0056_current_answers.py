@@ -0,0 +1,34 @@
+# Generated by Django 4.1.4 on 2026-10-18 08:56
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('people', '0055_remove_organisationrelationship_unique_relationship_organisationrelationship_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='organisation',
+            name='current_answers',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='people.organisationanswerset'),
+        ),
+        migrations.AddField(
+            model_name='organisationrelationship',
+            name='current_answers',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='people.organisationrelationshipanswerset'),
+        ),
+        migrations.AddField(
+            model_name='person',
+            name='current_answers',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='people.personanswerset'),
+        ),
+        migrations.AddField(
+            model_name='relationship',
+            name='current_answers',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='people.relationshipanswerset'),
+        ),
+    ]
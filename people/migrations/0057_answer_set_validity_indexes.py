@@ -0,0 +1,45 @@
+# Generated by Django 4.1.4 on 2026-10-18 08:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('people', '0056_current_answers'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='organisationanswerset',
+            index=models.Index(fields=['organisation', 'timestamp', 'replaced_timestamp'], name='org_as_history_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='organisationanswerset',
+            index=models.Index(fields=['replaced_timestamp', 'timestamp', 'organisation'], name='org_as_validity_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='organisationrelationshipanswerset',
+            index=models.Index(fields=['relationship', 'timestamp', 'replaced_timestamp'], name='orgrel_as_history_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='organisationrelationshipanswerset',
+            index=models.Index(fields=['replaced_timestamp', 'timestamp', 'relationship'], name='orgrel_as_validity_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='personanswerset',
+            index=models.Index(fields=['person', 'timestamp', 'replaced_timestamp'], name='person_as_history_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='personanswerset',
+            index=models.Index(fields=['replaced_timestamp', 'timestamp', 'person'], name='person_as_validity_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='relationshipanswerset',
+            index=models.Index(fields=['relationship', 'timestamp', 'replaced_timestamp'], name='rel_as_history_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='relationshipanswerset',
+            index=models.Index(fields=['replaced_timestamp', 'timestamp', 'relationship'], name='rel_as_validity_idx'),
+        ),
+    ]
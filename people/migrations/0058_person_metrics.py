@@ -0,0 +1,30 @@
+# Generated by Django 4.1.4 on 2026-10-18 09:29
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('people', '0057_answer_set_validity_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PersonMetrics',
+            fields=[
+                ('person', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='metrics', serialize=False, to='people.person')),
+                ('out_degree', models.PositiveIntegerField(default=0)),
+                ('in_degree', models.PositiveIntegerField(default=0)),
+                ('degree', models.PositiveIntegerField(default=0)),
+                ('reciprocated_degree', models.PositiveIntegerField(default=0)),
+                ('component', models.PositiveIntegerField(db_index=True)),
+                ('component_size', models.PositiveIntegerField(default=1)),
+                ('updated', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'person metrics',
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.1.4 on 2026-10-18 09:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('people', '0058_person_metrics'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='organisationanswerset',
+            index=models.Index(fields=['latitude', 'longitude'], name='org_as_location_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='personanswerset',
+            index=models.Index(fields=['latitude', 'longitude'], name='person_as_location_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+#: Trigram indexes supporting name search - `UPPER` matches case-insensitive `LIKE` lookups
+TRIGRAM_INDEXES = [
+    ('person_name_trgm_idx', 'people_person', 'name'),
+    ('person_name_upper_trgm_idx', 'people_person', 'UPPER(name)'),
+    ('org_name_trgm_idx', 'people_organisation', 'name'),
+    ('org_name_upper_trgm_idx', 'people_organisation', 'UPPER(name)'),
+]
+
+
+def create_indexes(apps, schema_editor):
+    # Trigram indexes are only supported by PostgreSQL
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    for name, table, expression in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin (({expression}) gin_trgm_ops)'
+        )
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    for name, _, _ in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('people', '0059_answer_set_location_indexes'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
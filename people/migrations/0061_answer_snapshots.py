@@ -0,0 +1,33 @@
+# Generated by Django 4.1.4 on 2026-10-18 09:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('people', '0060_name_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='organisationanswerset',
+            name='answer_snapshot',
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='organisationrelationshipanswerset',
+            name='answer_snapshot',
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='personanswerset',
+            name='answer_snapshot',
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='relationshipanswerset',
+            name='answer_snapshot',
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,37 @@
+from django.db import migrations
+
+#: Trigram indexes supporting search on the current name of organisations - see 0060
+TRIGRAM_INDEXES = [
+    ('orgset_name_trgm_idx', 'people_organisationanswerset', 'name'),
+    ('orgset_name_upper_trgm_idx', 'people_organisationanswerset', 'UPPER(name)'),
+]
+
+
+def create_indexes(apps, schema_editor):
+    # Trigram indexes are only supported by PostgreSQL
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    for name, table, expression in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin (({expression}) gin_trgm_ops)'
+        )
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    for name, _, _ in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('people', '0061_answer_snapshots'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
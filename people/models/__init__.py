@@ -1,3 +1,4 @@
+from .metrics import *  # noqa
 from .organisation import *  # noqa
 from .person import *  # noqa
 from .question import *  # noqa
@@ -0,0 +1,55 @@
+"""Models storing precomputed network metrics."""
+
+from django.db import models
+
+from .person import Person
+
+__all__ = [
+    'PersonMetrics',
+]
+
+
+class PersonMetrics(models.Model):
+    """
+    Network metrics of a :class:`Person`, kept up to date as their relationships change.
+
+    Only current relationships between people are counted - see :mod:`people.network_metrics`.
+    """
+    class Meta:
+        verbose_name_plural = 'person metrics'
+
+    #: Person these metrics describe
+    person = models.OneToOneField(Person,
+                                  related_name='metrics',
+                                  on_delete=models.CASCADE,
+                                  primary_key=True)
+
+    #: Number of current relationships reported by this person
+    out_degree = models.PositiveIntegerField(default=0,
+                                             blank=False, null=False)
+
+    #: Number of current relationships reported with this person
+    in_degree = models.PositiveIntegerField(default=0,
+                                            blank=False, null=False)
+
+    #: Number of people with a current relationship with this person in either direction
+    degree = models.PositiveIntegerField(default=0,
+                                         blank=False, null=False)
+
+    #: Number of people with a current relationship with this person in both directions
+    reciprocated_degree = models.PositiveIntegerField(default=0,
+                                                      blank=False, null=False)
+
+    #: Connected component containing this person - identified by the smallest person pk in it
+    component = models.PositiveIntegerField(db_index=True,
+                                            blank=False, null=False)
+
+    #: Number of people in the connected component containing this person
+    component_size = models.PositiveIntegerField(default=1,
+                                                 blank=False, null=False)
+
+    #: When these metrics were last changed
+    updated = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f'Metrics for {self.person}'
@@ -49,6 +49,14 @@ class Organisation(models.Model):
 
     name = models.CharField(max_length=255, blank=False, null=False)
 
+    #: Latest answers about this organisation - kept up to date when a new answer set is saved
+    current_answers = models.ForeignKey('OrganisationAnswerSet',
+                                        related_name='+',
+                                        on_delete=models.SET_NULL,
+                                        editable=False,
+                                        blank=True,
+                                        null=True)
+
     def __str__(self) -> str:
         # Prefer name as in latest OrganisationAnswerSet
         try:
@@ -59,18 +67,27 @@ class Organisation(models.Model):
 
         return name or self.name
 
-    @property
-    def current_answers(self) -> 'OrganisationAnswerSet':
-        return self.answer_sets.last()
-
     def get_absolute_url(self):
         return reverse('people:organisation.detail', kwargs={'pk': self.pk})
 
 
 class OrganisationAnswerSet(AnswerSet):
     """The answers to the organisation questions at a particular point in time."""
+    class Meta(AnswerSet.Meta):
+        indexes = [
+            # Answer set history of a single organisation
+            models.Index(fields=['organisation', 'timestamp', 'replaced_timestamp'],
+                         name='org_as_history_idx'),
+            # Answer sets valid at a point in time
+            models.Index(fields=['replaced_timestamp', 'timestamp', 'organisation'],
+                         name='org_as_validity_idx'),
+            # Answer sets within a map viewport
+            models.Index(fields=['latitude', 'longitude'],
+                         name='org_as_location_idx'),
+        ]
 
     question_model = OrganisationQuestion
+    entity_field = 'organisation'
 
     #: Organisation to which this answer set belongs
     organisation = models.ForeignKey(Organisation,
@@ -124,6 +141,7 @@ class OrganisationAnswerSet(AnswerSet):
             'id',
             'timestamp',
             'replaced_timestamp',
+            'answer_snapshot',
             'organisation_id',
             'question_answers',
         }
@@ -147,20 +165,8 @@ class OrganisationAnswerSet(AnswerSet):
             if field.attname not in exclude_fields
         }
 
-        for answer in self.question_answers.all():
-            question = answer.question
-            field_name = f'question_{question.pk}'
-
-            if question.is_multiple_choice:
-                if field_name not in answers:
-                    answers[field_name] = []
-
-                answers[field_name].append(answer.pk)
-
-            else:
-                answers[field_name] = answer.pk
-
-        return answers
+        # Add answers to dynamic questions
+        return super().as_dict(answers=answers)
 
     def get_absolute_url(self):
         return self.organisation.get_absolute_url()
@@ -118,15 +118,19 @@ class Person(models.Model):
         through='OrganisationRelationship',
         through_fields=('source', 'target'))
 
+    #: Latest answers about this person - kept up to date when a new answer set is saved
+    current_answers = models.ForeignKey('PersonAnswerSet',
+                                        related_name='+',
+                                        on_delete=models.SET_NULL,
+                                        editable=False,
+                                        blank=True,
+                                        null=True)
+
     @property
     def relationships(self):
         return self.relationships_as_source.all().union(
             self.relationships_as_target.all())
 
-    @property
-    def current_answers(self) -> 'PersonAnswerSet':
-        return self.answer_sets.last()
-
     @property
     def organisation(self) -> Organisation:
         return self.current_answers.organisation
@@ -144,7 +148,21 @@ class Person(models.Model):
 
 class PersonAnswerSet(AnswerSet):
     """The answers to the person questions at a particular point in time."""
+    class Meta(AnswerSet.Meta):
+        indexes = [
+            # Answer set history of a single person
+            models.Index(fields=['person', 'timestamp', 'replaced_timestamp'],
+                         name='person_as_history_idx'),
+            # Answer sets valid at a point in time
+            models.Index(fields=['replaced_timestamp', 'timestamp', 'person'],
+                         name='person_as_validity_idx'),
+            # Answer sets within a map viewport
+            models.Index(fields=['latitude', 'longitude'],
+                         name='person_as_location_idx'),
+        ]
+
     question_model = PersonQuestion
+    entity_field = 'person'
 
     #: Person to which this answer set belongs
     person = models.ForeignKey(Person,
@@ -214,6 +232,7 @@ class PersonAnswerSet(AnswerSet):
             'id',
             'timestamp',
             'replaced_timestamp',
+            'answer_snapshot',
             'person_id',
             'question_answers',
         }
@@ -3,6 +3,7 @@ import abc
 import typing
 
 from django.db import models
+from django.utils import timezone
 from django.utils.text import slugify
 
 __all__ = [
@@ -10,6 +11,15 @@ __all__ = [
     'QuestionChoice',
 ]
 
+#: Answers to dynamic questions keyed by question id - each with a list of the id and text of
+#: each answer::
+#:
+#:     {"3": {"answers": [[12, "Researcher"]]}}
+#:
+#: Nothing else about the question is stored, so snapshots don't need rebuilding when questions
+#: change. Snapshots recorded before may also hold the slug of each question, which is not used.
+AnswerSnapshot = typing.Dict[str, typing.Dict[str, typing.Any]]
+
 
 class Question(models.Model):
     """Questions from which a survey form can be created."""
@@ -148,6 +158,10 @@ class AnswerSet(models.Model):
     #                            blank=False,
     #                            null=False)
 
+    #: Name of the foreign key to the entity to which this answer set belongs
+    #: This must be set on each concrete subclass
+    entity_field: str
+
     @abc.abstractproperty
     def question_answers(self) -> models.QuerySet:
         """Answers to :class:`Question`s.
@@ -165,22 +179,125 @@ class AnswerSet(models.Model):
                                               null=True,
                                               editable=False)
 
+    #: Answers to dynamic questions, recorded when the answers are saved so they may be read
+    #: without joining to the answer and question tables - see :meth:`build_answer_snapshot`.
+    #: `None` if no snapshot has been recorded.
+    answer_snapshot = models.JSONField(blank=True, null=True, editable=False)
+
     @property
     def is_current(self) -> bool:
         return self.replaced_timestamp is None
 
-    def build_question_answers(self,
-                               show_all: bool = False,
-                               use_slugs: bool = False) -> typing.Dict[str, str]:
-        """Collect answers to dynamic questions and join with commas."""
-        questions = self.question_model.objects.all()
+    def replace_previous(self) -> int:
+        """Mark all other current answer sets of the entity to which this belongs as replaced.
+
+        :return: Number of answer sets replaced
+        """
+        return type(self).objects.filter(
+            **{self.entity_field: getattr(self, f'{self.entity_field}_id')},
+            replaced_timestamp__isnull=True
+        ).exclude(pk=self.pk).update(replaced_timestamp=timezone.now().date())
+
+    def mark_current(self) -> None:
+        """Record this as the current answer set of the entity to which it belongs."""
+        entity = getattr(self, self.entity_field)
+        entity.current_answers = self
+        entity.save(update_fields=['current_answers'])
+
+    def get_answers(self) -> typing.Dict[int, typing.List[typing.List[typing.Any]]]:
+        """Get the id and text of the answers to each dynamic question, keyed by question id.
+
+        Answers are read from the snapshot if one has been recorded, else from `question_answers` -
+        prefetched if available.
+        """
+        if self.answer_snapshot is not None:
+            return {
+                int(question_id): question['answers']
+                for question_id, question in self.answer_snapshot.items()
+            }
+
+        answers = {}
+        # Use `all` so that prefetched answers are used if available
+        for answer in self.question_answers.all():
+            answers.setdefault(answer.question_id, []).append([answer.pk, answer.text])
+
+        return answers
+
+    def build_answer_snapshot(self) -> AnswerSnapshot:
+        """Collect answers to dynamic questions in the format of `answer_snapshot`."""
+        snapshot = {}
+        for row in self.question_answers.values_list('pk', 'text', 'question_id'):
+            add_to_snapshot(snapshot, *row)
+
+        return snapshot
+
+    def save_answer_snapshot(self) -> None:
+        """Record a snapshot of the answers to dynamic questions once they have been saved."""
+        self.answer_snapshot = self.build_answer_snapshot()
+        self.save(update_fields=['answer_snapshot'])
+
+    @classmethod
+    def save_answer_snapshots(cls, pks: typing.Sequence[int], batch_size: int = 1000) -> None:
+        """Record a snapshot of the answers of many answer sets.
+
+        Answers are read with a single query for each batch of answer sets.
+        """
+        for start in range(0, len(pks), batch_size):
+            answer_sets = {
+                pk: cls(pk=pk, answer_snapshot={})
+                for pk in pks[start:start + batch_size]
+            }
+
+            for pk, answer_pk, *answer in cls.objects.filter(pk__in=answer_sets).order_by(
+                'question_answers__question__order',
+                'question_answers__order',
+                'question_answers__text',
+            ).values_list(
+                'pk',
+                'question_answers',
+                'question_answers__text',
+                'question_answers__question_id',
+            ):
+                # Answer sets with no answers have a single row with no answer
+                if answer_pk is not None:
+                    add_to_snapshot(answer_sets[pk].answer_snapshot, answer_pk, *answer)
+
+            cls.objects.bulk_update(answer_sets.values(), ['answer_snapshot'])
+
+    @classmethod
+    def backfill_answer_snapshots(cls, batch_size: int = 1000) -> int:
+        """Record a snapshot of the answers of every answer set which doesn't have one.
+
+        :return: Number of answer sets updated
+        """
+        pks = list(cls.objects.filter(answer_snapshot__isnull=True).values_list('pk', flat=True))
+        cls.save_answer_snapshots(pks, batch_size=batch_size)
+
+        return len(pks)
 
-        if not show_all:
-            questions = questions.filter(answer_is_public=True)
+    def build_question_answers(
+            self,
+            show_all: bool = False,
+            use_slugs: bool = False,
+            questions: typing.Optional[typing.Iterable[Question]] = None) -> typing.Dict[str, str]:
+        """Collect answers to dynamic questions and join with commas.
+
+        :param questions: Questions to collect answers for - if not provided these are read from
+            the question cache.  Answer sets which may not have a snapshot should have
+            `question_answers` prefetched when collecting answers for many of them.
+        """
+        if questions is None:
+            # Imported here to avoid a circular import
+            from .. import question_cache
+
+            questions = [
+                question for question in question_cache.get_questions(self.question_model)
+                if show_all or question.answer_is_public
+            ]
 
         question_answers = {}
         try:
-            answerset_answers = list(self.question_answers.order_by().values('text', 'question_id'))
+            answerset_answers = self.get_answers()
 
             for question in questions:
                 key = question.slug if use_slugs else question.text
@@ -192,8 +309,7 @@ class AnswerSet(models.Model):
 
                 else:
                     answer = ', '.join(
-                        answer['text'] for answer in answerset_answers
-                        if answer['question_id'] == question.id
+                        text for _, text in answerset_answers.get(question.id, [])
                     )
 
                 question_answers[key] = answer
@@ -206,20 +322,77 @@ class AnswerSet(models.Model):
 
     def as_dict(self, answers: typing.Optional[typing.Dict[str, typing.Any]] = None):
         """Get the answers from this set as a dictionary for use in Form.initial."""
+        # Imported here to avoid a circular import
+        from .. import question_cache
+
         if answers is None:
             answers = {}
 
-        for answer in self.question_answers.all():
-            question = answer.question
-            field_name = f'question_{question.pk}'
+        multiple_choice = {
+            question.pk
+            for question in question_cache.get_questions(self.question_model)
+            if question.is_multiple_choice
+        }
 
-            if question.is_multiple_choice:
-                if field_name not in answers:
-                    answers[field_name] = []
+        for question_id, question_answers in self.get_answers().items():
+            field_name = f'question_{question_id}'
 
-                answers[field_name].append(answer.pk)
+            if question_id in multiple_choice:
+                answers[field_name] = [answer_pk for answer_pk, _ in question_answers]
 
             else:
-                answers[field_name] = answer.pk
+                answers[field_name] = question_answers[-1][0]
 
         return answers
+
+
+def add_to_snapshot(snapshot: AnswerSnapshot, answer_pk: int, answer_text: str,
+                    question_pk: int) -> None:
+    """Add an answer to an answer snapshot."""
+    question = snapshot.setdefault(str(question_pk), {
+        'answers': [],
+    })
+    question['answers'].append([answer_pk, answer_text])
+
+
+def get_answer_set_model(choice_model: typing.Type[QuestionChoice]) -> typing.Type[AnswerSet]:
+    """Get the answer set model whose answers are choices of a choice model."""
+    for relation in choice_model._meta.related_objects:
+        if relation.many_to_many and issubclass(relation.related_model, AnswerSet):
+            return relation.related_model
+
+    raise LookupError(f'No answer set model has answers of {choice_model._meta.label}')
+
+
+def choice_deleting(sender: typing.Type[QuestionChoice], instance: QuestionChoice,
+                    **kwargs) -> None:
+    """Record which answer sets include a choice before it is deleted - they can't be found after.
+
+    May be connected directly as a `pre_delete` signal receiver for choice models.
+    """
+    instance.answer_set_pks = list(
+        get_answer_set_model(sender).objects.filter(
+            question_answers=instance
+        ).values_list('pk', flat=True)
+    )
+
+
+def choice_changed(sender: typing.Type[QuestionChoice], instance: QuestionChoice,
+                   **kwargs) -> None:
+    """Rebuild the snapshots of answer sets which include a choice when it is changed or deleted.
+
+    May be connected directly as a `post_save` or `post_delete` signal receiver for choice models.
+    """
+    answer_set_model = get_answer_set_model(sender)
+
+    try:
+        pks = instance.answer_set_pks
+
+    except AttributeError:
+        pks = list(
+            answer_set_model.objects.filter(
+                question_answers=instance
+            ).values_list('pk', flat=True)
+        )
+
+    answer_set_model.save_answer_snapshots(pks)
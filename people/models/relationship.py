@@ -1,8 +1,7 @@
 """Models describing relationships between people."""
 
-import typing
-
 from django.db import models
+from django.db.models import ExpressionWrapper, F, FilteredRelation, Q
 from django.urls import reverse
 
 from .person import Organisation, Person
@@ -40,8 +39,39 @@ class RelationshipQuestionChoice(QuestionChoice):
         ]
 
 
+class RelationshipQuerySet(models.QuerySet):
+    """Queries on :class:`Relationship`s which need the reverse of each relationship."""
+
+    def with_reverse(self) -> 'RelationshipQuerySet':
+        """Annotate each relationship with its reverse, found by a single self-join.
+
+        Adds `reverse_id` - the pk of the reverse relationship or `None` if there isn't one -
+        and `reverse_is_current` - whether the reverse relationship exists and is current.
+        """
+        return self.annotate(
+            reverse_relationship=FilteredRelation(
+                'target__relationships_as_source',
+                condition=Q(target__relationships_as_source__target=F('source'))
+            )
+        ).annotate(
+            reverse_id=F('reverse_relationship__pk'),
+            reverse_is_current=ExpressionWrapper(
+                Q(reverse_relationship__current_answers__isnull=False),
+                output_field=models.BooleanField()
+            ),
+        )
+
+    def mutual(self) -> 'RelationshipQuerySet':
+        """Select only relationships whose reverse is also selected by this queryset."""
+        selected = self.values('pk')
+
+        return self.with_reverse().filter(reverse_id__in=selected)
+
+
 class Relationship(models.Model):
     """A directional relationship between two people allowing linked questions."""
+    objects = RelationshipQuerySet.as_manager()
+
     class Meta:
         constraints = [
             models.UniqueConstraint(fields=['source', 'target'],
@@ -62,22 +92,17 @@ class Relationship(models.Model):
                                blank=False,
                                null=False)
 
-    @property
-    def current_answers(self) -> typing.Optional['RelationshipAnswerSet']:
-        try:
-            answer_set = self.answer_sets.latest()
-            if answer_set.is_current:
-                return answer_set
-
-        except RelationshipAnswerSet.DoesNotExist:
-            # No AnswerSet created yet
-            pass
-
-        return None
+    #: Latest answers about this relationship - cleared when the relationship is ended
+    current_answers = models.ForeignKey('RelationshipAnswerSet',
+                                        related_name='+',
+                                        on_delete=models.SET_NULL,
+                                        editable=False,
+                                        blank=True,
+                                        null=True)
 
     @property
     def is_current(self) -> bool:
-        return self.current_answers is not None
+        return self.current_answers_id is not None
 
     def get_absolute_url(self):
         return reverse('people:relationship.detail', kwargs={'pk': self.pk})
@@ -90,6 +115,9 @@ class Relationship(models.Model):
         """
         Get the reverse of this relationship.
 
+        Use :meth:`RelationshipQuerySet.with_reverse` instead when the reverse of
+        many relationships is needed.
+
         @raise Relationship.DoesNotExist: When the reverse relationship is not known
         """
         return type(self).objects.get(source=self.target, target=self.source)
@@ -97,8 +125,18 @@ class Relationship(models.Model):
 
 class RelationshipAnswerSet(AnswerSet):
     """The answers to the relationship questions at a particular point in time."""
+    class Meta(AnswerSet.Meta):
+        indexes = [
+            # Answer set history of a single relationship
+            models.Index(fields=['relationship', 'timestamp', 'replaced_timestamp'],
+                         name='rel_as_history_idx'),
+            # Answer sets valid at a point in time
+            models.Index(fields=['replaced_timestamp', 'timestamp', 'relationship'],
+                         name='rel_as_validity_idx'),
+        ]
 
     question_model = RelationshipQuestion
+    entity_field = 'relationship'
 
     #: Relationship to which this answer set belongs
     relationship = models.ForeignKey(Relationship,
@@ -158,22 +196,17 @@ class OrganisationRelationship(models.Model):
         blank=False,
         null=False)
 
-    @property
-    def current_answers(self) -> typing.Optional['OrganisationRelationshipAnswerSet']:
-        try:
-            answer_set = self.answer_sets.latest()
-            if answer_set.is_current:
-                return answer_set
-
-        except OrganisationRelationshipAnswerSet.DoesNotExist:
-            # No AnswerSet created yet
-            pass
-
-        return None
+    #: Latest answers about this relationship - cleared when the relationship is ended
+    current_answers = models.ForeignKey('OrganisationRelationshipAnswerSet',
+                                        related_name='+',
+                                        on_delete=models.SET_NULL,
+                                        editable=False,
+                                        blank=True,
+                                        null=True)
 
     @property
     def is_current(self) -> bool:
-        return self.current_answers is not None
+        return self.current_answers_id is not None
 
     def get_absolute_url(self):
         return reverse('people:organisation.relationship.detail',
@@ -185,8 +218,18 @@ class OrganisationRelationship(models.Model):
 
 class OrganisationRelationshipAnswerSet(AnswerSet):
     """The answers to the organisation relationship questions at a particular point in time."""
+    class Meta(AnswerSet.Meta):
+        indexes = [
+            # Answer set history of a single relationship
+            models.Index(fields=['relationship', 'timestamp', 'replaced_timestamp'],
+                         name='orgrel_as_history_idx'),
+            # Answer sets valid at a point in time
+            models.Index(fields=['replaced_timestamp', 'timestamp', 'relationship'],
+                         name='orgrel_as_validity_idx'),
+        ]
 
     question_model = OrganisationRelationshipQuestion
+    entity_field = 'relationship'
 
     #: OrganisationRelationship to which this answer set belongs
     relationship = models.ForeignKey(OrganisationRelationship,
@@ -0,0 +1,136 @@
+"""
+Cache the serialized network displayed by the network view.
+
+Cached networks are keyed by a version which is replaced whenever any of the data
+displayed in the network changes, so a stale network is never served.
+
+Snapshots of the elements sent to clients are also stored, so that a client
+can later be sent only the elements which have changed. Node positions and network
+metrics computed for each network are cached alongside it.
+"""
+
+import datetime
+import hashlib
+import json
+import typing
+import uuid
+
+from django import forms
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+#: Cache key under which the current network version is stored
+VERSION_KEY = 'people:network:version'
+
+
+def get_version() -> str:
+    """Get the current network version, creating one if there isn't one yet."""
+    version = cache.get(VERSION_KEY)
+
+    if version is None:
+        # Another process may have created a version in the meantime - `add` keeps theirs
+        cache.add(VERSION_KEY, uuid.uuid4().hex, timeout=None)
+        version = cache.get(VERSION_KEY)
+
+    return version
+
+
+def invalidate(*args, **kwargs) -> None:
+    """Mark all cached networks as stale once the current transaction is committed.
+
+    Until then other processes still see the old data - a network built from it would
+    otherwise be cached under the new version.
+
+    Accepts and ignores any arguments so may be connected directly as a signal receiver.
+    """
+    transaction.on_commit(lambda: cache.set(VERSION_KEY, uuid.uuid4().hex, timeout=None))
+
+
+def normalise_filters(filter_forms: typing.Mapping[str, forms.Form],
+                      at_date: typing.Optional[datetime.date]) -> typing.Dict[str, typing.Any]:
+    """Reduce filter forms to a canonical representation of the filters they apply.
+
+    Empty filters are omitted and multiple choice selections are sorted,
+    so equivalent filters have the same representation.
+    """
+    filters = {
+        'date': (at_date or timezone.now().date()).isoformat(),
+    }
+
+    for form in filter_forms.values():
+        for field_name in form.fields:
+            value = form[field_name].value()
+
+            if isinstance(value, (list, tuple)):
+                value = sorted(map(str, value))
+
+            if value:
+                filters[form.add_prefix(field_name)] = value
+
+    return filters
+
+
+def get_key(filters: typing.Mapping[str, typing.Any]) -> str:
+    """Get the cache key for a network with given filters at the current network version."""
+    digest = hashlib.sha256(
+        json.dumps(filters, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+    return f'people:network:{get_version()}:{digest}'
+
+
+def get_or_build(key: str, build: typing.Callable[[], typing.Any]) -> typing.Any:
+    """Get a value from the cache, building and caching it if it isn't there."""
+    value = cache.get(key)
+    if value is None:
+        value = build()
+        cache.set(key, value, timeout=settings.NETWORK_CACHE_TIMEOUT)
+
+    return value
+
+
+def get_or_build_network(
+    filters: typing.Mapping[str, typing.Any],
+    build: typing.Callable[[], typing.Dict[str, typing.Any]]
+) -> typing.Dict[str, typing.Any]:
+    """Get a network from the cache, building and caching it if it isn't there."""
+    # Get key before building - if data changes during the build this network is never served
+    return get_or_build(get_key(filters), build)
+
+
+def get_or_build_layout(
+    filters: typing.Mapping[str, typing.Any],
+    build: typing.Callable[[], typing.Dict[str, typing.Dict[str, float]]]
+) -> typing.Dict[str, typing.Dict[str, float]]:
+    """Get the node positions for a network from the cache, computing them if they aren't there."""
+    return get_or_build(f'{get_key(filters)}:layout', build)
+
+
+def get_or_build_analytics(
+    filters: typing.Mapping[str, typing.Any],
+    build: typing.Callable[[], typing.Dict[str, typing.Any]]
+) -> typing.Dict[str, typing.Any]:
+    """Get the network metrics for a network from the cache, computing them if they aren't there."""
+    return get_or_build(f'{get_key(filters)}:analytics', build)
+
+
+def store_elements(elements: typing.Mapping[str, typing.Any]) -> str:
+    """Store a snapshot of network elements so that later changes can be sent as a delta.
+
+    :return: Token identifying this snapshot
+    """
+    token = hashlib.sha256(
+        json.dumps(elements, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+    cache.set(f'people:network:elements:{token}', elements,
+              timeout=settings.NETWORK_CACHE_TIMEOUT)
+
+    return token
+
+
+def get_stored_elements(token: str) -> typing.Optional[typing.Dict[str, typing.Any]]:
+    """Get a snapshot of network elements previously stored, if it has not expired."""
+    return cache.get(f'people:network:elements:{token}')
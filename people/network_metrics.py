@@ -0,0 +1,200 @@
+"""
+Keep the precomputed :class:`PersonMetrics` of each person up to date as relationships change.
+
+When a relationship starts or ends only the metrics of the two people involved and the
+connected components containing them are updated, so pages can show network metrics
+without aggregating over every relationship on each request.
+
+Changes which don't send signals - e.g. bulk updates or restoring a database backup -
+are not tracked; run the `rebuild_network_metrics` command after making them.
+"""
+
+import collections
+import typing
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from scipy import sparse
+from scipy.sparse import csgraph
+
+from . import models
+
+#: Pair of person pks (source, target) representing a current relationship
+Edge = typing.Tuple[int, int]
+
+
+def get_current_edges(person_ids: typing.Optional[typing.Collection[int]] = None,
+                      within: bool = False) -> typing.Set[Edge]:
+    """Get the source and target of current relationships.
+
+    :param person_ids: Only include relationships involving these people - all if not provided
+    :param within: Require both people in each relationship to be in `person_ids`
+    """
+    relationships = models.Relationship.objects.filter(current_answers__isnull=False)
+
+    if person_ids is not None:
+        if within:
+            relationships = relationships.filter(source_id__in=person_ids,
+                                                 target_id__in=person_ids)
+        else:
+            relationships = relationships.filter(
+                Q(source_id__in=person_ids) | Q(target_id__in=person_ids)
+            )
+
+    return set(relationships.order_by().values_list('source_id', 'target_id'))
+
+
+def get_degrees(person_ids: typing.Iterable[int],
+                edges: typing.Iterable[Edge]) -> typing.Dict[int, typing.Dict[str, int]]:
+    """Count the relationships of each person - must be given all relationships involving them."""
+    targets = collections.defaultdict(set)
+    sources = collections.defaultdict(set)
+    for source, target in edges:
+        targets[source].add(target)
+        sources[target].add(source)
+
+    return {
+        person_id: {
+            'out_degree': len(targets[person_id]),
+            'in_degree': len(sources[person_id]),
+            'degree': len(targets[person_id] | sources[person_id]),
+            'reciprocated_degree': len(targets[person_id] & sources[person_id]),
+        } for person_id in person_ids
+    }
+
+
+def get_components(person_ids: typing.Sequence[int],
+                   edges: typing.Iterable[Edge]) -> typing.Dict[int, int]:
+    """Find the connected component containing each person.
+
+    :return: Component of each person, identified by the smallest person pk in it
+    """
+    person_ids = np.array(sorted(person_ids), dtype=np.int64)
+    edges = np.array(list(edges), dtype=np.int64).reshape(-1, 2)
+
+    rows = np.searchsorted(person_ids, edges[:, 0])
+    columns = np.searchsorted(person_ids, edges[:, 1])
+    adjacency = sparse.csr_matrix((np.ones(len(edges)), (rows, columns)),
+                                  shape=(len(person_ids), len(person_ids)))
+
+    _, labels = csgraph.connected_components(adjacency, directed=False)
+
+    # Person pks are sorted so the first member of each component is the smallest
+    _, first = np.unique(labels, return_index=True)
+
+    return dict(zip(person_ids.tolist(), person_ids[first][labels].tolist()))
+
+
+def update_degrees(person_ids: typing.Collection[int]) -> None:
+    """Recount the relationships of some people."""
+    degrees = get_degrees(person_ids, get_current_edges(person_ids))
+
+    for person_id, values in degrees.items():
+        models.PersonMetrics.objects.filter(person_id=person_id).update(updated=timezone.now(),
+                                                                          **values)
+
+
+def merge_components(person_ids: typing.Collection[int]) -> None:
+    """Join the components containing some people, which have become connected."""
+    components = set(
+        models.PersonMetrics.objects.filter(person_id__in=person_ids).values_list('component',
+                                                                                 flat=True)
+    )
+    if len(components) < 2:
+        return
+
+    members = models.PersonMetrics.objects.filter(component__in=components)
+    members.update(component=min(components),
+                   component_size=members.count(),
+                   updated=timezone.now())
+
+
+def split_component(person_id: int) -> None:
+    """Divide the component containing a person if a relationship within it has ended."""
+    component = models.PersonMetrics.objects.filter(person_id=person_id).values_list(
+        'component', flat=True
+    ).first()
+    if component is None:
+        return
+
+    members = list(
+        models.PersonMetrics.objects.filter(component=component).values_list('person_id',
+                                                                             flat=True)
+    )
+    components = get_components(members, get_current_edges(members, within=True))
+
+    groups = collections.defaultdict(list)
+    for member, member_component in components.items():
+        groups[member_component].append(member)
+
+    if len(groups) < 2:
+        return
+
+    for new_component, group in groups.items():
+        models.PersonMetrics.objects.filter(person_id__in=group).update(
+            component=new_component, component_size=len(group), updated=timezone.now()
+        )
+
+
+def update_for_relationship(relationship: models.Relationship, is_current: bool) -> None:
+    """Update the metrics of the people involved in a relationship which has changed."""
+    person_ids = [relationship.source_id, relationship.target_id]
+
+    with transaction.atomic():
+        if is_current:
+            # People without relationships have no metrics yet
+            models.PersonMetrics.objects.bulk_create(
+                [
+                    models.PersonMetrics(person_id=person_id, component=person_id)
+                    for person_id in person_ids
+                ],
+                ignore_conflicts=True
+            )
+
+        update_degrees(person_ids)
+
+        if is_current:
+            merge_components(person_ids)
+
+        else:
+            split_component(relationship.source_id)
+
+
+def rebuild() -> int:
+    """Recompute the metrics of every person from scratch.
+
+    :return: Number of people for whom metrics were stored
+    """
+    with transaction.atomic():
+        person_ids = list(models.Person.objects.order_by('pk').values_list('pk', flat=True))
+        edges = get_current_edges()
+
+        degrees = get_degrees(person_ids, edges)
+        components = get_components(person_ids, edges)
+        component_sizes = collections.Counter(components.values())
+
+        models.PersonMetrics.objects.all().delete()
+        models.PersonMetrics.objects.bulk_create(
+            [
+                models.PersonMetrics(person_id=person_id,
+                                     component=components[person_id],
+                                     component_size=component_sizes[components[person_id]],
+                                     **degrees[person_id]) for person_id in person_ids
+            ],
+            batch_size=1000
+        )
+
+    return len(person_ids)
+
+
+def relationship_saved(sender, instance: models.Relationship, update_fields=None, **kwargs) -> None:
+    """Update metrics when a relationship starts or ends - connected as a signal receiver."""
+    if update_fields is None or 'current_answers' in update_fields:
+        update_for_relationship(instance, instance.is_current)
+
+
+def relationship_deleted(sender, instance: models.Relationship, **kwargs) -> None:
+    """Update metrics when a relationship is deleted - connected as a signal receiver."""
+    update_for_relationship(instance, False)
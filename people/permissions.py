@@ -3,18 +3,55 @@ Permission mixins for views relating to :class:`Person`s.
 """
 
 from django.contrib.auth.mixins import UserPassesTestMixin
+from django.db.models import Model
 
 from . import models
 
 
+def cache_linked_person(user: models.User, person: models.Person) -> None:
+    """Record a fetched person as the one linked to a user, and the reverse.
+
+    Later uses of `user.person` and `person.user` - e.g. in templates - then don't fetch them again.
+    The user is the one making the request, so this lasts for the rest of the request.
+    """
+    field = models.Person.user.field
+
+    field.set_cached_value(person, user)
+    field.remote_field.set_cached_value(user, person)
+
+
 class UserIsLinkedPersonMixin(UserPassesTestMixin):
     """
     Grant access if the user is staff or has a :class:`Person` record and
     this is the one referred to in the view.
+
+    The object of the view is fetched once per request, along with the person to
+    test the user against, and shared by the permission check and the view.
     """
     related_person_field = None
     permission_denied_message = 'You do not have permission to view this page.'
 
+    def get_object(self, queryset=None) -> Model:
+        """
+        Get the object of this view, fetching it only once per request.
+
+        Objects fetched from a queryset other than the view's own are not kept.
+        """
+        if queryset is not None:
+            return super().get_object(queryset)
+
+        try:
+            return self._linked_object
+
+        except AttributeError:
+            queryset = self.get_queryset()
+            if self.related_person_field is not None:
+                queryset = queryset.select_related(self.related_person_field)
+
+            # pylint: disable=attribute-defined-outside-init
+            self._linked_object = super().get_object(queryset)
+            return self._linked_object
+
     def get_test_person(self) -> models.Person:
         """
         Get the :class:`Person` to test the user against.
@@ -36,5 +73,16 @@ class UserIsLinkedPersonMixin(UserPassesTestMixin):
         Require that user is either staff or is the linked person.
         """
         user = self.request.user
-        return user.is_authenticated and (
-            user.is_staff or self.get_test_person() == user.person)
+        if not user.is_authenticated:
+            return False
+
+        if user.is_staff:
+            return True
+
+        # Compare ids so the user's linked person doesn't need to be fetched
+        test_person = self.get_test_person()
+        if test_person.user_id != user.pk:
+            return False
+
+        cache_linked_person(user, test_person)
+        return True
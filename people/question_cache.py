@@ -0,0 +1,62 @@
+"""
+Cache the questions from which dynamic answer set forms are built.
+
+Questions rarely change but are needed to build every answer set form and network filter,
+so they are cached until any question or choice of the same type is changed.
+"""
+
+import typing
+
+from django.core.cache import cache
+from django.db import transaction
+
+from . import models
+
+
+def get_key(question_model: typing.Type[models.Question]) -> str:
+    """Get the cache key for the questions of a question model."""
+    return f'people:questions:{question_model._meta.label_lower}'
+
+
+def get_questions(question_model: typing.Type[models.Question]) -> typing.List[models.Question]:
+    """Get all questions of a question model in order.
+
+    Each question has a `negative_response_id` attribute - the id of its choice representing
+    the negative response if it has exactly one, else `None`.
+    """
+    key = get_key(question_model)
+
+    questions = cache.get(key)
+    if questions is None:
+        questions = list(question_model.objects.all())
+
+        answer_model = question_model.answers.rel.related_model
+        negative_responses = {}
+        for question_id, answer_id in answer_model.objects.filter(
+            is_negative_response=True
+        ).order_by().values_list('question_id', 'pk'):
+            negative_responses.setdefault(question_id, []).append(answer_id)
+
+        for question in questions:
+            answer_ids = negative_responses.get(question.pk, [])
+            question.negative_response_id = answer_ids[0] if len(answer_ids) == 1 else None
+
+        cache.set(key, questions, timeout=None)
+
+    return questions
+
+
+def invalidate(sender: typing.Type[typing.Union[models.Question, models.QuestionChoice]],
+               **kwargs) -> None:
+    """Remove cached questions when a question or choice changes.
+
+    May be connected directly as a signal receiver for question and choice models.
+    """
+    question_model = sender
+    if issubclass(sender, models.QuestionChoice):
+        question_model = sender._meta.get_field('question').related_model
+
+    key = get_key(question_model)
+
+    # Until the change is committed other processes would cache the old questions again
+    transaction.on_commit(lambda: cache.delete(key))
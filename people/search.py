@@ -0,0 +1,40 @@
+"""
+Search people and organisations by name.
+
+Names containing the search text match on all databases. On PostgreSQL names which are
+similar to the search text also match, so small spelling mistakes still find the right
+person - both kinds of match are served by trigram indexes on the name columns.
+"""
+
+import typing
+
+from django.db import connection
+from django.db.models import BooleanField, ExpressionWrapper, Q, QuerySet
+
+
+def search(queryset: QuerySet, query: str,
+           fields: typing.Sequence[str] = ('name', )) -> QuerySet:
+    """Select objects with a name matching a search query.
+
+    Objects with a name starting with the query are listed first.
+
+    :param fields: Lookups of the name fields to search - the first is used to order results
+    """
+    query = query.strip()
+    if not query:
+        return queryset
+
+    matches = Q()
+    for field in fields:
+        matches |= Q(**{f'{field}__icontains': query})
+
+        # Similarity matching needs the pg_trgm extension
+        if connection.vendor == 'postgresql':
+            matches |= Q(**{f'{field}__trigram_similar': query})
+
+    ordering = queryset.query.order_by or queryset.model._meta.ordering
+
+    return queryset.filter(matches).annotate(
+        is_prefix_match=ExpressionWrapper(Q(**{f'{fields[0]}__istartswith': query}),
+                                          output_field=BooleanField())
+    ).order_by('-is_prefix_match', *ordering)
@@ -14,6 +14,9 @@ let selected_marker = null;
 let selected_marker_info = null;
 let markers = [];
 
+// Marker types which have been hidden - applies to markers loaded later
+let hidden_types = {};
+
 function createMarker(map, marker_data) {
     // Get the lat-long position from the data
     let lat_lng;
@@ -64,10 +67,91 @@ function createMarker(map, marker_data) {
     return marker;
 }
 
+/**
+ * Create a marker representing a cluster of nearby markers, which zooms in when clicked.
+ */
+function createClusterMarker(map, cluster_data) {
+    const marker = new google.maps.Marker({
+        position: new google.maps.LatLng(cluster_data.lat, cluster_data.lng),
+        map: map,
+        label: {
+            text: cluster_data.count.toString(),
+            color: 'white',
+            fontWeight: 'bold'
+        },
+        icon: {
+            path: google.maps.SymbolPath.CIRCLE,
+            strokeColor: marker_edge_colour,
+            strokeWeight: marker_edge_width,
+            strokeOpacity: marker_edge_alpha,
+            fillColor: cluster_data.type === 'Organisation' ? '#669933' : '#0099cc',
+            fillOpacity: marker_fill_alpha,
+            scale: marker_scale * (2 + Math.log10(cluster_data.count))
+        },
+    });
+
+    marker.type = cluster_data.type;
+
+    google.maps.event.addListener(marker, 'click', function () {
+        map.setZoom(map.getZoom() + 2);
+        map.panTo(marker.getPosition());
+    })
+
+    return marker;
+}
+
+/**
+ * Replace markers with those in the area of the map currently shown, clustered for the zoom level.
+ */
+function loadMarkers(url) {
+    const bounds = map.getBounds();
+    if (!bounds) {
+        return;
+    }
+
+    const south_west = bounds.getSouthWest();
+    const north_east = bounds.getNorthEast();
+    const params = new URLSearchParams({
+        bbox: [south_west.lat(), south_west.lng(), north_east.lat(), north_east.lng()].join(','),
+        zoom: map.getZoom()
+    });
+
+    fetch(url + '?' + params.toString())
+        .then(response => response.json())
+        .then(function (data) {
+            for (const marker of markers) {
+                marker.setMap(null);
+            }
+
+            markers = data.markers.map(marker_data => createMarker(map, marker_data)).concat(
+                data.clusters.map(cluster_data => createClusterMarker(map, cluster_data))
+            );
+
+            for (const marker of markers) {
+                marker.setVisible(!hidden_types[marker.type]);
+            }
+        });
+}
+
 // The function called when Google Maps starts up
 function initMap() {
-    map = new google.maps.Map(
-        document.getElementById('map'));
+    const map_element = document.getElementById('map');
+
+    // Markers for large maps are loaded for the area shown rather than all at once
+    if (map_element.dataset.url) {
+        map = new google.maps.Map(map_element, {
+            center: {lat: 0, lng: 0},
+            zoom: 2
+        });
+
+        map.addListener('idle', function () {
+            loadMarkers(map_element.dataset.url);
+        });
+
+        return map
+    }
+
+    map = new google.maps.Map(map_element);
 
     const bounds = new google.maps.LatLngBounds()
     const markers_data = JSON.parse(
@@ -2,13 +2,24 @@
 // Global reference to Cytoscape graph - needed for `save_image`
 var cy;
 
+// Token identifying the network currently displayed - used to request only changes
+var network_token = null;
+
 var hide_organisations = false;
-var organisation_nodes;
-var organisation_edges;
+var organisation_elements;
 
 var anonymise_people = false;
 var anonymise_organisations = false;
 
+// Network metrics computed by the server - see `people.analytics`
+var network_analytics = null;
+
+var colour_communities = false;
+var community_colours = [
+    '#e41a1c', '#377eb8', '#4daf4a', '#984ea3', '#ff7f00',
+    '#ffff33', '#a65628', '#f781bf', '#999999', '#66c2a5'
+];
+
 function nodeSize (ele) {
     return 100 + 20 * ele.connectedEdges().length;
 }
@@ -36,7 +47,16 @@ var network_style = [
             fontSize: function (ele) {
                 return (16 + ele.connectedEdges().length).toString() + 'rem';
             },
-            backgroundColor: 'data(nodeColor)',
+            backgroundColor: function (ele) {
+                if (colour_communities && network_analytics) {
+                    var metrics = network_analytics.nodes[ele.id()];
+                    if (metrics) {
+                        return community_colours[metrics.community % community_colours.length];
+                    }
+                }
+
+                return ele.data('nodeColor');
+            },
             shape: 'data(nodeShape)',
             opacity: 0.7
         }
@@ -79,11 +99,9 @@ function toggle_organisations() {
     hide_organisations = !hide_organisations;
 
     if (hide_organisations) {
-        organisation_nodes.remove();
-        organisation_edges.remove();
+        organisation_elements = cy.elements('[kind = "organisation"]').remove();
     } else {
-        organisation_nodes.restore();
-        organisation_edges.restore();
+        organisation_elements.restore();
     }
 }
 
@@ -104,114 +122,201 @@ function toggle_anonymise_organisations() {
 }
 
 /**
- * Populate a Cytoscape network from :class:`Person` and :class:`Relationship` JSON embedded in page.
+ * Toggle node colours between node kind and the community each node belongs to.
  */
-function get_network() {
-    // Initialise Cytoscape graph
-    // See https://js.cytoscape.org/ for documentation
-    cy = cytoscape({
-        container: document.getElementById('cy'),
-        style: network_style,
-        wheelSensitivity: 0.2
+function toggle_community_colours() {
+    colour_communities = !colour_communities
+    cy.style().update();
+}
+
+/**
+ * Fill a table of metrics from an object with a value for each `data-metric` cell.
+ */
+function show_metrics(table_id, metrics) {
+    $('#' + table_id + ' [data-metric]').each(function () {
+        var value = metrics ? metrics[this.dataset.metric] : undefined;
+        this.textContent = value === undefined ? '' : value;
     });
+}
 
-    // Add pan + zoom widget with cytoscape-panzoom
-    cy.panzoom();
+/**
+ * Show metrics for the node which has been selected.
+ */
+function show_node_metrics(event) {
+    var node = event.target;
+    var metrics = Object.assign(
+        {name: node.data('name')},
+        network_analytics ? network_analytics.nodes[node.id()] : {}
+    );
 
-    // Load people and add to graph
-    var person_set = JSON.parse(document.getElementById('person-set-data').textContent);
-
-    for (var person of person_set) {
-        cy.add({
-            group: 'nodes',
-            data: {
-                id: 'person-' + person.pk.toString(),
-                name: person.name,
-                kind: 'person',
-                nodeColor: '#0099cc',
-                nodeShape: 'ellipse'
-            }
-        })
+    show_metrics('node-metrics', metrics);
+}
+
+/**
+ * Add display properties to a Cytoscape element received from the server.
+ */
+function style_element(element) {
+    if (element.group === 'nodes') {
+        element.data.nodeColor = {
+            'organisation': '#669933'
+        }[element.data.kind] || '#0099cc';
+        element.data.nodeShape = {
+            'organisation': 'rectangle'
+        }[element.data.kind] || 'ellipse';
+
+    } else {
+        element.data.lineColor = {
+            'organisation-membership': '#669933'
+        }[element.data.relationshipKind] || {
+            'organisation': 'black'
+        }[element.data.kind] || 'grey';
+        element.data.lineArrowShape = 'triangle';
     }
 
-    // Load organisations and add to graph
-    var organisation_set = JSON.parse(document.getElementById('organisation-set-data').textContent);
-
-    for (var item of organisation_set) {
-        cy.add({
-            group: 'nodes',
-            data: {
-                id: 'organisation-' + item.pk.toString(),
-                name: item.name,
-                kind: 'organisation',
-                nodeColor: '#669933',
-                nodeShape: 'rectangle'
-            }
-        })
+    return element;
+}
+
+/**
+ * Apply changes to the network received from the server.
+ */
+function apply_network_delta(delta) {
+    // Hidden organisations must be restored so that changes to them are applied
+    if (hide_organisations) {
+        organisation_elements.restore();
     }
-    organisation_nodes = cy.nodes('[kind = "organisation"]');
-
-    // Load relationships and add to graph
-    var relationship_set = JSON.parse(document.getElementById('relationship-set-data').textContent);
-
-    for (var relationship of relationship_set) {
-        try {
-            cy.add({
-                group: 'edges',
-                data: {
-                    id: 'relationship-' + relationship.pk.toString(),
-                    source: 'person-' + relationship.source.pk.toString(),
-                    target: 'person-' + relationship.target.pk.toString(),
-                    kind: 'person',
-                    lineColor: {
-                        'organisation-membership': '#669933'
-                    }[relationship.kind] || 'grey',
-                    lineArrowShape: 'triangle'
-                }
-            })
-        } catch (exc) {
-            // Exception thrown if a node in the relationship does not exist
-            // This is probably because it's been filtered out
-        }
+
+    if (delta.full) {
+        cy.elements().remove();
+    } else {
+        cy.remove(cy.collection(delta.removed.map(function (id) {
+            return cy.getElementById(id);
+        })));
     }
 
-    // Load organisation relationships and add to graph
-    relationship_set = JSON.parse(document.getElementById('organisation-relationship-set-data').textContent);
-
-    for (var relationship of relationship_set) {
-        try {
-            cy.add({
-                group: 'edges',
-                data: {
-                    id: 'organisation-relationship-' + relationship.pk.toString(),
-                    source: 'person-' + relationship.source.pk.toString(),
-                    target: 'organisation-' + relationship.target.pk.toString(),
-                    kind: 'organisation',
-                    lineColor: {
-                        'organisation-membership': '#669933'
-                    }[relationship.kind] || 'black',
-                    lineArrowShape: 'triangle'
-                }
-            })
-        } catch (exc) {
-            // Exception thrown if a node in the relationship does not exist
-            // This is probably because it's been filtered out
-        }
+    // Only data can be changed - edges which have moved are sent as removed and added again
+    for (var element of delta.changed) {
+        cy.getElementById(element.data.id).data(style_element(element).data);
+    }
+
+    // Nodes are sent before edges which connect them
+    cy.add(delta.added.map(style_element));
+
+    // Positions and metrics are only sent when the set of elements has changed
+    if (delta.analytics) {
+        network_analytics = delta.analytics;
+        show_metrics('network-summary', network_analytics.summary);
+        show_metrics('node-metrics', null);
+        cy.style().update();
+    }
+
+    if (delta.positions) {
+        layout_network(delta.positions);
+    }
+
+    if (hide_organisations) {
+        organisation_elements = cy.elements('[kind = "organisation"]').remove();
+    }
+
+    network_token = delta.token;
+}
+
+/**
+ * Get the network matching the current filters from the server.
+ *
+ * Only changes since the network was last loaded are requested.
+ */
+function load_network() {
+    var params = $('#network-filter-form').serializeArray().filter(function (param) {
+        return param.name !== 'csrfmiddlewaretoken';
+    });
+
+    // Metrics export uses the same filters as the network
+    var export_link = document.getElementById('export-analytics');
+    export_link.search = $.param(params);
+
+    if (network_token !== null) {
+        params.push({name: 'since', value: network_token});
+    }
+
+    return $.getJSON(document.getElementById('cy').dataset.url, $.param(params))
+        .done(function (delta) {
+            show_filter_errors([]);
+            apply_network_delta(delta);
+        })
+        .fail(function (response) {
+            var errors = response.responseJSON ? response.responseJSON.errors : {};
+            show_filter_errors(collect_error_messages(errors));
+        });
+}
+
+/**
+ * Collect the messages from errors returned by the server for each filter form.
+ */
+function collect_error_messages(errors) {
+    if (typeof errors === 'string') {
+        return [errors];
+    }
+
+    if (errors && typeof errors.message === 'string') {
+        return [errors.message];
     }
-    organisation_edges = cy.edges('[kind = "organisation"]');
 
-    // Optimise graph layout
+    var messages = [];
+    $.each(errors || {}, function (key, value) {
+        messages = messages.concat(collect_error_messages(value));
+    });
+
+    return messages;
+}
+
+/**
+ * Show errors in the filters, or hide the errors if there are none.
+ */
+function show_filter_errors(messages) {
+    var container = document.getElementById('network-filter-errors');
+    container.textContent = messages.join(' ');
+    container.hidden = messages.length === 0;
+}
+
+/**
+ * Move nodes to the positions computed by the server.
+ */
+function layout_network(positions) {
     var layout = cy.layout({
-        name: 'cose',
-        randomize: false,
-        animate: false,
-        nodeRepulsion: function (node) {
-            return 2 ** node.connectedEdges().length;
+        name: 'preset',
+        positions: function (node) {
+            return positions[node.id()];
         },
-        nodeOverlap: 80
+        fit: true
     });
 
     layout.run();
+}
+
+/**
+ * Initialise a Cytoscape network and populate it with :class:`Person` and :class:`Relationship` data from the server.
+ */
+function get_network() {
+    // Initialise Cytoscape graph
+    // See https://js.cytoscape.org/ for documentation
+    cy = cytoscape({
+        container: document.getElementById('cy'),
+        style: network_style,
+        wheelSensitivity: 0.2
+    });
+
+    // Add pan + zoom widget with cytoscape-panzoom
+    cy.panzoom();
+
+    cy.on('select', 'node', show_node_metrics);
+
+    // Apply filters by patching the existing network rather than reloading the page
+    $('#network-filter-form').on('submit', function (event) {
+        event.preventDefault();
+        load_network();
+    });
+
+    load_network();
 
     setTimeout(function () {
         document.getElementById('cy').style.height = '100%';
@@ -0,0 +1,574 @@
+"""
+Tests for the `people` app.
+"""
+
+import datetime
+import json
+import random
+import typing
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import QuerySet
+from django.forms import ValidationError
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from activities import models as activity_models
+
+from . import (answer_index, benchmark, filter_expressions, forms, models, network_cache,
+               question_cache)
+from .views import network
+
+#: Cache used in tests - so cached networks don't persist between tests
+TEST_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'people-tests',
+    }
+}
+
+
+def add_population(size: int, seed: int = 0) -> None:
+    """Add a synthetic population of people, with their organisations and relationships."""
+    benchmark.create_synthetic_dataset(n_people=size,
+                                       n_organisations=max(1, size // 5),
+                                       n_relationships=size * 2,
+                                       n_revisions=2,
+                                       seed=seed)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class QueryCountTestCase(TestCase):
+    """Base for tests that the number of queries made by a view does not grow with the data."""
+    #: Number of people added to the population at a time
+    population_size = 20
+
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+
+        self.user = models.User.objects.create_user('staff', is_staff=True, is_superuser=True,
+                                                    consent_given=True)
+        self.client.force_login(self.user)
+
+    def populate(self, seed: int) -> None:
+        """Add records to the population."""
+        add_population(self.population_size, seed=seed)
+
+    def get(self, url: str, data: typing.Optional[typing.Mapping] = None) -> int:
+        """Request a view with an empty cache.
+
+        :return: Number of queries made
+        """
+        cache.clear()
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, data)
+            if response.streaming:
+                b''.join(response.streaming_content)
+
+        self.assertEqual(response.status_code, 200)
+
+        return len(queries)
+
+    def assertQueriesConstant(
+            self, url: str,
+            get_data: typing.Optional[typing.Callable[[], typing.Mapping]] = None) -> None:
+        """Check that a view makes the same number of queries when the population is doubled.
+
+        :param get_data: Function to get query parameters, once the first population exists
+        """
+        self.populate(seed=1)
+        data = get_data() if get_data is not None else None
+        # Fill per-process caches - e.g. of the current site - before counting
+        self.get(url, data)
+        n_queries = self.get(url, data)
+
+        self.populate(seed=2)
+        with self.assertNumQueries(n_queries):
+            self.get(url, data)
+
+
+class NetworkDataQueryCountTest(QueryCountTestCase):
+    """The network is built with a fixed number of queries however many people there are."""
+    url = reverse('people:network.data')
+
+    def test_network(self):
+        self.assertQueriesConstant(self.url)
+
+    def test_network_at_date(self):
+        # Between the first and second revisions of the synthetic answer sets
+        date = (timezone.now() - benchmark.REVISION_INTERVAL * 3 / 2).date()
+        self.assertQueriesConstant(self.url, lambda: {'date': date.isoformat()})
+
+    def test_network_with_filters(self):
+        def get_data():
+            person_choice = models.PersonQuestionChoice.objects.first()
+            relationship_choice = models.RelationshipQuestionChoice.objects.first()
+
+            return {
+                'mutual_only': 'on',
+                f'relationship_question_{relationship_choice.question_id}': relationship_choice.pk,
+                'expression': f'{{"person": {{"not": {{"person": [{person_choice.pk}]}}}}}}',
+            }
+
+        self.assertQueriesConstant(self.url, get_data)
+
+
+
+class ProfileQueryCountTest(QueryCountTestCase):
+    """The profile page is shown with a fixed number of queries, however many relationships."""
+    fixtures = ['bootstrap_customizer_theme', 'bootstrap_customizer_sitetheme']
+
+    def setUp(self) -> None:
+        super().setUp()
+        add_population(self.population_size)
+
+        self.person = models.Person.objects.create(name='Staff', user=self.user)
+        models.PersonAnswerSet.objects.create(
+            person=self.person, organisation=models.Organisation.objects.first()
+        ).mark_current()
+
+    def add_relationships(self, size: int) -> None:
+        """Add relationships with people and organisations, and activities, to the profile."""
+        others = models.Person.objects.exclude(pk=self.person.pk).order_by('pk')[:size]
+        for other in others:
+            relationship = models.Relationship.objects.create(source=self.person, target=other)
+            models.RelationshipAnswerSet.objects.create(relationship=relationship).mark_current()
+
+        organisations = models.Organisation.objects.order_by('pk')[:size]
+        for organisation in organisations:
+            relationship = models.OrganisationRelationship.objects.create(source=self.person,
+                                                                          target=organisation)
+            models.OrganisationRelationshipAnswerSet.objects.create(
+                relationship=relationship
+            ).mark_current()
+
+        activity_type, _ = activity_models.ActivityType.objects.get_or_create(name='Workshop')
+        medium, _ = activity_models.ActivityMedium.objects.get_or_create(name='Face to face')
+        for i in range(size):
+            activity = activity_models.Activity.objects.create(name=f'Workshop {i}',
+                                                               type=activity_type,
+                                                               medium=medium)
+            activity.attendance_list.add(self.person)
+
+    def assertQueriesConstantWithRelationships(self, url: str) -> None:
+        """Check that a profile makes the same number of queries with and without relationships."""
+        # Fill per-process caches - e.g. of the current site - before counting
+        self.get(url)
+        n_queries = self.get(url)
+
+        self.add_relationships(self.population_size)
+        with self.assertNumQueries(n_queries):
+            self.get(url)
+
+    def test_own_profile(self):
+        self.assertQueriesConstantWithRelationships(reverse('people:person.profile'))
+
+    def test_profile(self):
+        url = reverse('people:person.detail', kwargs={'pk': self.person.pk})
+        self.assertQueriesConstantWithRelationships(url)
+
+
+class PersonUpdateQueryCountTest(QueryCountTestCase):
+    """The answer set form is shown with a fixed number of queries however many organisations."""
+    fixtures = ['bootstrap_customizer_theme', 'bootstrap_customizer_sitetheme']
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.person = models.Person.objects.create(name='Staff', user=self.user)
+        models.PersonAnswerSet.objects.create(person=self.person).mark_current()
+
+    def populate(self, seed: int) -> None:
+        # Only organisations are added - each question adds a query to list its choices
+        for i in range(self.population_size):
+            organisation = models.Organisation.objects.create(name=f'Organisation {seed}-{i}')
+            models.OrganisationAnswerSet.objects.create(organisation=organisation,
+                                                        name=organisation.name).mark_current()
+
+    def test_person_update(self):
+        self.assertQueriesConstant(reverse('people:person.update', kwargs={'pk': self.person.pk}))
+
+
+def filter_by_joins(queryset: QuerySet, form, at_date=None) -> QuerySet:
+    """Select objects with answers at a date matching a filter form, joining once per question.
+
+    The filter which the index and `Exists` subqueries replaced - kept as a reference for them.
+    """
+    answer_sets = filter_expressions.get_valid_answer_sets(queryset.model, at_date)
+
+    for choices in network.get_choice_groups(form):
+        answer_sets = answer_sets.filter(question_answers__in=choices)
+
+    entity_pks = answer_sets.values_list(answer_sets.model.entity_field, flat=True)
+
+    return queryset.filter(pk__in=entity_pks)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class AnswerIndexFilterTest(TestCase):
+    """Filters on answers select the same objects as the original join-based filter."""
+    #: Filter form for each kind of object
+    filter_forms = {
+        models.Person: forms.NetworkPersonFilterForm,
+        models.Organisation: forms.NetworkOrganisationFilterForm,
+        models.Relationship: forms.NetworkRelationshipFilterForm,
+    }
+
+    #: Number of random filters to compare for each kind of object
+    n_filters = 20
+
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+        answer_index._indexes.clear()
+
+        self.rng = random.Random(0)
+        add_population(20, seed=1)
+        add_population(20, seed=2)
+
+        # Between the first and second revisions of the synthetic answer sets
+        self.past_date = (timezone.now() - benchmark.REVISION_INTERVAL * 3 / 2).date()
+
+    def random_filter(self, form_class) -> typing.Dict[str, typing.List[int]]:
+        """Select a random group of choices - which may be empty - for each question."""
+        data = {}
+        for question in form_class.question_model.objects.prefetch_related('answers'):
+            choices = [choice.pk for choice in question.answers.all()]
+            data[f'{form_class.question_prefix}question_{question.pk}'] = self.rng.sample(
+                choices, self.rng.randint(0, min(2, len(choices)))
+            )
+
+        return data
+
+    def assertFiltersMatch(self) -> None:
+        """Check that random filters select the same objects however they are applied.
+
+        Current answers are filtered by the index and by the database, and answers at a past date
+        by the database.
+        """
+        def pks(queryset: QuerySet) -> typing.Set[int]:
+            return set(queryset.values_list('pk', flat=True))
+
+        for model, form_class in self.filter_forms.items():
+            for _ in range(self.n_filters):
+                form = form_class(data=self.random_filter(form_class))
+                self.assertTrue(form.is_valid(), form.errors)
+
+                queryset = model.objects.all()
+                with self.subTest(model=model.__name__, filters=form.data):
+                    expected = pks(filter_by_joins(queryset, form))
+                    self.assertEqual(pks(network.filter_by_index(queryset, form)), expected)
+                    self.assertEqual(pks(network.filter_by_database(queryset, form)), expected)
+
+                    self.assertEqual(
+                        pks(network.filter_by_database(queryset, form, at_date=self.past_date)),
+                        pks(filter_by_joins(queryset, form, at_date=self.past_date))
+                    )
+
+    def add_answer_sets(self, model, n_entities: int) -> None:
+        """Give some entities new current answers, as their answer set forms would."""
+        answer_set_model = model.answer_sets.rel.related_model
+        choices = list(answer_set_model.question_answers.field.related_model.objects.all())
+
+        for entity in self.rng.sample(list(model.objects.all()), n_entities):
+            answer_set = answer_set_model.objects.create(**{answer_set_model.entity_field: entity})
+            answer_set.question_answers.add(*self.rng.sample(choices, self.rng.randint(0, 3)))
+            answer_set.save_answer_snapshot()
+            answer_set.replace_previous()
+            answer_set.mark_current()
+
+    def test_filters(self):
+        self.assertFiltersMatch()
+
+    def test_filters_after_updates(self):
+        # Build the indexes, so they must be replaced
+        self.assertFiltersMatch()
+
+        for model in self.filter_forms:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.add_answer_sets(model, 5)
+
+        self.assertFiltersMatch()
+
+    def test_filters_after_choice_removed(self):
+        self.assertFiltersMatch()
+
+        for model in self.filter_forms:
+            field = model.answer_sets.rel.related_model.question_answers.field
+            choice = field.related_model.objects.first()
+            with self.captureOnCommitCallbacks(execute=True):
+                getattr(choice, field.remote_field.get_accessor_name()).clear()
+
+        self.assertFiltersMatch()
+
+    def test_changes_by_other_processes(self):
+        self.assertFiltersMatch()
+
+        # Indexes of this process are kept, as if the changes were made by another process
+        indexes = dict(answer_index._indexes)
+        for model in self.filter_forms:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.add_answer_sets(model, 5)
+        answer_index._indexes.update(indexes)
+
+        self.assertFiltersMatch()
+
+
+@override_settings(CACHES=TEST_CACHES)
+class QuestionCacheTest(TestCase):
+    """Cached questions are removed once changes to questions are committed."""
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+
+    def test_invalidated_on_commit(self):
+        key = question_cache.get_key(models.PersonQuestion)
+        question_cache.get_questions(models.PersonQuestion)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            question = models.PersonQuestion.objects.create(text='New question')
+
+            # Other processes can't see the new question until it is committed
+            self.assertIsNotNone(cache.get(key))
+
+        self.assertIsNone(cache.get(key))
+        self.assertIn(question, question_cache.get_questions(models.PersonQuestion))
+
+
+@override_settings(CACHES=TEST_CACHES)
+class NetworkCacheTest(TestCase):
+    """Cached networks are marked as stale once changes to the network are committed."""
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+
+    def test_invalidated_on_commit(self):
+        version = network_cache.get_version()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            models.Person.objects.create(name='New person')
+
+            # A network built by another process now would still be of the old data
+            self.assertEqual(network_cache.get_version(), version)
+
+        self.assertNotEqual(network_cache.get_version(), version)
+
+
+class NetworkMetricsTest(TestCase):
+    """Metrics updated as relationships change record when they were changed."""
+    def connect(self, source: models.Person, target: models.Person) -> None:
+        relationship = models.Relationship.objects.create(source=source, target=target)
+        answer_set = relationship.answer_sets.create()
+        answer_set.mark_current()
+
+    def test_updated(self):
+        alice, bob, carol = (
+            models.Person.objects.create(name=name) for name in ('alice', 'bob', 'carol')
+        )
+        self.connect(alice, bob)
+
+        past = timezone.now() - datetime.timedelta(days=1)
+        models.PersonMetrics.objects.update(updated=past)
+
+        # Joins the components of Alice and Bob, and of Carol, changing the metrics of each
+        self.connect(carol, bob)
+
+        for metrics in models.PersonMetrics.objects.all():
+            self.assertEqual(metrics.component_size, 3)
+            self.assertGreater(metrics.updated, past)
+
+        models.PersonMetrics.objects.update(updated=past)
+        models.Relationship.objects.filter(source=alice).delete()
+
+        for metrics in models.PersonMetrics.objects.all():
+            self.assertEqual(metrics.component_size, 2 if metrics.person != alice else 1)
+            self.assertGreater(metrics.updated, past)
+
+
+class FilterExpressionTest(TestCase):
+    """Filter expressions are validated and select the objects whose answers they describe."""
+    @staticmethod
+    def answer(entity, choices, **fields) -> None:
+        """Give an entity current answers selecting some choices."""
+        answer_set_model = entity.answer_sets.model
+        answer_set = answer_set_model.objects.create(**{answer_set_model.entity_field: entity},
+                                                     **fields)
+        answer_set.question_answers.add(*choices)
+        answer_set.mark_current()
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        role = models.PersonQuestion.objects.create(text='Role', is_multiple_choice=True)
+        self.role_a, self.role_b, self.role_c = (
+            role.answers.create(text=text) for text in ('A', 'B', 'C')
+        )
+        secret = models.PersonQuestion.objects.create(text='Secret', answer_is_public=False)
+        self.secret = secret.answers.create(text='Secret answer')
+
+        sector = models.OrganisationQuestion.objects.create(text='Sector')
+        self.sector_x, self.sector_y = (sector.answers.create(text=text) for text in ('X', 'Y'))
+
+        kind = models.RelationshipQuestion.objects.create(text='Kind', is_multiple_choice=True)
+        self.kind_1, self.kind_2 = (kind.answers.create(text=text) for text in ('1', '2'))
+
+        org_x = models.Organisation.objects.create(name='Org X')
+        org_y = models.Organisation.objects.create(name='Org Y')
+        self.answer(org_x, [self.sector_x])
+        self.answer(org_y, [self.sector_y])
+
+        self.people = {
+            name: models.Person.objects.create(name=name)
+            for name in ('alice', 'bob', 'carol', 'dave', 'eve')
+        }
+        self.answer(self.people['alice'], [self.role_a], organisation=org_x)
+        self.answer(self.people['bob'], [self.role_b, self.secret], organisation=org_y)
+        self.answer(self.people['carol'], [self.role_a, self.role_b], organisation=org_y)
+        self.answer(self.people['dave'], [self.role_c])
+        # Eve has no answers
+
+        for source, target, kinds in [
+            ('alice', 'bob', [self.kind_1]),
+            ('bob', 'carol', [self.kind_2]),
+            ('carol', 'alice', [self.kind_1, self.kind_2]),
+            ('dave', 'alice', []),
+        ]:
+            relationship = models.Relationship.objects.create(source=self.people[source],
+                                                              target=self.people[target])
+            self.answer(relationship, kinds)
+
+    def select(self, key: str, expression) -> typing.Set[str]:
+        """Parse and apply an expression, as the network view does, naming the objects selected."""
+        model = filter_expressions.FILTERED_MODELS[key]
+        expressions = filter_expressions.parse(json.dumps({key: expression}))
+        queryset = network.filter_by_expression(
+            model.objects.filter(current_answers__isnull=False), expressions, key
+        )
+
+        if model is models.Relationship:
+            return {
+                f'{source}-{target}'
+                for source, target in queryset.values_list('source__name', 'target__name')
+            }
+
+        return set(queryset.values_list('name', flat=True))
+
+    def test_term(self):
+        self.assertEqual(self.select('person', {'person': [self.role_a.pk]}), {'alice', 'carol'})
+        # Any of the choices in a term
+        self.assertEqual(self.select('person', {'person': [self.role_a.pk, self.role_b.pk]}),
+                         {'alice', 'bob', 'carol'})
+
+    def test_and(self):
+        self.assertEqual(
+            self.select('person', {'and': [{'person': [self.role_a.pk]},
+                                           {'person': [self.role_b.pk]}]}),
+            {'carol'}
+        )
+
+    def test_or(self):
+        self.assertEqual(
+            self.select('person', {'or': [{'person': [self.role_b.pk]},
+                                          {'person': [self.role_c.pk]}]}),
+            {'bob', 'carol', 'dave'}
+        )
+
+    def test_not(self):
+        self.assertEqual(self.select('person', {'not': {'person': [self.role_a.pk]}}),
+                         {'bob', 'dave'})
+        self.assertEqual(self.select('person', {'not': {'not': {'person': [self.role_a.pk]}}}),
+                         {'alice', 'carol'})
+
+    def test_nested(self):
+        expression = {'and': [
+            {'not': {'or': [{'person': [self.role_b.pk]}, {'person': [self.role_c.pk]}]}},
+            {'organisation': [self.sector_x.pk]},
+        ]}
+        self.assertEqual(self.select('person', expression), {'alice'})
+
+    def test_person_organisation(self):
+        self.assertEqual(self.select('person', {'organisation': [self.sector_y.pk]}),
+                         {'bob', 'carol'})
+
+    def test_organisation(self):
+        self.assertEqual(self.select('organisation', {'organisation': [self.sector_x.pk]}),
+                         {'Org X'})
+
+    def test_relationship(self):
+        self.assertEqual(self.select('relationship', {'relationship': [self.kind_1.pk]}),
+                         {'alice-bob', 'carol-alice'})
+        self.assertEqual(self.select('relationship', {'source': [self.role_c.pk]}),
+                         {'dave-alice'})
+        self.assertEqual(
+            self.select('relationship', {'and': [{'relationship': [self.kind_1.pk]},
+                                                 {'not': {'target': [self.role_a.pk]}}]}),
+            {'alice-bob'}
+        )
+
+    def test_invalid(self):
+        nested = {'person': [self.role_a.pk]}
+        for _ in range(filter_expressions.MAX_DEPTH):
+            nested = {'not': nested}
+
+        for value in [
+            '{',
+            '[]',
+            '{"people": {"person": [1]}}',
+            '{"person": []}',
+            '{"person": {"relationship": [1]}}',
+            '{"person": {"person": []}}',
+            '{"person": {"person": ["1"]}}',
+            '{"person": {"person": [true]}}',
+            '{"person": {"and": []}}',
+            '{"person": {"or": {"person": [1]}}}',
+            '{"person": {"person": [1], "organisation": [1]}}',
+            '{"person": {"person": [999999]}}',
+            json.dumps({'person': {'or': [{'person': [self.role_a.pk]}]
+                                         * filter_expressions.MAX_SIZE}}),
+            json.dumps({'person': nested}),
+        ]:
+            with self.subTest(value=value), self.assertRaises(ValidationError):
+                filter_expressions.parse(value)
+
+    def test_private_choices(self):
+        # Answers which are not public can't be filtered on
+        with self.assertRaises(ValidationError):
+            filter_expressions.parse(json.dumps({'person': {'person': [self.secret.pk]}}))
+
+
+class AnswerSnapshotTest(TestCase):
+    """Answers read from snapshots are the same as those read from the answer set."""
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.question = models.PersonQuestion.objects.create(text='Job role')
+        self.choice = self.question.answers.create(text='Researcher')
+
+        self.answer_set = models.PersonAnswerSet.objects.create(
+            person=models.Person.objects.create(name='Person')
+        )
+        self.answer_set.question_answers.add(self.choice)
+        self.answer_set.save_answer_snapshot()
+
+    def get_answers(self) -> typing.Dict[str, str]:
+        answer_set = models.PersonAnswerSet.objects.get(pk=self.answer_set.pk)
+        self.assertIsNotNone(answer_set.answer_snapshot)
+
+        return answer_set.build_question_answers(use_slugs=True, questions=[self.question])
+
+    def test_question_renamed(self):
+        self.question.text = 'Current job role'
+        self.question.save()
+
+        self.assertEqual(self.get_answers(), {'current-job-role': 'Researcher'})
+
+    def test_choice_renamed(self):
+        self.choice.text = 'Research fellow'
+        self.choice.save()
+
+        self.assertEqual(self.get_answers(), {'job-role': 'Research fellow'})
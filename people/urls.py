@@ -34,6 +34,10 @@ urlpatterns = [
          views.person.PersonCreateView.as_view(),
          name='person.create'),
 
+    path('people/autocomplete',
+         views.person.PersonAutocompleteView.as_view(),
+         name='person.autocomplete'),
+
     path('people',
          views.person.PersonListView.as_view(),
          name='person.list'),
@@ -88,7 +92,15 @@ urlpatterns = [
          views.map.MapView.as_view(),
          name='map'),
 
+    path('map/markers',
+         views.map.MapMarkersView.as_view(),
+         name='map.markers'),
+
     path('network',
          views.network.NetworkView.as_view(),
          name='network'),
+
+    path('network/data',
+         views.network.NetworkDataView.as_view(),
+         name='network.data'),
 ]
@@ -1,19 +1,40 @@
+import collections
 import typing
 
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import QuerySet
+from django.db.models import Avg, Count, F, Min, Q, QuerySet
+from django.db.models.functions import Floor
+from django.http import JsonResponse
 from django.urls import reverse
 from django.utils import timezone
-from django.views.generic import TemplateView
+from django.views.generic import TemplateView, View
 
 from people import forms, models, permissions
 from breccia_mapper.views import UserIsStaffMixin
 
 
+#: Related objects needed to build map markers for each model
+MAP_RELATED_FIELDS = {
+    models.Person: ['current_answers__organisation__current_answers'],
+    models.Organisation: ['current_answers'],
+}
+
+
 def get_map_data(obj: typing.Union[models.Person, models.Organisation]) -> typing.Dict[str, typing.Any]:
-    """Prepare data to mark people or organisations on a map."""
+    """Prepare data to mark people or organisations on a map.
+
+    Related objects are loaded lazily if they have not been selected with
+    :func:`select_map_related`.
+    """
     answer_set = obj.current_answers
-    organisation = getattr(answer_set, 'organisation', None)
+
+    # Organisation answer sets refer back to the organisation itself - only people belong to one
+    organisation = None
+    if isinstance(obj, models.Person):
+        organisation = getattr(answer_set, 'organisation', None)
+
+    # Organisation locations are part of their answers
+    organisation_answers = getattr(organisation, 'current_answers', None)
 
     try:
         country = answer_set.country_of_residence.name
@@ -26,28 +47,164 @@ def get_map_data(obj: typing.Union[models.Person, models.Organisation]) -> typin
         'lat': getattr(answer_set, 'latitude', None),
         'lng': getattr(answer_set, 'longitude', None),
         'organisation': getattr(organisation, 'name', None),
-        'org_lat': getattr(organisation, 'latitude', None),
-        'org_lng': getattr(organisation, 'longitude', None),
+        'org_lat': getattr(organisation_answers, 'latitude', None),
+        'org_lng': getattr(organisation_answers, 'longitude', None),
         'country': country,
         'url': obj.get_absolute_url(),
         'type': type(obj).__name__,
     }
 
 
+def select_map_related(queryset: QuerySet) -> QuerySet:
+    """Select the related objects needed to build map markers along with each object."""
+    return queryset.select_related(*MAP_RELATED_FIELDS[queryset.model])
+
+
+def get_map_markers(
+        objects: typing.Union[QuerySet, typing.Iterable[typing.Union[models.Person,
+                                                                     models.Organisation]]]
+) -> typing.List[typing.Dict[str, typing.Any]]:
+    """Prepare data to mark many people or organisations on a map using a single query.
+
+    :param objects: Queryset of people or organisations - or objects already fetched
+        using :func:`select_map_related`
+    """
+    if isinstance(objects, QuerySet):
+        objects = select_map_related(objects)
+
+    return [get_map_data(obj) for obj in objects]
+
+
+#: Number of grid cells across each map tile into which markers are clustered
+CLUSTER_CELLS_PER_TILE = 4
+
+#: Maximum zoom level supported by Google Maps
+MAX_ZOOM = 22
+
+
+class BoundingBox(typing.NamedTuple):
+    """Area of the map in degrees - `west` is greater than `east` if it crosses 180 degrees."""
+    south: float
+    west: float
+    north: float
+    east: float
+
+    @classmethod
+    def parse(cls, value: str) -> 'BoundingBox':
+        """Read a bounding box formatted as `south,west,north,east`.
+
+        :raise ValueError: If the value is not a valid bounding box
+        """
+        bbox = cls(*map(float, value.split(',')))
+        if not (-90 <= bbox.south <= bbox.north <= 90
+                and -180 <= bbox.west <= 180 and -180 <= bbox.east <= 180):
+            raise ValueError('Bounding box is outside of the map')
+
+        return bbox
+
+    def filter(self, queryset: QuerySet, lat_field: str, lng_field: str) -> QuerySet:
+        """Select the objects in a queryset with a location inside this bounding box."""
+        queryset = queryset.filter(**{f'{lat_field}__range': (self.south, self.north)})
+
+        if self.west <= self.east:
+            return queryset.filter(**{f'{lng_field}__range': (self.west, self.east)})
+
+        return queryset.filter(
+            Q(**{f'{lng_field}__gte': self.west}) | Q(**{f'{lng_field}__lte': self.east})
+        )
+
+
+def get_marker_locations() -> typing.List[typing.Tuple[str, QuerySet, str, str]]:
+    """Get the sources of marker locations on the map.
+
+    :return: Marker type, objects to mark, and the lookups of their latitude and longitude
+    """
+    has_location = Q(current_answers__latitude__isnull=False,
+                     current_answers__longitude__isnull=False)
+
+    return [
+        ('Person', models.Person.objects.filter(has_location),
+         'current_answers__latitude', 'current_answers__longitude'),
+        # People who haven't given their location are marked at their organisation
+        ('Person', models.Person.objects.exclude(has_location),
+         'current_answers__organisation__current_answers__latitude',
+         'current_answers__organisation__current_answers__longitude'),
+        ('Organisation', models.Organisation.objects.all(),
+         'current_answers__latitude', 'current_answers__longitude'),
+    ]
+
+
+def get_map_clusters(bbox: BoundingBox, zoom: int) -> typing.Dict[str, typing.List]:
+    """Group markers inside a bounding box into clusters on a grid which depends on the zoom level.
+
+    Clusters are aggregated by the database, so the number of queries and size of the response
+    depend on the area of the map shown rather than the number of markers.
+
+    :return: Clusters of more than one marker, and details of markers which are alone in a cell
+    """
+    cell_size = 360 / (2 ** zoom * CLUSTER_CELLS_PER_TILE)
+
+    cells = {}
+    for marker_type, queryset, lat_field, lng_field in get_marker_locations():
+        rows = bbox.filter(queryset, lat_field, lng_field).annotate(
+            cell_x=Floor(F(lng_field) / cell_size),
+            cell_y=Floor(F(lat_field) / cell_size),
+        ).order_by().values('cell_x', 'cell_y').annotate(
+            count=Count('pk'), lat=Avg(lat_field), lng=Avg(lng_field), first_pk=Min('pk')
+        )
+
+        for row in rows:
+            key = (marker_type, row['cell_x'], row['cell_y'])
+            cell = cells.setdefault(key, {'type': marker_type, 'count': 0, 'lat': 0., 'lng': 0.})
+
+            # Combine cells from different sources of the same type as a weighted mean
+            total = cell['count'] + row['count']
+            cell['lat'] = (cell['lat'] * cell['count'] + row['lat'] * row['count']) / total
+            cell['lng'] = (cell['lng'] * cell['count'] + row['lng'] * row['count']) / total
+            cell['count'] = total
+            cell['pk'] = row['first_pk']
+
+    # Lone markers are shown individually, so need the details of the object they mark
+    lone_pks = collections.defaultdict(set)
+    for cell in cells.values():
+        if cell['count'] == 1:
+            lone_pks[cell['type']].add(cell['pk'])
+
+    markers = []
+    for marker_type, model in (('Person', models.Person), ('Organisation', models.Organisation)):
+        markers.extend(get_map_markers(model.objects.filter(pk__in=lone_pks[marker_type])))
+
+    clusters = [
+        {key: cell[key] for key in ('type', 'count', 'lat', 'lng')}
+        for cell in cells.values() if cell['count'] > 1
+    ]
+
+    return {
+        'clusters': clusters,
+        'markers': markers,
+    }
+
+
 class MapView(UserIsStaffMixin, LoginRequiredMixin, TemplateView):
-    """View displaying a map of :class:`Person` and :class:`Organisation` locations."""
+    """View displaying a map of :class:`Person` and :class:`Organisation` locations.
+
+    Markers are loaded by the page from :class:`MapMarkersView` for the area being shown.
+    """
     template_name = 'people/map.html'
 
-    def get_context_data(self,
-                         **kwargs: typing.Any) -> typing.Dict[str, typing.Any]:
-        context = super().get_context_data(**kwargs)
 
-        map_markers = []
+class MapMarkersView(UserIsStaffMixin, LoginRequiredMixin, View):
+    """View providing clustered map markers within a bounding box as JSON.
+
+    Expects `bbox` formatted as `south,west,north,east` in degrees and an integer `zoom` level.
+    """
+    def get(self, request, *args, **kwargs):
+        try:
+            bbox = BoundingBox.parse(request.GET['bbox'])
+            zoom = min(max(int(request.GET.get('zoom', 0)), 0), MAX_ZOOM)
 
-        map_markers.extend(
-            get_map_data(person) for person in models.Person.objects.all())
-        map_markers.extend(
-            get_map_data(org) for org in models.Organisation.objects.all())
-        context['map_markers'] = map_markers
+        except (KeyError, TypeError, ValueError) as exc:
+            return JsonResponse({'errors': {'__all__': [f'Invalid bounding box or zoom: {exc}']}},
+                                status=400)
 
-        return context
+        return JsonResponse(get_map_clusters(bbox, zoom))
@@ -3,71 +3,96 @@ Views for displaying networks of :class:`People` and :class:`Relationship`s.
 """
 
 import logging
+import typing
 
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Q, QuerySet
+from django.db.models import QuerySet
 from django.forms import ValidationError
+from django.http import JsonResponse
 from django.utils import timezone
-from django.views.generic import TemplateView
+from django.views.generic import TemplateView, View
 
-from people import forms, models, serializers
+from people import (analytics, answer_index, filter_expressions, forms, graph, layout, models,
+                    network_cache)
 from breccia_mapper.views import UserIsStaffMixin
 
 logger = logging.getLogger(__name__)  # pylint: disable=invalid-name
 
 
-def filter_by_form_answers(queryset: QuerySet, answerset_queryset: QuerySet, relationship_key: str):
-    """Build a filter to select based on form responses."""
-    def inner(form, at_date=None):
-        # Filter on timestamp__date doesn't seem to work on MySQL
-        # To compare datetimes we need at_date to be midnight at
-        # the *end* of the day in question - so add one day
-
-        if not at_date:
-            at_date = timezone.now().date()
-        at_date += timezone.timedelta(days=1)
-
-        # Filter to answersets valid at required time
-        answerset_set = answerset_queryset.prefetch_related('question_answers').filter(
-            Q(replaced_timestamp__gte=at_date)
-            | Q(replaced_timestamp__isnull=True),
-            timestamp__lte=at_date
-        )
+def get_choice_groups(form) -> typing.List[typing.List[int]]:
+    """Get the choices selected for each question in a valid filter form."""
+    return [
+        [choice.pk for choice in values]
+        for field, values in form.cleaned_data.items()
+        if field.startswith(f'{form.question_prefix}question_') and values
+    ]
+
+
+def filter_by_database(queryset: QuerySet, form, at_date=None) -> QuerySet:
+    """Select objects with answers at a date matching those selected in a valid filter form.
+
+    Each question filtered on is a separate `Exists` subquery, rather than another join.
+    """
+    model = queryset.model
+
+    return queryset.filter(
+        filter_expressions.has_answers(model, at_date),
+        *(filter_expressions.has_any_answer(model, choices, at_date)
+          for choices in get_choice_groups(form))
+    )
+
+
+def filter_by_index(queryset: QuerySet, form) -> QuerySet:
+    """Select objects with current answers matching those selected in a valid filter form.
 
-        # Filter to answersets containing required answers
-        for field, values in form.cleaned_data.items():
-            if field.startswith(f'{form.question_prefix}question_') and values:
-                answerset_set = answerset_set.filter(question_answers__in=values)
+    Matching objects are found in the index of current answers, without querying answer sets.
+    """
+    choice_groups = get_choice_groups(form)
+    if not choice_groups:
+        return queryset.filter(current_answers__isnull=False)
 
-        return queryset.filter(pk__in=answerset_set.values_list(relationship_key, flat=True))
+    return queryset.filter(pk__in=answer_index.select(queryset.model, choice_groups))
+
+
+def filter_by_form_answers(queryset: QuerySet):
+    """Build a filter to select based on form responses.
+
+    Filters on current answers use the index of current answers - filters at a past date
+    are applied by the database.
+    """
+    def inner(form, at_date=None):
+        if at_date and at_date != timezone.now().date():
+            return filter_by_database(queryset, form, at_date=at_date)
+
+        return filter_by_index(queryset, form)
 
     return inner
 
 
-filter_relationships = filter_by_form_answers(
-    models.Relationship.objects.prefetch_related('source', 'target'),
-    models.RelationshipAnswerSet.objects, 'relationship'
-)
+def filter_by_expression(queryset: QuerySet,
+                         expressions: typing.Mapping[str, filter_expressions.Expression],
+                         key: str,
+                         at_date=None) -> QuerySet:
+    """Select objects matching the filter expression for their kind of object, if there is one."""
+    if key not in expressions:
+        return queryset
+
+    return queryset.filter(
+        filter_expressions.compile_expression(expressions[key], queryset.model, at_date)
+    )
 
-filter_organisations = filter_by_form_answers(
-    models.Organisation.objects, models.OrganisationAnswerSet.objects, 'organisation'
-)
 
-filter_people = filter_by_form_answers(
-    models.Person.objects, models.PersonAnswerSet.objects, 'person'
+filter_relationships = filter_by_form_answers(
+    models.Relationship.objects.select_related('source', 'target')
 )
 
+filter_organisations = filter_by_form_answers(models.Organisation.objects)
 
-class NetworkView(UserIsStaffMixin, LoginRequiredMixin, TemplateView):
-    """View to display relationship network."""
-    template_name = 'people/network.html'
+filter_people = filter_by_form_answers(models.Person.objects)
 
-    def post(self, request, *args, **kwargs):
-        all_forms = self.get_forms()
-        if all(map(lambda f: f.is_valid(), all_forms.values())):
-            return self.forms_valid(all_forms)
 
-        return self.forms_invalid(all_forms)
+class NetworkFilterMixin:
+    """Build the network of people and organisations selected by the network filter forms."""
 
     def get_forms(self):
         form_kwargs = self.get_form_kwargs()
@@ -77,6 +102,7 @@ class NetworkView(UserIsStaffMixin, LoginRequiredMixin, TemplateView):
             'person': forms.NetworkPersonFilterForm(**form_kwargs),
             'organisation': forms.NetworkOrganisationFilterForm(**form_kwargs),
             'date': forms.DateForm(**form_kwargs),
+            'expression': forms.NetworkFilterExpressionForm(**form_kwargs),
         }
 
     def get_form_kwargs(self):
@@ -91,8 +117,74 @@ class NetworkView(UserIsStaffMixin, LoginRequiredMixin, TemplateView):
 
         return kwargs
 
+    @staticmethod
+    def get_filters(all_forms) -> typing.Dict[str, typing.Any]:
+        """Get the canonical representation of the filters applied by a set of valid forms."""
+        filter_forms = {
+            key: all_forms[key] for key in ('relationship', 'person', 'organisation')
+        }
+
+        filters = network_cache.normalise_filters(filter_forms,
+                                                  all_forms['date'].cleaned_data['date'])
+
+        expressions = all_forms['expression'].cleaned_data['expression']
+        if expressions:
+            filters['expression'] = expressions
+
+        return filters
+
+    def get_network(self, all_forms) -> typing.Dict[str, typing.Any]:
+        """Get the serialized network selected by a set of valid filter forms."""
+        date = all_forms['date'].cleaned_data['date']
+
+        expressions = all_forms['expression'].cleaned_data['expression']
+
+        relationships = filter_by_expression(
+            filter_relationships(all_forms['relationship'], at_date=date), expressions,
+            'relationship', at_date=date
+        )
+        if all_forms['relationship'].cleaned_data.get('mutual_only'):
+            relationships = relationships.mutual()
+
+        network = network_cache.get_or_build_network(
+            self.get_filters(all_forms),
+            lambda: graph.build_network(
+                filter_by_expression(filter_people(all_forms['person'], at_date=date),
+                                     expressions, 'person', at_date=date),
+                filter_by_expression(filter_organisations(all_forms['organisation'], at_date=date),
+                                     expressions, 'organisation', at_date=date),
+                relationships,
+                models.OrganisationRelationship.objects.all(),
+            )
+        )
+
+        logger.info(
+            'Found %d distinct relationships matching filters', len(network['relationship_set'])
+        )
+
+        return network
+
+    def get_analytics(self, all_forms) -> typing.Dict[str, typing.Any]:
+        """Get network metrics for the network selected by a set of valid filter forms."""
+        elements = graph.get_elements(self.get_network(all_forms))
+
+        return network_cache.get_or_build_analytics(
+            self.get_filters(all_forms), lambda: analytics.analyse_elements(elements)
+        )
+
+
+class NetworkView(UserIsStaffMixin, LoginRequiredMixin, NetworkFilterMixin, TemplateView):
+    """View to display relationship network.
+
+    The network itself is loaded by the page from :class:`NetworkDataView`.
+    """
+    template_name = 'people/network.html'
+
+    def post(self, request, *args, **kwargs):
+        return self.render_to_response(self.get_context_data())
+
     def get_context_data(self, **kwargs):
-        """Add filtered QuerySets of :class:`Person` and :class:`Relationship` to the context."""
+        """Add filter forms to the context."""
         context = super().get_context_data(**kwargs)
         context['full_width_page'] = True
 
@@ -101,57 +193,60 @@ class NetworkView(UserIsStaffMixin, LoginRequiredMixin, TemplateView):
         context['person_form'] = all_forms['person']
         context['organisation_form'] = all_forms['organisation']
         context['date_form'] = all_forms['date']
+        context['expression_form'] = all_forms['expression']
 
-        if not all(map(lambda f: f.is_valid(), all_forms.values())):
-            return context
+        return context
 
-        date = all_forms['date'].cleaned_data['date']
 
-        context['person_set'] = serializers.PersonSerializer(
-            filter_people(all_forms['person'], at_date=date), many=True
-        ).data
-
-        context['organisation_set'] = serializers.OrganisationSerializer(
-            filter_organisations(all_forms['organisation'], at_date=date), many=True
-        ).data
-
-        context['relationship_set'] = serializers.RelationshipSerializer(
-            filter_relationships(all_forms['relationship'], at_date=date), many=True
-        ).data
-
-        context['organisation_relationship_set'] = serializers.OrganisationRelationshipSerializer(
-            models.OrganisationRelationship.objects.prefetch_related('source', 'target').all(),
-            many=True
-        ).data
-
-        for person in models.Person.objects.all():
-            try:
-                context['organisation_relationship_set'].append(
-                    {
-                        'pk': f'membership-{person.pk}',
-                        'source': serializers.PersonSerializer(person).data,
-                        'target': serializers.OrganisationSerializer(
-                            person.current_answers.organisation
-                        ).data,
-                        'kind': 'organisation-membership'
-                    }
-                )
-
-            except AttributeError:
-                pass
+class NetworkDataView(UserIsStaffMixin, LoginRequiredMixin, NetworkFilterMixin, View):
+    """View providing the filtered network as JSON Cytoscape elements.
 
-        logger.info(
-            'Found %d distinct relationships matching filters', len(context['relationship_set'])
-        )
+    If the `since` token from a previous response is provided, only the elements which
+    have been added, changed or removed since that response are returned.
 
-        return context
+    Node positions and network metrics are computed on the server and included whenever the
+    set of elements changes, so that the client doesn't have to lay out large networks itself.
+    """
+    def get(self, request, *args, **kwargs):
+        all_forms = self.get_forms()
+        if not all(map(lambda f: f.is_valid(), all_forms.values())):
+            return JsonResponse({
+                'errors': {
+                    key: form.errors.get_json_data() for key, form in all_forms.items()
+                    if form.errors
+                },
+            }, status=400)
 
-    def forms_valid(self, all_forms):
         try:
-            return self.render_to_response(self.get_context_data())
+            elements = graph.get_elements(self.get_network(all_forms))
 
-        except ValidationError:
-            return self.forms_invalid(all_forms)
+        except ValidationError as exc:
+            return JsonResponse({'errors': {'__all__': exc.messages}}, status=400)
 
-    def forms_invalid(self, all_forms):
-        return self.render_to_response(self.get_context_data())
+        token = network_cache.store_elements(elements)
+
+        previous = None
+        since = request.GET.get('since')
+        if since:
+            previous = network_cache.get_stored_elements(since)
+
+        data = {
+            'token': token,
+            # Client must replace its whole network if we don't know what it has already
+            'full': previous is None,
+        }
+        data.update(graph.diff_elements(previous or {}, elements))
+
+        # Layout and metrics only depend on which elements are present
+        data['positions'] = None
+        data['analytics'] = None
+        if data['full'] or data['added'] or data['removed']:
+            filters = self.get_filters(all_forms)
+            data['positions'] = network_cache.get_or_build_layout(
+                filters, lambda: layout.layout_elements(elements)
+            )
+            data['analytics'] = network_cache.get_or_build_analytics(
+                filters, lambda: analytics.analyse_elements(elements)
+            )
+
+        return JsonResponse(data)
@@ -4,11 +4,10 @@ from constance import config
 
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.core.exceptions import ObjectDoesNotExist
-from django.utils import timezone
 from django.views.generic import CreateView, DetailView, ListView, UpdateView
 
-from people import forms, models
-from .map import get_map_data
+from people import forms, models, search
+from .map import get_map_markers, select_map_related
 
 
 class OrganisationCreateView(LoginRequiredMixin, CreateView):
@@ -31,9 +30,22 @@ def try_copy_by_key(src_dict: typing.Mapping[str, typing.Any],
 
 
 class OrganisationListView(LoginRequiredMixin, ListView):
-    """View displaying a list of :class:`organisation` objects."""
+    """View displaying a list of :class:`organisation` objects.
+
+    Organisations are fetched along with their current answers in a single query,
+    which provides both their country and the name used to display them.
+    The list is searchable and is paginated after grouping by country.
+    """
     model = models.Organisation
+    queryset = model.objects.select_related('current_answers')
     template_name = 'people/organisation/list.html'
+    paginate_by = 50
+
+    def get_queryset(self):
+        """Filter organisations by the search query `q`."""
+        return search.search(super().get_queryset(),
+                             self.request.GET.get('q', ''),
+                             fields=('name', 'current_answers__name'))
 
     @staticmethod
     def sort_organisation_countries(
@@ -65,36 +77,49 @@ class OrganisationListView(LoginRequiredMixin, ListView):
 
         return orgs_sorted
 
-    def get_context_data(self,
-                         **kwargs: typing.Any) -> typing.Dict[str, typing.Any]:
-        context = super().get_context_data(**kwargs)
+    @staticmethod
+    def get_country(organisation: models.Organisation) -> str:
+        """Get the name of the group in which an organisation is listed."""
+        answers = organisation.current_answers
 
-        orgs_by_country = {}
-        for organisation in self.get_queryset().all():
-            answers = organisation.current_answers
+        country = 'Unknown'
+        try:
+            if len(answers.countries) == 1:
+                country = answers.countries[0].name
 
-            country = 'Unknown'
-            try:
-                if len(answers.countries) == 1:
-                    country = answers.countries[0].name
+            elif len(answers.countries) > 1:
+                country = 'International'
 
-                elif len(answers.countries) > 1:
-                    country = 'International'
+            if answers.is_partner_organisation:
+                country = f'{config.PARENT_PROJECT_NAME} partners'
 
-                if answers.is_partner_organisation:
-                    country = f'{config.PARENT_PROJECT_NAME} partners'
+        except AttributeError:
+            # Organisation has no AnswerSet - country is 'Unknown'
+            pass
+
+        return country
 
-            except AttributeError:
-                # Organisation has no AnswerSet - country is 'Unknown'
-                pass
+    def get_context_data(self,
+                         **kwargs: typing.Any) -> typing.Dict[str, typing.Any]:
+        orgs_by_country = {}
+        for organisation in self.object_list:
+            orgs_by_country.setdefault(self.get_country(organisation), []).append(organisation)
 
-            orgs = orgs_by_country.get(country, [])
-            orgs.append(organisation)
-            orgs_by_country[country] = orgs
+        # Sort into meaningful order then paginate the sorted list
+        object_list = [
+            organisation
+            for organisations in self.sort_organisation_countries(orgs_by_country).values()
+            for organisation in organisations
+        ]
+        context = super().get_context_data(object_list=object_list, **kwargs)
+        context['query'] = self.request.GET.get('q', '')
 
-        # Sort into meaningful order
-        context['orgs_by_country'] = self.sort_organisation_countries(
-            orgs_by_country)
+        # Group the current page by country
+        page_by_country = {}
+        for organisation in context['object_list']:
+            page_by_country.setdefault(self.get_country(organisation), []).append(organisation)
+
+        context['orgs_by_country'] = page_by_country
 
         existing_relationships = set()
         try:
@@ -116,6 +141,7 @@ class OrganisationListView(LoginRequiredMixin, ListView):
 class OrganisationDetailView(LoginRequiredMixin, DetailView):
     """View displaying details of a :class:`Organisation`."""
     model = models.Organisation
+    queryset = select_map_related(model.objects.all())
     context_object_name = 'organisation'
     template_name = 'people/organisation/detail.html'
 
@@ -126,7 +152,7 @@ class OrganisationDetailView(LoginRequiredMixin, DetailView):
 
         answer_set = self.object.current_answers
         context['answer_set'] = answer_set
-        context['map_markers'] = [get_map_data(self.object)]
+        context['map_markers'] = get_map_markers([self.object])
 
         context['question_answers'] = {}
         if answer_set is not None:
@@ -151,6 +177,7 @@ class OrganisationDetailView(LoginRequiredMixin, DetailView):
 class OrganisationUpdateView(LoginRequiredMixin, UpdateView):
     """View for updating a :class:`Organisation` record."""
     model = models.Organisation
+    queryset = select_map_related(model.objects.all())
     context_object_name = 'organisation'
     template_name = 'people/organisation/update.html'
     form_class = forms.OrganisationAnswerSetForm
@@ -161,7 +188,7 @@ class OrganisationUpdateView(LoginRequiredMixin, UpdateView):
         context = super().get_context_data(**kwargs)
 
         answerset = self.object.current_answers
-        context['map_markers'] = [get_map_data(self.object)]
+        context['map_markers'] = get_map_markers([self.object])
 
         return context
 
@@ -184,17 +211,3 @@ class OrganisationUpdateView(LoginRequiredMixin, UpdateView):
         kwargs.pop('instance')
 
         return kwargs
-
-    def form_valid(self, form):
-        """Mark any previous answer sets as replaced."""
-        response = super().form_valid(form)
-        now_date = timezone.now().date()
-
-        # Saving the form made self.object an OrganisationAnswerSet - so go up, then back down
-        # Shouldn't be more than one after initial updates after migration
-        for answer_set in self.object.organisation.answer_sets.exclude(
-                pk=self.object.pk):
-            answer_set.replaced_timestamp = now_date
-            answer_set.save()
-
-        return response
@@ -6,13 +6,13 @@ import typing
 
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.core.exceptions import ObjectDoesNotExist
-from django.http import HttpRequest, HttpResponse
+from django.db.models import Prefetch, prefetch_related_objects
+from django.http import HttpRequest, HttpResponse, JsonResponse
 from django.shortcuts import redirect
-from django.utils import timezone
-from django.views.generic import CreateView, DetailView, ListView, UpdateView
+from django.views.generic import CreateView, DetailView, ListView, UpdateView, View
 
-from people import forms, models, permissions
-from .map import get_map_data
+from people import forms, models, permissions, search
+from .map import get_map_markers, select_map_related
 
 from random import randint
 
@@ -53,9 +53,15 @@ class PersonListView(LoginRequiredMixin, ListView):
     """View displaying a list of :class:`Person` objects - searchable."""
     model = models.Person
     template_name = 'people/person/list.html'
+    paginate_by = 50
+
+    def get_queryset(self):
+        """Filter people by the search query `q`."""
+        return search.search(super().get_queryset(), self.request.GET.get('q', ''))
 
     def get_context_data(self, **kwargs: typing.Any) -> typing.Dict[str, typing.Any]:
         context = super().get_context_data(**kwargs)
+        context['query'] = self.request.GET.get('q', '')
 
         existing_relationships = set()
         try:
@@ -74,9 +80,38 @@ class PersonListView(LoginRequiredMixin, ListView):
         return context
 
 
+class PersonAutocompleteView(LoginRequiredMixin, View):
+    """View providing people matching a search term as JSON in the format expected by Select2."""
+    #: Number of people returned for each page of results
+    page_size = 20
+
+    def get(self, request: HttpRequest, *args: typing.Any, **kwargs: typing.Any) -> JsonResponse:
+        try:
+            page = max(int(request.GET.get('page', 1)), 1)
+
+        except ValueError:
+            page = 1
+
+        people = search.search(models.Person.objects.only('pk', 'name'),
+                               request.GET.get('term', ''))
+
+        # Fetch one extra to find whether there are more results
+        start = (page - 1) * self.page_size
+        people = list(people[start:start + self.page_size + 1])
+
+        return JsonResponse({
+            'results': [{
+                'id': person.pk,
+                'text': str(person),
+            } for person in people[:self.page_size]],
+            'more': len(people) > self.page_size,
+        })
+
+
 class ProfileView(LoginRequiredMixin, DetailView):
     """View displaying the profile of a :class:`Person` - who may be a user."""
     model = models.Person
+    queryset = select_map_related(model.objects.select_related('user', 'metrics'))
 
     def get(self, request: HttpRequest, *args: typing.Any, **kwargs: typing.Any) -> HttpResponse:
         try:
@@ -86,15 +121,22 @@ class ProfileView(LoginRequiredMixin, DetailView):
             # User has no linked Person yet
             return redirect('index')
 
-        if self.object.user == self.request.user and self.object.current_answers is None:
-            return redirect('people:person.update', pk=self.object.pk)
+        if self.object.user_id == self.request.user.pk:
+            permissions.cache_linked_person(self.request.user, self.object)
+
+            if self.object.current_answers is None:
+                return redirect('people:person.update', pk=self.object.pk)
 
         context = self.get_context_data(object=self.object)
         return self.render_to_response(context)
 
+    def has_full_access(self) -> bool:
+        """Can the current user see the full profile of this person?"""
+        return (self.object.user_id == self.request.user.pk) or self.request.user.is_superuser
+
     def get_template_names(self) -> typing.List[str]:
         """Return template depending on level of access."""
-        if (self.object.user == self.request.user) or self.request.user.is_superuser:
+        if self.has_full_access():
             return ['people/person/detail_full.html']
 
         return ['people/person/detail_partial.html']
@@ -109,7 +151,25 @@ class ProfileView(LoginRequiredMixin, DetailView):
 
         except AttributeError:
             # pk was not provided in URL
-            return self.request.user.person
+            return self.get_queryset().get(user=self.request.user)
+
+    @staticmethod
+    def get_full_profile_prefetches() -> typing.List[typing.Union[str, Prefetch]]:
+        """Get the related objects listed on the full profile, with what is shown of each.
+
+        Each is fetched with a single query however many there are.
+        """
+        return [
+            # Relationship status needs only the id of the current answers
+            Prefetch('relationships_as_source',
+                     queryset=models.Relationship.objects.select_related('target')),
+            # Organisations are named by their current answers
+            Prefetch('organisation_relationships_as_source',
+                     queryset=models.OrganisationRelationship.objects.select_related(
+                         'target__current_answers'
+                     )),
+            'activities',
+        ]
 
     def get_context_data(self, **kwargs: typing.Any) -> typing.Dict[str, typing.Any]:
         """Add current :class:`PersonAnswerSet` to context."""
@@ -117,28 +177,25 @@ class ProfileView(LoginRequiredMixin, DetailView):
 
         answer_set = self.object.current_answers
         context['answer_set'] = answer_set
-        context['map_markers'] = [get_map_data(self.object)]
+        context['map_markers'] = get_map_markers([self.object])
 
         context['question_answers'] = {}
         if answer_set is not None:
-            show_all = (self.object.user == self.request.user) or self.request.user.is_superuser
-            context['question_answers'] = answer_set.build_question_answers(show_all)
-
-        context['relationship'] = None
-        try:
-            relationship = models.Relationship.objects.get(
-                source=self.request.user.person, target=self.object
+            context['question_answers'] = answer_set.build_question_answers(
+                self.has_full_access()
             )
 
-            if relationship.is_current:
-                context['relationship'] = relationship
+        if self.has_full_access():
+            prefetch_related_objects([self.object], *self.get_full_profile_prefetches())
 
-        except models.Relationship.DoesNotExist:
-            pass
-
-        except ObjectDoesNotExist:
-            # No linked Person yet
-            pass
+        context['relationship'] = None
+        if self.object.user_id != self.request.user.pk:
+            # Filter on the user so the user's linked Person doesn't need to be fetched first
+            context['relationship'] = models.Relationship.objects.filter(
+                source__user=self.request.user,
+                target=self.object,
+                current_answers__isnull=False
+            ).first()
 
         return context
 
@@ -146,6 +203,7 @@ class ProfileView(LoginRequiredMixin, DetailView):
 class PersonUpdateView(permissions.UserIsLinkedPersonMixin, UpdateView):
     """View for updating a :class:`Person` record."""
     model = models.Person
+    queryset = select_map_related(model.objects.all())
     context_object_name = 'person'
     template_name = 'people/person/update.html'
     form_class = forms.PersonAnswerSetForm
@@ -167,7 +225,7 @@ class PersonUpdateView(permissions.UserIsLinkedPersonMixin, UpdateView):
     def get_context_data(self, **kwargs: typing.Any) -> typing.Dict[str, typing.Any]:
         context = super().get_context_data(**kwargs)
 
-        context['map_markers'] = [get_map_data(self.object)]
+        context['map_markers'] = get_map_markers([self.object])
 
         return context
 
@@ -190,16 +248,3 @@ class PersonUpdateView(permissions.UserIsLinkedPersonMixin, UpdateView):
         kwargs.pop('instance')
 
         return kwargs
-
-    def form_valid(self, form):
-        """Mark any previous answer sets as replaced."""
-        response = super().form_valid(form)
-        now_date = timezone.now().date()
-
-        # Saving the form made self.object a PersonAnswerSet - so go up, then back down
-        # Shouldn't be more than one after initial updates after migration
-        for answer_set in self.object.person.answer_sets.exclude(pk=self.object.pk):
-            answer_set.replaced_timestamp = now_date
-            answer_set.save()
-
-        return response
@@ -18,6 +18,7 @@ class RelationshipDetailView(permissions.UserIsLinkedPersonMixin, DetailView):
     View displaying details of a :class:`Relationship`.
     """
     model = models.Relationship
+    queryset = model.objects.with_reverse()
     template_name = 'people/relationship/detail.html'
     related_person_field = 'source'
 
@@ -77,10 +78,7 @@ class RelationshipUpdateView(permissions.UserIsLinkedPersonMixin, UpdateView):
     context_object_name = 'relationship'
     template_name = 'people/relationship/update.html'
     form_class = forms.RelationshipAnswerSetForm
-
-    def get_test_person(self) -> models.Person:
-        """Get the person instance which should be used for access control checks."""
-        return self.get_object().source
+    related_person_field = 'source'
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -107,19 +105,6 @@ class RelationshipUpdateView(permissions.UserIsLinkedPersonMixin, UpdateView):
 
         return kwargs
 
-    def form_valid(self, form):
-        """Mark any previous answer sets as replaced."""
-        response = super().form_valid(form)
-        now_date = timezone.now().date()
-
-        # Shouldn't be more than one after initial updates after migration
-        for answer_set in self.object.relationship.answer_sets.exclude(
-                pk=self.object.pk):
-            answer_set.replaced_timestamp = now_date
-            answer_set.save()
-
-        return response
-
     def get_success_url(self) -> str:
         return self.object.get_absolute_url()
 
@@ -131,10 +116,7 @@ class RelationshipEndView(permissions.UserIsLinkedPersonMixin,
     Sets `replaced_timestamp` on all answer sets where this is currently null.
     """
     model = models.Relationship
-
-    def get_test_person(self) -> models.Person:
-        """Get the person instance which should be used for access control checks."""
-        return self.get_object().source
+    related_person_field = 'source'
 
     def get_redirect_url(self, *args, **kwargs):
         """Mark any previous answer sets as replaced."""
@@ -144,6 +126,8 @@ class RelationshipEndView(permissions.UserIsLinkedPersonMixin,
         relationship.answer_sets.filter(
             replaced_timestamp__isnull=True).update(
                 replaced_timestamp=now_date)
+        relationship.current_answers = None
+        relationship.save(update_fields=['current_answers'])
 
         return relationship.target.get_absolute_url()
 
@@ -159,6 +143,7 @@ class OrganisationRelationshipEndView(RelationshipEndView):
 class OrganisationRelationshipDetailView(RelationshipDetailView):
     """View displaying details of an :class:`OrganisationRelationship`."""
     model = models.OrganisationRelationship
+    queryset = model.objects.all()
     template_name = 'people/organisation-relationship/detail.html'
     related_person_field = 'source'
     context_object_name = 'relationship'